@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Requests/second of the sync OpenBallot FastAPI server (main.py) vs the async
+serving mode (main_async.py) under concurrent load.
+
+Starts each server with uvicorn on its own port, drives it with an httpx
+AsyncClient at the given concurrency over a mix of graph and percentile
+queries, and prints throughput and latency percentiles.
+
+    python benchmarks/bench_async_server.py --concurrency 64 --duration 10
+
+Requires uvicorn and httpx. Run on a machine with spare cores: the load
+generator shares the CPU with the server under test.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVER_DIR = os.path.join(ROOT, "flask_app", "graph", "openballot_server")
+
+QUERIES = [
+    "/api/graph",
+    "/api/graph?party=D",
+    "/api/graph?party=R&min_amount=5000",
+    "/api/graph?state=CA",
+    "/api/indiv_percentiles",
+    "/api/indiv_percentiles?party=D&state=CA",
+    "/api/indiv_percentiles?party=R&topn=5&include_rows=false",
+    "/api/indiv_percentiles?rows_per_page=100&rows_format=columns",
+]
+
+
+def start_server(module: str, port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/healthz", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{module} did not start on port {port}")
+
+
+async def load(base: str, concurrency: int, duration: float, compressed: bool):
+    latencies = []
+    errors = 0
+    headers = {"Accept-Encoding": "gzip, br" if compressed else "identity"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    stop_at = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(base_url=base, headers=headers, limits=limits, timeout=30) as client:
+        async def worker(i: int):
+            nonlocal errors
+            n = i
+            while time.perf_counter() < stop_at:
+                t = time.perf_counter()
+                try:
+                    r = await client.get(QUERIES[n % len(QUERIES)])
+                    await r.aread()
+                    if r.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - t)
+                n += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def report(label: str, latencies, errors: int, elapsed: float) -> float:
+    rps = len(latencies) / elapsed
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    print(f"{label:<8} {len(latencies):>7} reqs  {rps:>8.1f} req/s  "
+          f"p50 {q[49] * 1000:>7.1f}ms  p99 {q[98] * 1000:>7.1f}ms  errors {errors}")
+    return rps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per server")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of load before measuring")
+    parser.add_argument("--identity", action="store_true", help="request uncompressed bodies")
+    args = parser.parse_args()
+
+    results = {}
+    for label, module, port in (("sync", "main", 8101), ("async", "main_async", 8102)):
+        proc = start_server(module, port)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            asyncio.run(load(base, args.concurrency, args.warmup, not args.identity))
+            results[label] = report(label, *asyncio.run(load(base, args.concurrency, args.duration, not args.identity)))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(f"async / sync throughput: {results['async'] / results['sync']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Concurrent read/write load on the Politician table under each engine profile.
+
+Reader threads run the /list_politicians queries (filtered SELECT plus the
+chamber/state/party counts) while a writer thread saves descriptions the way
+/generate_description does, one UPDATE + commit each. Reported per profile:
+reads/s, read latency percentiles, writes/s and "database is locked" errors.
+
+  basic       SQLAlchemy defaults, rollback journal (the app before engine profiles)
+  production  pooled engine, WAL, busy_timeout/mmap/cache pragmas (db_engine.py)
+  replica     production writer + read-only engine on the same file for readers
+
+Then the same readers run against a WAL database while populate_database.py
+does a bulk (replace) load and an upsert of the table, the way an ingest runs
+beside a live server: reported are each load's time, reads/s during it and
+any "database is locked" errors on either side.
+
+    python benchmarks/bench_db_concurrency.py
+    python benchmarks/bench_db_concurrency.py --rows 50000 --readers 16 --seconds 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--rows", type=int, default=20000)
+parser.add_argument("--readers", type=int, default=8)
+parser.add_argument("--seconds", type=float, default=5.0, help="duration of each profile's run")
+parser.add_argument("--rows-per-write", type=int, default=1, help="descriptions saved per write transaction")
+parser.add_argument("--profiles", default="basic,production,replica")
+parser.add_argument("--no-ingest", action="store_true", help="skip the ingest-under-read-load case")
+parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "openballot-bench"))
+args = parser.parse_args()
+
+os.makedirs(args.workdir, exist_ok=True)
+DB_PATH = os.path.join(args.workdir, "concurrency.db")
+DB_URI = f"sqlite:///{DB_PATH}"
+# The app reads its database URI at import time
+os.environ["DATABASE_URI"] = DB_URI
+
+import contextlib  # noqa: E402
+import io  # noqa: E402
+
+from sqlalchemy import create_engine, func, select, text, update  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from flask_app import app, db, init_db  # noqa: E402
+from flask_app.db_engine import engine_options, install_sqlite_pragmas, replica_engine  # noqa: E402
+from flask_app.models import Politician  # noqa: E402
+import populate_database  # noqa: E402
+from synthetic import write_candidates_csv  # noqa: E402
+
+P = Politician.__table__.c
+LIST_QUERIES = [
+    select(Politician.__table__).where(P.office_state.in_(["CA", "TX", "NY"])),
+    select(P.chamber, func.count()).where(P.chamber.isnot(None)).group_by(P.chamber),
+    select(P.office_state, func.count()).where(P.office_state != "00").group_by(P.office_state),
+    select(P.political_party_affiliation, func.count()).group_by(P.political_party_affiliation),
+]
+
+
+CSV_PATH = os.path.join(args.workdir, f"candidates_{args.rows}.csv")
+
+
+def load_table():
+    csv_path = CSV_PATH
+    if not os.path.exists(csv_path):
+        write_candidates_csv(csv_path, args.rows)
+    init_db(app)
+    with app.app_context(), contextlib.redirect_stdout(io.StringIO()):
+        populate_database.bulk_populate([(csv_path, "House")])
+        ids = [r[0] for r in db.session.query(Politician.candidate_id)]
+        db.session.remove()
+        db.engine.dispose()
+    return ids
+
+
+def engines_for(profile):
+    """(writer engine, reader engine) for a profile."""
+    if profile == "basic":
+        engine = create_engine(DB_URI)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode = DELETE")
+        return engine, engine
+    engine = create_engine(DB_URI, **engine_options(DB_URI, "production"))
+    install_sqlite_pragmas(engine)
+    with engine.connect():
+        pass  # first connection switches the file to WAL
+    if profile == "replica":
+        return engine, replica_engine(f"sqlite:///file:{DB_PATH}?mode=ro&uri=true", "production")
+    return engine, engine
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def start_readers(engine, stop, latencies, errors, lock):
+    """Start args.readers threads running LIST_QUERIES on `engine` until `stop` is set."""
+
+    def reader():
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    for q in LIST_QUERIES:
+                        conn.execute(q).fetchall()
+            except OperationalError:
+                with lock:
+                    errors["read"] += 1
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def run(profile, ids):
+    writer_engine, reader_engine = engines_for(profile)
+    stop = threading.Event()
+    latencies, errors = [], {"read": 0, "write": 0}
+    writes = [0]
+    lock = threading.Lock()
+
+    def writer():
+        i = 0
+        stmt = update(Politician.__table__).where(P.candidate_id == text(":cid")).values(description=text(":d"))
+        while not stop.is_set():
+            batch = [{"cid": ids[(i + k) % len(ids)], "d": f"description {i + k}"} for k in range(args.rows_per_write)]
+            i += args.rows_per_write
+            try:
+                with writer_engine.begin() as conn:
+                    conn.execute(stmt, batch)
+                writes[0] += 1
+            except OperationalError:
+                errors["write"] += 1
+
+    threads = start_readers(reader_engine, stop, latencies, errors, lock) + [threading.Thread(target=writer)]
+    threads[-1].start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    for engine in {writer_engine, reader_engine}:
+        engine.dispose()
+
+    latencies.sort()
+    return {
+        "reads_per_s": len(latencies) / args.seconds,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "writes_per_s": writes[0] / args.seconds,
+        "read_errors": errors["read"],
+        "write_errors": errors["write"],
+    }
+
+
+def run_ingest(mode):
+    """Readers on a WAL database while populate_database loads the CSV with `mode` (bulk or upsert)."""
+    _, reader_engine = engines_for("production")
+    stop = threading.Event()
+    latencies, errors = [], {"read": 0, "write": 0}
+    lock = threading.Lock()
+    threads = start_readers(reader_engine, stop, latencies, errors, lock)
+    time.sleep(0.2)  # let the readers hold connections open first
+
+    load = populate_database.bulk_populate if mode == "bulk" else populate_database.incremental_populate
+    result = "ok"
+    start = time.perf_counter()
+    try:
+        with app.app_context(), contextlib.redirect_stdout(io.StringIO()):
+            load([(CSV_PATH, "House")])
+            db.session.remove()
+    except OperationalError as e:
+        result = str(e.orig)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in threads:
+        t.join()
+    reader_engine.dispose()
+    with app.app_context():
+        db.engine.dispose()
+
+    latencies.sort()
+    return {
+        "seconds": elapsed,
+        "reads_per_s": len(latencies) / max(elapsed, 1e-9),
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "read_errors": errors["read"],
+        "result": result,
+    }
+
+
+def main():
+    ids = load_table()
+    print(f"{args.rows} rows, {args.readers} readers + 1 writer ({args.rows_per_write} rows/commit), {args.seconds:.0f}s each")
+    print(f"{'profile':<11} {'reads/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'writes/s':>9} {'read err':>9} {'write err':>10}")
+    for profile in args.profiles.split(","):
+        r = run(profile, ids)
+        print(f"{profile:<11} {r['reads_per_s']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['max_ms']:>8.1f} "
+              f"{r['writes_per_s']:>9.1f} {r['read_errors']:>9} {r['write_errors']:>10}")
+
+    if not args.no_ingest:
+        print(f"\ningest with {args.readers} readers open (WAL)")
+        print(f"{'mode':<11} {'load s':>8} {'reads/s':>8} {'p95 ms':>8} {'read err':>9}  result")
+        for mode in ("bulk", "upsert"):
+            r = run_ingest(mode)
+            print(f"{mode:<11} {r['seconds']:>8.2f} {r['reads_per_s']:>8.1f} {r['p95_ms']:>8.1f} "
+                  f"{r['read_errors']:>9}  {r['result']}")
+
+
+if __name__ == "__main__":
+    main()
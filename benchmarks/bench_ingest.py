@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Candidate ingest throughput: the ORM path (populate_from_csv, one object per
+row, commit every 100) vs the bulk path (bulk_populate, Core executemany in
+one transaction with load pragmas).
+
+Each run loads a synthetic CSV into a fresh SQLite file under --workdir.
+
+    python benchmarks/bench_ingest.py                  # 10k, 100k, 1M rows
+    python benchmarks/bench_ingest.py --sizes 10000 --orm-max 10000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated row counts")
+parser.add_argument("--orm-max", type=int, default=100000, help="skip the ORM path above this many rows")
+parser.add_argument("--batch-size", type=int, default=10000)
+parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "openballot-bench"))
+args = parser.parse_args()
+
+os.makedirs(args.workdir, exist_ok=True)
+DB_PATH = os.path.join(args.workdir, "ingest.db")
+# The app reads its database URI at import time
+os.environ["DATABASE_URI"] = f"sqlite:///{DB_PATH}"
+
+import contextlib  # noqa: E402
+import io  # noqa: E402
+
+from flask_app import app, db  # noqa: E402
+from flask_app.models import Politician  # noqa: E402
+import populate_database  # noqa: E402
+from synthetic import write_candidates_csv  # noqa: E402
+
+
+def fresh_db():
+    db.session.remove()
+    db.engine.dispose()
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+    db.create_all()
+
+
+def timed(fn):
+    fresh_db()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    elapsed = time.perf_counter() - start
+    return elapsed, Politician.query.count()
+
+
+def main():
+    sizes = [int(s) for s in args.sizes.split(",")]
+    print(f"{'rows':>9}  {'path':<5} {'seconds':>9} {'rows/s':>10}")
+    with app.app_context():
+        for n in sizes:
+            csv_path = os.path.join(args.workdir, f"candidates_{n}.csv")
+            if not os.path.exists(csv_path):
+                write_candidates_csv(csv_path, n)
+
+            results = {}
+            if n <= args.orm_max:
+                results["orm"] = timed(lambda: populate_database.populate_from_csv(csv_path, "House"))
+            results["bulk"] = timed(lambda: populate_database.bulk_populate([(csv_path, "House")],
+                                                                            batch_size=args.batch_size))
+            for path, (elapsed, count) in results.items():
+                assert count == n, f"{path} loaded {count} of {n} rows"
+                print(f"{n:>9}  {path:<5} {elapsed:>9.2f} {n / elapsed:>10.0f}")
+            if "orm" in results:
+                print(f"{'':>9}  speedup {results['orm'][0] / results['bulk'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Cold-start time of the app and the CLI scripts.
+
+Each measurement runs in a fresh interpreter (so nothing is already imported)
+and is repeated --runs times; the median and max are printed:
+
+  import          import flask_app
+  create_app      ... plus building the app (what a worker or `flask` pays)
+  first_request   ... plus GET / through the test client
+  first_graph     ... plus GET /api/graph (loads the graph and percentile data)
+  warm_up         import + create_app + flask_app.warm_up() (the gunicorn master)
+  cli:<script>    `python <script> --help`: the script's imports before argparse
+
+--importtime prints the slowest packages imported by create_app, from
+python -X importtime. Uses DATABASE_URI when set, otherwise a scratch SQLite
+file.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --importtime --report /tmp/startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SNIPPETS = {
+    "import": "import flask_app",
+    "create_app": "import flask_app; flask_app.create_app()",
+    "first_request": "import flask_app; flask_app.create_app().test_client().get('/')",
+    "first_graph": "import flask_app; flask_app.create_app().test_client().get('/api/graph')",
+    "warm_up": "import flask_app; flask_app.warm_up(app=flask_app.create_app())",
+}
+CLI_SCRIPTS = ["populate_database.py", "ingest_contributions.py", "build_graph.py"]
+
+TIMER = """
+import time
+t = time.perf_counter()
+{code}
+print(time.perf_counter() - t)
+"""
+
+
+def run_snippet(code, env):
+    out = subprocess.run([sys.executable, "-c", TIMER.format(code=code)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def run_cli(script, env):
+    # Wall time of the whole process, interpreter start included
+    out = subprocess.run([sys.executable, "-c", TIMER.format(
+        code=f"import subprocess, sys; subprocess.run([sys.executable, {script!r}, '--help'], "
+             f"stdout=subprocess.DEVNULL, check=True)")],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def slowest_imports(env, top):
+    """(cumulative microseconds, module) for the first two levels of create_app's import tree."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", SNIPPETS["create_app"]], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--importtime", action="store_true", help="list the slowest imports of create_app")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--report", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    env = dict(os.environ, OPENBALLOT_ENV="production")
+    env.pop("PROFILE_TOKEN", None)
+    if not env.get("DATABASE_URI"):
+        env["DATABASE_URI"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'openballot-startup.db')}"
+
+    results = {}
+    print(f"{'phase':<34} {'median s':>9} {'max s':>9}")
+    jobs = [(name, lambda code=code: run_snippet(code, env)) for name, code in SNIPPETS.items()]
+    jobs += [(f"cli:{script}", lambda script=script: run_cli(script, env)) for script in CLI_SCRIPTS]
+    for name, job in jobs:
+        times = [job() for _ in range(args.runs)]
+        results[name] = {"median_s": round(statistics.median(times), 4), "max_s": round(max(times), 4)}
+        print(f"{name:<34} {results[name]['median_s']:>9.3f} {results[name]['max_s']:>9.3f}")
+
+    if args.importtime:
+        print("\nslowest imports of create_app (cumulative):")
+        for us, name in slowest_imports(env, args.top):
+            print(f"  {us / 1e6:>7.3f}s  {name}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"runs": args.runs, "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
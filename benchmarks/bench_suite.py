@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite on a synthetic dataset, with a JSON report.
+
+Generates (or reuses) a synthetic new_data-style directory and graph JSON at
+the requested scale (benchmarks/synthetic.py, same schemas as new_data/*.csv
+and graph_house.json), points the app at it, then runs each scenario through
+Flask's test client:
+
+  ingest        bulk load of the candidate CSVs, then a no-change upsert
+  search        /search/<name> fuzzy search
+  facets        /api/politicians with chamber/state/party filters and paging
+  graph         /api/graph with party/state/min_amount filters
+  percentiles   /api/indiv_percentiles with party/state/topn/rows options
+
+Request sequences are deterministic for a given --seed. Each scenario reports
+latency percentiles, throughput and memory (process peak RSS, plus the Python
+allocation peak with --tracemalloc, which slows the run). The report is JSON
+with sorted keys, so two reports diff cleanly; --compare prints the change in
+p50/p95 against an earlier report. Nothing here calls the Gemini API.
+
+    python benchmarks/bench_suite.py                                   # 10k candidates
+    python benchmarks/bench_suite.py --candidates 1000000 --links 10000000 --requests 50
+    python benchmarks/bench_suite.py --compare benchmarks/reports/<older>.json
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ["ingest", "search", "facets", "graph", "percentiles"]
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--candidates", type=int, default=10000, help="synthetic candidates (1k to 1M)")
+parser.add_argument("--links", type=int, default=0,
+                    help="graph links, padded with committee links (default: funding-group links only; up to 10M)")
+parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+parser.add_argument("--search-requests", type=int, default=20, help="measured requests for search (scans every name)")
+parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per scenario")
+parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--tracemalloc", action="store_true", help="also record the Python allocation peak per scenario")
+parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "openballot-bench"))
+parser.add_argument("--report", help="JSON report path (default: benchmarks/reports/<git commit>.json)")
+parser.add_argument("--compare", help="earlier report to compare p50/p95 against")
+args = parser.parse_args()
+
+DATA_DIR = os.path.join(args.workdir, f"suite_{args.candidates}_{args.links}_{args.seed}")
+DB_PATH = os.path.join(args.workdir, "suite.db")
+# The app reads these at import time
+os.environ["DATABASE_URI"] = f"sqlite:///{DB_PATH}"
+os.environ["OPENBALLOT_DATA_DIR"] = DATA_DIR
+os.environ["OPENBALLOT_GRAPH_PATH"] = os.path.join(DATA_DIR, "graph_house.json")
+os.environ["OPENBALLOT_ENV"] = "production"
+os.environ.pop("PROFILE_TOKEN", None)
+
+import contextlib  # noqa: E402
+import io  # noqa: E402
+import json  # noqa: E402
+import platform  # noqa: E402
+import random  # noqa: E402
+import resource  # noqa: E402
+import subprocess  # noqa: E402
+import time  # noqa: E402
+import tracemalloc  # noqa: E402
+from datetime import datetime, timezone  # noqa: E402
+from pathlib import Path  # noqa: E402
+from urllib.parse import quote  # noqa: E402
+
+from synthetic import FIRST_NAMES, LAST_NAMES, STATES, write_dataset  # noqa: E402
+
+STATE_SAMPLE = ["CA", "TX", "NY", "FL", "PA", "OH", "MA", "WY"]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_info():
+    def run(*cmd):
+        try:
+            return subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {"commit": run("git", "rev-parse", "--short", "HEAD") or "unknown",
+            "dirty": bool(run("git", "status", "--porcelain", "--untracked-files=no"))}
+
+
+@contextlib.contextmanager
+def measured_memory(result):
+    if args.tracemalloc:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if args.tracemalloc:
+            result["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+            tracemalloc.stop()
+        result["peak_rss_mb"] = peak_rss_mb()
+
+
+def run_requests(client, urls, warmup):
+    """GET each url in order; returns latency/throughput stats for the measured ones."""
+    for url in urls[:warmup]:
+        client.get(url)
+    latencies, statuses, sizes = [], {}, 0
+    start = time.perf_counter()
+    for url in urls[warmup:]:
+        t = time.perf_counter()
+        r = client.get(url)
+        latencies.append(time.perf_counter() - t)
+        statuses[str(r.status_code)] = statuses.get(str(r.status_code), 0) + 1
+        sizes += len(r.data)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "requests": n,
+        "statuses": statuses,
+        "req_per_s": round(n / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(1000 * sum(latencies) / n, 3) if n else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 0.50), 3),
+        "p90_ms": round(1000 * percentile(latencies, 0.90), 3),
+        "p95_ms": round(1000 * percentile(latencies, 0.95), 3),
+        "p99_ms": round(1000 * percentile(latencies, 0.99), 3),
+        "max_ms": round(1000 * (latencies[-1] if latencies else 0.0), 3),
+        "mean_bytes": sizes // n if n else 0,
+    }
+
+
+def search_urls(rng, n):
+    return [f"/search/{quote(rng.choice(FIRST_NAMES).title() + ' ' + rng.choice(LAST_NAMES).title())}"
+            for _ in range(n)]
+
+
+def facet_urls(rng, n):
+    urls = []
+    for _ in range(n):
+        params = []
+        if rng.random() < 0.5:
+            params.append(("chamber", rng.choice(["House", "Senate"])))
+        for s in rng.sample(STATE_SAMPLE, rng.choice([0, 0, 1, 2])):
+            params.append(("state", s))
+        if rng.random() < 0.5:
+            params.append(("party", rng.choice(["DEM", "REP"])))
+        if rng.random() < 0.2:
+            params.append(("search", rng.choice(LAST_NAMES).lower()))
+        params.append(("page", rng.choice([1, 1, 1, 2, 5])))
+        urls.append("/api/politicians?" + "&".join(f"{k}={quote(str(v))}" for k, v in params))
+    return urls
+
+
+def graph_urls(rng, n):
+    urls = []
+    for _ in range(n):
+        params = []
+        if rng.random() < 0.6:
+            params.append(("party", rng.choice(["D", "R", "Other"])))
+        if rng.random() < 0.6:
+            params.append(("state", rng.choice(STATES)))
+        params.append(("min_amount", rng.choice([0, 0, 1000, 50000])))
+        urls.append("/api/graph?" + "&".join(f"{k}={v}" for k, v in params))
+    return urls
+
+
+def percentile_urls(rng, n):
+    urls = []
+    for _ in range(n):
+        params = [("party", rng.choice(["All", "All", "D", "R", "Other"])), ("topn", rng.choice([5, 15, 50]))]
+        if rng.random() < 0.5:
+            params.append(("state", rng.choice(STATES)))
+        fmt = rng.choice(["none", "objects", "columns", "binary"])
+        if fmt == "none":
+            params.append(("include_rows", "false"))
+        else:
+            params += [("rows_format", fmt), ("rows_per_page", 1000)]
+        urls.append("/api/indiv_percentiles?" + "&".join(f"{k}={v}" for k, v in params))
+    return urls
+
+
+def bench_ingest(app, db):
+    import populate_database
+
+    files = populate_database.candidate_csv_files(Path(DATA_DIR))
+    files = [(path, chamber) for path, chamber in files if path.exists()]
+    out = {}
+    with app.app_context(), contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        rows = populate_database.bulk_populate(files)
+        out["bulk_s"] = round(time.perf_counter() - start, 3)
+        start = time.perf_counter()
+        stats = populate_database.incremental_populate(files)
+        out["upsert_unchanged_s"] = round(time.perf_counter() - start, 3)
+        db.session.remove()
+    out["rows"] = rows
+    out["bulk_rows_per_s"] = round(rows / out["bulk_s"], 1) if out["bulk_s"] else 0.0
+    out["upsert_unchanged_rows"] = stats["unchanged"]
+    return out
+
+
+def compare(report, base_path):
+    with open(base_path) as f:
+        base = json.load(f)
+    print(f"\nvs {base_path} ({base['meta']['git']['commit']})")
+    print(f"{'scenario':<12} {'p50 ms':>18} {'p95 ms':>18}")
+    for name, r in report["scenarios"].items():
+        b = base.get("scenarios", {}).get(name)
+        if not b or "p50_ms" not in r or "p50_ms" not in b:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms"):
+            change = (r[key] - b[key]) / b[key] * 100 if b[key] else 0.0
+            cells.append(f"{b[key]:.1f} -> {r[key]:.1f} ({change:+.0f}%)")
+        print(f"{name:<12} {cells[0]:>18} {cells[1]:>18}")
+
+
+def main():
+    os.makedirs(args.workdir, exist_ok=True)
+    if not os.path.exists(os.path.join(DATA_DIR, "graph_house.json")):
+        print(f"Generating {args.candidates} candidates / {args.links or 'group'} links in {DATA_DIR}...")
+        write_dataset(DATA_DIR, args.candidates, args.links, args.seed)
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+
+    from flask_app import app, db, init_db
+
+    init_db(app)
+
+    client = app.test_client()
+    rng = random.Random(args.seed)
+    n = args.requests + args.warmup
+    url_sets = {
+        "search": lambda: search_urls(rng, args.search_requests + args.warmup),
+        "facets": lambda: facet_urls(rng, n),
+        "graph": lambda: graph_urls(rng, n),
+        "percentiles": lambda: percentile_urls(rng, n),
+    }
+
+    wanted = [s for s in args.scenarios.split(",") if s]
+    if "ingest" not in wanted:
+        wanted.insert(0, "ingest")  # the HTTP scenarios need the table loaded
+    results = {}
+    for name in wanted:
+        result = {}
+        with measured_memory(result):
+            if name == "ingest":
+                result.update(bench_ingest(app, db))
+            else:
+                result.update(run_requests(client, url_sets[name](), args.warmup))
+        results[name] = result
+        summary = (f"{result['bulk_rows_per_s']:.0f} rows/s bulk" if name == "ingest" else
+                   f"p50 {result['p50_ms']:.1f} ms  p95 {result['p95_ms']:.1f} ms  {result['req_per_s']:.1f} req/s")
+        print(f"{name:<12} {summary}  peak RSS {result['peak_rss_mb']} MB")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": git_info(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {k: getattr(args, k) for k in ("candidates", "links", "requests", "search_requests",
+                                                      "warmup", "seed", "tracemalloc")},
+        },
+        "scenarios": results,
+    }
+    path = args.report or os.path.join(ROOT, "benchmarks", "reports", f"{report['meta']['git']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Report written to {path}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Open-loop load test of the HTTP servers with weighted user sessions.
+
+Sessions arrive at random (Poisson) times so that requests average --rps,
+however slowly the server answers. Unlike a closed loop of N workers, a
+saturated server builds a queue and shows up in the tail latencies instead
+of quietly lowering the request rate. Each session runs one weighted script,
+one request after another:
+
+  browse    list page -> /api/politicians with filters -> politician page
+  graph     politician page -> its funding graph -> /api/graph -> percentiles
+  describe  politician page -> /generate_description -> politician page again
+
+Servers (--server) are started by the harness on a scratch copy of the
+database, with GEMINI_STUB=1, so description writes are real SQLite writes
+and nothing reaches Gemini:
+
+  flask        flask run (threaded), like run.py
+  gunicorn     gunicorn -c gunicorn.conf.py run:app (--workers per GUNICORN_WORKERS)
+  openballot   the FastAPI server, main.py (graph script only)
+  openballot-async   main_async.py (graph script only)
+  none         use --url as is; describe is skipped unless --allow-writes
+
+Prints achieved vs target throughput and per-endpoint p50/p95/p99, and
+optionally writes them to a JSON report.
+
+    python benchmarks/load_test.py --rps 50 --duration 30
+    python benchmarks/load_test.py --server gunicorn --rps 200 --mix browse=5,graph=3,describe=2
+    python benchmarks/load_test.py --server none --url http://127.0.0.1:5000 --rps 20
+
+Requires httpx (and uvicorn or gunicorn for those servers). The generator
+shares the CPU with the server, so leave it spare cores.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVER_DIR = os.path.join(ROOT, "flask_app", "graph", "openballot_server")
+
+STATES = ["CA", "TX", "NY", "FL", "PA", "OH", "IL", "GA", "MA", "WA"]
+PARTIES = ["DEM", "REP"]
+
+
+def pick_filters(rng):
+    params = []
+    if rng.random() < 0.5:
+        params.append(("chamber", rng.choice(["House", "Senate"])))
+    if rng.random() < 0.6:
+        params.append(("state", rng.choice(STATES)))
+    if rng.random() < 0.4:
+        params.append(("party", rng.choice(PARTIES)))
+    return "&".join(f"{k}={v}" for k, v in params)
+
+
+# A script is a list of steps; a step maps (rng, session) to (endpoint label, method, path).
+def step_list_page(rng, s):
+    return "list_politicians", "GET", "/list_politicians?" + pick_filters(rng)
+
+
+def step_api_politicians(rng, s):
+    return "api_politicians", "GET", f"/api/politicians?{pick_filters(rng)}&page={rng.choice([1, 1, 2])}"
+
+
+def step_politician(rng, s):
+    s.setdefault("candidate_id", rng.choice(s["ids"]))
+    return "politician", "GET", f"/politician/{quote(s['candidate_id'])}"
+
+
+def step_politician_graph(rng, s):
+    return "politician_graph", "GET", f"/api/politician/{quote(s['candidate_id'])}/graph"
+
+
+def step_graph(rng, s):
+    params = [("min_amount", rng.choice([0, 1000, 10000]))]
+    if rng.random() < 0.5:
+        params.append(("party", rng.choice(["D", "R"])))
+    if rng.random() < 0.5:
+        params.append(("state", rng.choice(STATES)))
+    return "graph", "GET", "/api/graph?" + "&".join(f"{k}={v}" for k, v in params)
+
+
+def step_percentiles(rng, s):
+    return "indiv_percentiles", "GET", (f"/api/indiv_percentiles?party={rng.choice(['All', 'D', 'R'])}"
+                                        f"&topn=15&rows_per_page=100")
+
+
+def step_describe(rng, s):
+    return "generate_description", "GET", f"/generate_description/{quote(s['candidate_id'])}"
+
+
+SCRIPTS = {
+    "browse": [step_list_page, step_api_politicians, step_politician],
+    "graph": [step_politician, step_politician_graph, step_graph, step_percentiles],
+    "describe": [step_politician, step_describe, step_politician],
+    # for the FastAPI server, which only serves the graph endpoints
+    "graph_api": [step_graph, step_percentiles, step_graph],
+}
+# Chamber a script's candidate is drawn from: the funding graph only has House
+# candidates, so a Senate pick would 404 and end the session early
+SCRIPT_CHAMBERS = {"graph": "House"}
+DEFAULT_MIX = "browse=6,graph=3,describe=1"
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCRIPTS:
+            raise SystemExit(f"unknown script {name!r}; choose from {', '.join(SCRIPTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def scratch_database(source, workdir):
+    """Copy the SQLite database (consistently, via the backup API) for the server under test."""
+    path = os.path.join(workdir, "loadtest.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(path)
+    with dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+    return path
+
+
+def start_server(kind, port, db_path, workers, log_path):
+    env = dict(os.environ, GEMINI_STUB="1", OPENBALLOT_ENV="production", DATABASE_URI=f"sqlite:///{db_path}")
+    env.pop("PROFILE_TOKEN", None)
+    cwd, health = ROOT, "/api/graph/health"
+    if kind == "flask":
+        cmd = [sys.executable, "-m", "flask", "--app", "flask_app", "run", "--port", str(port), "--with-threads"]
+    elif kind == "gunicorn":
+        if shutil.which("gunicorn") is None:
+            raise SystemExit("gunicorn is not installed")
+        env.update(GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_WORKERS=str(workers))
+        cmd = ["gunicorn", "-c", "gunicorn.conf.py", "run:app"]
+    else:
+        module = "main" if kind == "openballot" else "main_async"
+        cmd = [sys.executable, "-m", "uvicorn", f"{module}:app", "--port", str(port), "--log-level", "warning"]
+        cwd, health = SERVER_DIR, "/api/healthz"
+    log = open(log_path, "w")
+    proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"{kind} server exited with code {proc.returncode}; see {log_path}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}{health}", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    proc.terminate()
+    raise SystemExit(f"{kind} server did not start on port {port}")
+
+
+def fetch_candidate_ids(base):
+    """chamber (None for any) -> candidate ids, for the chambers the scripts draw from."""
+    ids = {}
+    for chamber in [None, *sorted(set(SCRIPT_CHAMBERS.values()))]:
+        query = f"&chamber={chamber}" if chamber else ""
+        r = httpx.get(f"{base}/api/politicians?per_page=500{query}", timeout=60)
+        r.raise_for_status()
+        ids[chamber] = [p["candidate_id"] for p in r.json()["politicians"]]
+        if not ids[chamber]:
+            which = f"{chamber} " if chamber else ""
+            raise SystemExit(f"the server has no {which}politicians; load data first (populate_database.py)")
+    return ids
+
+
+async def run_load(base, args, mix, ids):
+    rng = random.Random(args.seed)
+    names, weights = list(mix), list(mix.values())
+    mean_steps = sum(len(SCRIPTS[n]) * w for n, w in mix.items()) / sum(weights)
+    session_rate = args.rps / mean_steps
+
+    samples = {}  # endpoint -> [(latency, ok)]
+    counters = {"sessions": 0, "dropped": 0, "requests": 0}
+    in_flight = set()
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=args.timeout,
+                                 headers={"Accept-Encoding": "gzip, br"}) as client:
+        async def session(script, seed, measured):
+            srng = random.Random(seed)
+            state = {"ids": ids.get(SCRIPT_CHAMBERS.get(script), [])}
+            for step in SCRIPTS[script]:
+                label, method, path = step(srng, state)
+                t = time.perf_counter()
+                try:
+                    r = await client.request(method, path)
+                    await r.aread()
+                    ok = r.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if measured:
+                    samples.setdefault(label, []).append((time.perf_counter() - t, ok))
+                    counters["requests"] += 1
+                if not ok:
+                    break
+
+        start = time.perf_counter()
+        measure_from = start + args.warmup
+        stop_at = measure_from + args.duration
+        next_at = start
+        while next_at < stop_at:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            measured = next_at >= measure_from
+            if len(in_flight) >= args.max_sessions:
+                counters["dropped"] += measured
+            else:
+                script = rng.choices(names, weights)[0]
+                task = asyncio.create_task(session(script, rng.random(), measured))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                counters["sessions"] += measured
+            next_at += rng.expovariate(session_rate)
+        measured_until = time.perf_counter()
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=args.timeout)
+        drain = time.perf_counter() - measured_until
+
+    endpoints = {}
+    for label, values in sorted(samples.items()):
+        latencies = sorted(v[0] for v in values)
+        endpoints[label] = {
+            "requests": len(values),
+            "errors": sum(1 for v in values if not v[1]),
+            "req_per_s": round(len(values) / args.duration, 2),
+            "p50_ms": round(1000 * percentile(latencies, 0.50), 2),
+            "p95_ms": round(1000 * percentile(latencies, 0.95), 2),
+            "p99_ms": round(1000 * percentile(latencies, 0.99), 2),
+            "max_ms": round(1000 * latencies[-1], 2),
+        }
+    return {
+        "target_rps": args.rps,
+        "achieved_rps": round(counters["requests"] / (args.duration + drain), 2),
+        "sessions": counters["sessions"],
+        "dropped_sessions": counters["dropped"],
+        "drain_s": round(drain, 2),
+        "endpoints": endpoints,
+    }
+
+
+def print_report(result):
+    print(f"\ntarget {result['target_rps']} req/s, achieved {result['achieved_rps']} req/s  "
+          f"({result['sessions']} sessions, {result['dropped_sessions']} dropped, "
+          f"{result['drain_s']}s to drain)")
+    print(f"{'endpoint':<22} {'reqs':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, e in result["endpoints"].items():
+        print(f"{label:<22} {e['requests']:>7} {e['errors']:>7} {e['req_per_s']:>8.1f} "
+              f"{e['p50_ms']:>9.1f} {e['p95_ms']:>9.1f} {e['p99_ms']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="flask", choices=["flask", "gunicorn", "openballot", "openballot-async", "none"])
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="server to load with --server none")
+    parser.add_argument("--port", type=int, default=8111, help="port for a server the harness starts")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--database", help="SQLite file to copy for the server (default: DATABASE_URI)")
+    parser.add_argument("--rps", type=float, default=20.0, help="target requests per second (open loop)")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of load before measuring")
+    parser.add_argument("--mix", help=f"script weights (default {DEFAULT_MIX}; graph_api for openballot)")
+    parser.add_argument("--stub-latency", type=float, default=1.0, help="seconds per stubbed Gemini call")
+    parser.add_argument("--allow-writes", action="store_true", help="run describe against a --server none URL")
+    parser.add_argument("--max-sessions", type=int, default=2000, help="in-flight sessions before dropping arrivals")
+    parser.add_argument("--max-connections", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "openballot-bench"))
+    parser.add_argument("--report", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    graph_only = args.server.startswith("openballot")
+    mix = parse_mix(args.mix or ("graph_api=1" if graph_only else DEFAULT_MIX))
+    if args.server == "none" and "describe" in mix and not args.allow_writes:
+        print("Skipping describe: it writes descriptions to the target's database (pass --allow-writes)")
+        mix.pop("describe")
+    if not mix:
+        raise SystemExit("no scripts to run")
+
+    proc = None
+    base = args.url.rstrip("/")
+    if args.server != "none":
+        os.makedirs(args.workdir, exist_ok=True)
+        os.environ["GEMINI_STUB_LATENCY"] = str(args.stub_latency)
+        source = args.database
+        if source is None and not graph_only:
+            uri = os.getenv("DATABASE_URI", "")
+            if not uri.startswith("sqlite:///"):
+                raise SystemExit("set --database or a sqlite:/// DATABASE_URI to copy")
+            source = uri[len("sqlite:///"):]
+        db_path = scratch_database(source, args.workdir) if source else os.path.join(args.workdir, "loadtest.db")
+        print(f"Starting {args.server} on port {args.port}...")
+        proc = start_server(args.server, args.port, db_path, args.workers, os.path.join(args.workdir, "server.log"))
+        base = f"http://127.0.0.1:{args.port}"
+
+    try:
+        ids = {} if graph_only else fetch_candidate_ids(base)
+        print(f"Loading {base} at {args.rps} req/s for {args.warmup}s warmup + {args.duration}s "
+              f"(mix {', '.join(f'{k}={v:g}' for k, v in mix.items())})")
+        result = asyncio.run(run_load(base, args, mix, ids))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print_report(result)
+    if args.report:
+        result["params"] = {k: getattr(args, k) for k in ("server", "rps", "duration", "warmup", "stub_latency",
+                                                          "seed", "workers")}
+        result["params"]["mix"] = mix
+        with open(args.report, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Synthetic FEC-style data files for benchmarks and offline testing.
+
+candidates: CSV with the same columns as
+flask_app/new_data/house_candidates_indiv_percentiles.csv.
+dataset: a directory laid out like flask_app/new_data (house and senate
+candidate CSVs) plus a graph JSON in the graph_house.json schema built from
+the same candidates, optionally padded with committee links up to --links.
+itcont: pipe-delimited itemized individual contributions (itcont.txt), plus
+the ccl.txt linkage and cm.txt committee master files next to it, linking
+committees to real candidate ids from flask_app/new_data.
+
+Output is deterministic for a given seed.
+
+    python benchmarks/synthetic.py --rows 100000 --output /tmp/candidates_100k.csv
+    python benchmarks/synthetic.py --kind itcont --rows 5000000 --output /tmp/fec/itcont.txt
+    python benchmarks/synthetic.py --kind dataset --rows 1000000 --links 10000000 --output /tmp/ob_1m
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+
+CANDIDATE_COLUMNS = [
+    "CAND_ID", "CAND_NAME", "CAND_ICI", "CAND_PTY_AFFILIATION", "TTL_RECEIPTS", "DEBTS_OWED_BY",
+    "TTL_INDIV_CONTRIB", "CAND_OFFICE_ST", "CAND_OFFICE_DISTRICT", "OTHER_POL_CMTE_CONTRIB",
+    "POL_PTY_CONTRIB", "CVG_END_DT", "INDIV_REFUNDS", "CMTE_REFUNDS", "PCT_INDIV_CONTRIB",
+    "PAC_Contribution_%", "Party_Contribution_%", "Adj_Party_Contrib", "Adj_PAC_Contrib",
+    "Pct_Individual", "Funding_Group", "Individual_Pctile_All", "Individual_Pctile_Bin",
+]
+
+STATES = [
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS",
+    "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY",
+    "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV",
+    "WI", "WY",
+]
+PARTIES = ["DEM"] * 45 + ["REP"] * 45 + ["LIB", "GRE", "IND", "NNE", "UNK"] * 2
+LAST_NAMES = ["SMITH", "JOHNSON", "WILLIAMS", "BROWN", "JONES", "GARCIA", "MILLER", "DAVIS",
+              "RODRIGUEZ", "MARTINEZ", "HERNANDEZ", "LOPEZ", "WILSON", "ANDERSON", "THOMAS", "TAYLOR"]
+FIRST_NAMES = ["JAMES", "MARY", "ROBERT", "PATRICIA", "JOHN", "JENNIFER", "MICHAEL", "LINDA",
+               "DAVID", "ELIZABETH", "WILLIAM", "BARBARA", "RICHARD", "SUSAN", "JOSEPH", "JESSICA"]
+
+
+def funding_group(receipts):
+    # Same buckets and labels as flask_app/funding_metrics.FUNDING_GROUPS
+    if receipts < 100_000:
+        return "<$100K"
+    if receipts < 1_000_000:
+        return "$100K–$1M"
+    if receipts < 5_000_000:
+        return "$1M–$5M"
+    if receipts < 10_000_000:
+        return "$5M–$10M"
+    return ">$10M"
+
+
+def candidate_rows(n, seed=0):
+    """Yield n candidate rows as lists in CANDIDATE_COLUMNS order."""
+    rng = random.Random(seed)
+    for i in range(n):
+        chamber = "H" if rng.random() < 0.85 else "S"
+        state = rng.choice(STATES)
+        receipts = round(rng.lognormvariate(11, 2), 2)
+        share = rng.random()
+        indiv = round(receipts * share, 2)
+        pac = round((receipts - indiv) * rng.random(), 2)
+        party_c = round((receipts - indiv - pac) * rng.random(), 2)
+        pct = round(100.0 * indiv / receipts, 4) if receipts else 0.0
+        yield [
+            f"{chamber}{i:08d}",
+            f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)} {chr(65 + i % 26)}.",
+            rng.choice("ICO"),
+            rng.choice(PARTIES),
+            receipts,
+            round(rng.random() * receipts * 0.2, 2) if rng.random() < 0.3 else 0.0,
+            indiv,
+            state,
+            float(rng.randint(0, 52)) if chamber == "H" else 0.0,
+            pac,
+            party_c,
+            f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2024",
+            round(rng.random() * 1000, 2) if rng.random() < 0.1 else 0.0,
+            0.0,
+            pct,
+            round(100.0 * pac / receipts, 4) if receipts else 0.0,
+            round(100.0 * party_c / receipts, 4) if receipts else 0.0,
+            party_c,
+            pac,
+            pct,
+            funding_group(receipts),
+            round(100.0 * rng.random(), 6),
+            round(100.0 * rng.random(), 6),
+        ]
+
+
+def write_candidates_csv(path, n, seed=0):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(CANDIDATE_COLUMNS)
+        w.writerows(candidate_rows(n, seed))
+    return path
+
+
+NEW_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flask_app", "new_data")
+CANDIDATE_ID_FILES = ["house_candidates_indiv_percentiles.csv", "senate_candidates_indiv_percentiles.csv"]
+OCCUPATIONS = ["RETIRED", "NOT EMPLOYED", "ATTORNEY", "PHYSICIAN", "ENGINEER", "TEACHER", "CONSULTANT", "OWNER"]
+
+
+def real_candidate_ids():
+    """Candidate ids from the new_data CSVs, so synthetic contributions join to the Politician table."""
+    ids = []
+    for name in CANDIDATE_ID_FILES:
+        path = os.path.join(NEW_DATA_DIR, name)
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                ids.extend(r["CAND_ID"] for r in csv.DictReader(f) if r.get("CAND_ID"))
+    return ids
+
+
+def write_fec_linkage(directory, n_committees, candidate_ids, seed=0):
+    """Write ccl.txt and cm.txt for committees C00000001.. and return the committee ids."""
+    rng = random.Random(seed)
+    committees = [f"C{i:08d}" for i in range(1, n_committees + 1)]
+    with open(os.path.join(directory, "ccl.txt"), "w", encoding="latin-1") as ccl, \
+            open(os.path.join(directory, "cm.txt"), "w", encoding="latin-1") as cm:
+        for i, cmte in enumerate(committees):
+            # ~85% principal campaign committees; the rest are PACs with no linked candidate
+            cand = rng.choice(candidate_ids) if candidate_ids and rng.random() < 0.85 else ""
+            if cand:
+                ccl.write(f"{cand}|2024|2024|{cmte}|{cand[0]}|P|{100000 + i}\n")
+            name = f"{rng.choice(LAST_NAMES)} FOR {'CONGRESS' if cand else 'AMERICA PAC'}"
+            cm.write(f"{cmte}|{name}|TREASURER|1 MAIN ST||CITY|{rng.choice(STATES)}|00000|P|"
+                     f"{cand[:1] or 'Q'}|{rng.choice(PARTIES)}|Q|||{cand}\n")
+    return committees
+
+
+def itcont_lines(n, committees, seed=0):
+    """Yield n itcont.txt lines; ~5% are memo entries and amounts are lognormal with a few refunds."""
+    rng = random.Random(seed)
+    for i in range(n):
+        amount = int(rng.lognormvariate(4.5, 1.3)) + 1
+        if rng.random() < 0.01:
+            amount = -amount
+        memo = "X" if rng.random() < 0.05 else ""
+        yield (f"{rng.choice(committees)}|N|Q3|P2024|2024{i:014d}|15|IND|"
+               f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}|CITY|{rng.choice(STATES)}|00000|"
+               f"EMPLOYER|{rng.choice(OCCUPATIONS)}|{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}2024|"
+               f"{amount}||SA{i}|1000{i % 1000}|{memo}||{4000000000 + i}\n")
+
+
+def write_itcont(path, n, n_committees=2000, seed=0):
+    """Write itcont.txt with n rows, plus ccl.txt and cm.txt in the same directory."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    committees = write_fec_linkage(directory, n_committees, real_candidate_ids(), seed)
+    with open(path, "w", encoding="latin-1") as f:
+        f.writelines(itcont_lines(n, committees, seed))
+    return path
+
+
+HOUSE_CSV = "house_candidates_indiv_percentiles.csv"
+SENATE_CSV = "senate_candidates_indiv_percentiles.csv"
+GRAPH_JSON = "graph_house.json"
+FUNDING_GROUP_NODES = [
+    {"id": "grp_indiv", "type": "FundingGroup", "name": "Individuals", "issues": ["General"]},
+    {"id": "grp_pac", "type": "FundingGroup", "name": "PACs/Committees", "issues": ["General"]},
+    {"id": "grp_party", "type": "FundingGroup", "name": "Party Committees", "issues": ["General"]},
+]
+# Candidate CSV column -> funding group it donates through (see flask_app/graph_builder.EDGE_SOURCES)
+EDGE_COLUMNS = [("grp_indiv", "TTL_INDIV_CONTRIB"), ("grp_pac", "OTHER_POL_CMTE_CONTRIB"),
+                ("grp_party", "POL_PTY_CONTRIB")]
+SLIM_PARTY = {"DEM": "D", "REP": "R"}
+
+
+def write_graph_json(path, rows, n_links=0, seed=0):
+    """
+    Write a graph in the graph_house.json schema for candidate rows (lists in
+    CANDIDATE_COLUMNS order): funding-group -> politician donation links for
+    every positive amount, then committee -> politician links until there are
+    n_links in total. Nodes and links are streamed to the file, so 10M links
+    do not have to fit in memory as dicts. Returns (nodes, links) written.
+    """
+    rng = random.Random(seed)
+    col = {c: i for i, c in enumerate(CANDIDATE_COLUMNS)}
+    tmp = path + ".tmp"
+    n_nodes = n_written = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        meta = {"app": "OpenBallot", "source": "synthetic", "n_candidates": len(rows), "currency": "USD",
+                "chambers": ["House", "Senate"], "note": "Synthetic funding mix → Politician."}
+        f.write('{"meta": %s, "nodes": [\n' % json.dumps(meta, ensure_ascii=False))
+        politicians = []
+        for node in FUNDING_GROUP_NODES:
+            f.write(("" if n_nodes == 0 else ",\n") + json.dumps(node))
+            n_nodes += 1
+        for r in rows:
+            pid = f"pol_{r[col['CAND_ID']]}"
+            politicians.append(pid)
+            f.write(",\n" + json.dumps({
+                "id": pid, "type": "Politician", "name": r[col["CAND_NAME"]], "state": r[col["CAND_OFFICE_ST"]],
+                "party": SLIM_PARTY.get(r[col["CAND_PTY_AFFILIATION"]], "Other"),
+                "chamber": "House" if r[col["CAND_ID"]].startswith("H") else "Senate",
+                "indiv_pctile": r[col["Individual_Pctile_All"]],
+            }, ensure_ascii=False))
+            n_nodes += 1
+        group_links = sum(1 for r in rows for _, c in EDGE_COLUMNS if float(r[col[c]]) > 0)
+        extra = max(0, n_links - group_links)
+        n_committees = min(max(1, len(rows) // 2), extra) if extra else 0
+        for i in range(n_committees):
+            f.write(",\n" + json.dumps({"id": f"cmte_C{i:08d}", "type": "Committee",
+                                        "name": f"{rng.choice(LAST_NAMES)} FOR CONGRESS"}))
+            n_nodes += 1
+        f.write("\n], \"links\": [\n")
+        for r in rows:
+            pid = f"pol_{r[col['CAND_ID']]}"
+            for source, c in EDGE_COLUMNS:
+                amount = float(r[col[c]])
+                if amount > 0:
+                    f.write(("" if n_written == 0 else ",\n") + json.dumps(
+                        {"source": source, "target": pid, "type": "donation", "amount": amount}))
+                    n_written += 1
+        for i in range(extra):
+            f.write(("" if n_written == 0 else ",\n") + json.dumps({
+                "source": f"cmte_C{i % n_committees:08d}", "target": rng.choice(politicians),
+                "type": "donation", "amount": float(int(rng.lognormvariate(8, 1.5)) + 1)}))
+            n_written += 1
+        f.write("\n]}\n")
+    os.replace(tmp, path)
+    return n_nodes, n_written
+
+
+def write_dataset(directory, n, n_links=0, seed=0):
+    """
+    Write a synthetic new_data-style directory: HOUSE_CSV and SENATE_CSV
+    (candidates split by chamber) and GRAPH_JSON for the same candidates.
+    Returns the paths {"house": ..., "senate": ..., "graph": ...}.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rows = list(candidate_rows(n, seed))
+    paths = {"house": os.path.join(directory, HOUSE_CSV), "senate": os.path.join(directory, SENATE_CSV),
+             "graph": os.path.join(directory, GRAPH_JSON)}
+    for key, prefix in (("house", "H"), ("senate", "S")):
+        with open(paths[key], "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(CANDIDATE_COLUMNS)
+            w.writerows(r for r in rows if r[0].startswith(prefix))
+    write_graph_json(paths["graph"], rows, n_links, seed)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kind", choices=["candidates", "itcont", "dataset"], default="candidates")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--committees", type=int, default=2000, help="itcont: number of committees")
+    parser.add_argument("--links", type=int, default=0,
+                        help="dataset: total graph links, padded with committee links (default: group links only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+    if args.kind == "dataset":
+        paths = write_dataset(args.output, args.rows, args.links, args.seed)
+        print(f"Wrote {args.rows} candidates to {paths['house']} and {paths['senate']}, graph to {paths['graph']}")
+    elif args.kind == "itcont":
+        write_itcont(args.output, args.rows, args.committees, args.seed)
+        print(f"Wrote {args.rows} rows to {args.output} (+ ccl.txt, cm.txt)")
+    else:
+        write_candidates_csv(args.output, args.rows, args.seed)
+        print(f"Wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
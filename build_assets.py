@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Script to build the production static assets: content-hashed copies of
+flask_app/static/ in flask_app/static/dist/, their .gz/.br variants and
+manifest.json. Run it on every deploy, before starting the app; templates pick
+the hashed URLs up through asset_url() (see flask_app/assets.py).
+
+    python build_assets.py
+"""
+
+import os
+import time
+
+from flask_app import assets
+
+
+def main():
+    start = time.perf_counter()
+    manifest = assets.build()
+    elapsed = time.perf_counter() - start
+
+    print(f"Built {len(manifest)} assets into {assets.DIST_DIR}")
+    for logical, target in sorted(manifest.items()):
+        size = os.path.getsize(os.path.join(assets.DIST_DIR, target))
+        variants = [
+            f"{suffix[1:]} {os.path.getsize(os.path.join(assets.DIST_DIR, target + suffix))}"
+            for _, suffix in assets.ENCODINGS
+            if os.path.exists(os.path.join(assets.DIST_DIR, target + suffix))
+        ]
+        print(f"  - {logical} -> {target} ({size} bytes{', ' + ', '.join(variants) if variants else ''})")
+    if assets.brotli is None:
+        print("brotli is not installed: only gzip variants were written")
+    print(f"Completed in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
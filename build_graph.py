@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script to (re)build a cycle's graph JSON from the Politician table.
+Only candidates whose funding fields changed since the last build are recomputed;
+pass --full to ignore the previous graph and rebuild everything. Committee edges
+from the contribution table (ingest_contributions.py) are added when present.
+"""
+
+import argparse
+import time
+
+from flask_app import app, db
+from flask_app.datasets import DEFAULT_CYCLE, graph_path_for
+from flask_app.graph_builder import GRAPH_FIELDS, add_committee_edges, build_graph, load_previous, write_graph
+from flask_app.models import Contribution, Politician
+
+CONTRIBUTION_FIELDS = ["committee_id", "committee_name", "candidate_id", "total_amount"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cycle", type=int, default=DEFAULT_CYCLE, help="election cycle to build (default: %(default)s)")
+    parser.add_argument("--output", help="graph JSON to write (default: the cycle's graph file)")
+    parser.add_argument("--full", action="store_true", help="ignore the previous graph and rebuild everything")
+    parser.add_argument("--committees-per-candidate", type=int, default=5,
+                        help="largest contributing committees linked to each candidate (0 to skip; default: %(default)s)")
+    args = parser.parse_args()
+    args.output = args.output or graph_path_for(args.cycle)
+
+    start = time.perf_counter()
+    previous, previous_fps = ({"nodes": [], "links": []}, {}) if args.full else load_previous(args.output)
+
+    with app.app_context():
+        columns = [getattr(Politician, f) for f in GRAPH_FIELDS]
+        rows = [dict(zip(GRAPH_FIELDS, r)) for r in db.session.query(*columns)
+                .filter(Politician.cycle == args.cycle).order_by(Politician.id)]
+        contributions = []
+        if args.committees_per_candidate > 0:
+            columns = [getattr(Contribution, f) for f in CONTRIBUTION_FIELDS]
+            contributions = [dict(zip(CONTRIBUTION_FIELDS, r)) for r in db.session.query(*columns)
+                             .filter(Contribution.cycle == args.cycle)]
+
+    graph, fps, stats = build_graph(rows, previous, previous_fps)
+    committee_links = add_committee_edges(graph, contributions, args.committees_per_candidate) if contributions else 0
+    write_graph(args.output, graph, fps)
+
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.output}: {len(graph['nodes'])} nodes, {len(graph['links'])} links")
+    print(f"  - added: {stats['added']}")
+    print(f"  - changed: {stats['changed']}")
+    print(f"  - unchanged: {stats['unchanged']}")
+    print(f"  - removed: {stats['removed']}")
+    print(f"  - committee links: {committee_links}")
+    print(f"Completed in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,56 @@
-import google.generativeai as genai
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+import threading
 import time
+from types import SimpleNamespace
+
+from .metrics import timed_gemini_call
 
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
-# Create a datetime object for today
-today = datetime.today()
+# GEMINI_STUB=1 swaps in a canned model (no API key, no network) so load tests
+# can hit /generate_description; GEMINI_STUB_LATENCY is its delay in seconds.
+GEMINI_STUB = os.getenv('GEMINI_STUB', '').lower() not in ('', '0', 'false', 'no')
+GEMINI_STUB_LATENCY = float(os.getenv('GEMINI_STUB_LATENCY', 1.0))
+
+
+class StubModel:
+    """Stand-in for GenerativeModel: waits like a real call, returns fixed HTML."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return SimpleNamespace(text="<ul><li>Stub description (GEMINI_STUB is set).</li></ul>")
 
-# Convert to string
-today_str = today.strftime("%Y-%m-%d %H:%M:%S")
-print(today_str)
 
+def load_sdk():
+    """Import google.generativeai (about a second) on first use rather than with the app."""
+    import google.generativeai as genai
+    return genai
 
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("models/gemini-pro-latest")
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """The Gemini model (or the stub), configured on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                if GEMINI_STUB:
+                    _model = StubModel(GEMINI_STUB_LATENCY)
+                else:
+                    genai = load_sdk()
+                    genai.configure(api_key=GEMINI_API_KEY)
+                    _model = genai.GenerativeModel("models/gemini-pro-latest")
+    return _model
 
 def describe_politician(name, website_url=None):
     if website_url:
@@ -29,7 +62,8 @@ Return ONLY the HTML code with <ul> and <li> tags. Do not include markdown forma
 
 Return ONLY the HTML code with <ul> and <li> tags. Do not include markdown formatting, code blocks, or any other text. Just the raw HTML."""
     
-    response = model.generate_content(prompt)
+    with timed_gemini_call('describe_politician'):
+        response = get_model().generate_content(prompt)
     # Clean up the response to remove any markdown formatting
     text = response.text.strip()
     if text.startswith('```html'):
@@ -40,10 +74,12 @@ Return ONLY the HTML code with <ul> and <li> tags. Do not include markdown forma
         text = text[:-3]
     return text.strip()
 
-def upcoming_elections(location,today=today_str):
-    
-    prompt = f"Give a comprehensive list of all elections within 10 miles radius of {location} ocurring up until 6 months after {today_str}. Please list only the date of the election and what the election is for"
-    response = model.generate_content(prompt)
+def upcoming_elections(location, today=None):
+    if today is None:
+        today = datetime.today().strftime("%Y-%m-%d %H:%M:%S")
+    prompt = f"Give a comprehensive list of all elections within 10 miles radius of {location} ocurring up until 6 months after {today}. Please list only the date of the election and what the election is for"
+    with timed_gemini_call('upcoming_elections'):
+        response = get_model().generate_content(prompt)
     return response.text
 
 # Comment out the test call to prevent it from running on import
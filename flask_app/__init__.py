@@ -1,59 +1,183 @@
 """
-Flask application initialization and configuration.
-Sets up the Flask app, configuration, template filters, and imports all route modules.
+Flask application factory and shared extensions.
+
+create_app() builds a configured app: hooks, database engine and the route
+blueprints. Importing the package does no more than define the extensions, so
+CLI scripts and workers start quickly:
+  - the schema is not created at import, and Flask-Migrate (alembic) is only
+    set up for the `flask` CLI; run `flask --app flask_app init-db`
+    (or call init_db()) for a new database, then `flask db upgrade`
+  - the Gemini SDK is imported on the first description request
+  - the graph and percentile datasets and the analytics sketches load on
+    first use, or up front via warm_up() (gunicorn.conf.py does this in the
+    master before forking)
+
+`from flask_app import app` still works: the default app is created on first
+access to that name. Startup times are exported at /metrics
+(openballot_startup_seconds) and measured by benchmarks/bench_startup.py.
 """
 
+import time
+
+_import_started = time.perf_counter()
+
+import os
+import sys
+import threading
+
+import click
+from dotenv import load_dotenv
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
-from flask_migrate import Migrate
-
-from dotenv import load_dotenv
-import os
-import json
 
 # Load environment variables
 load_dotenv()
 SECRET_KEY = os.getenv('SECRET_KEY')
 
-# Initialize Flask application
-app = Flask(__name__)
-app.secret_key = SECRET_KEY
-
-# Add CORS headers for API access
-@app.after_request
-def after_request(response):
-    response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE')
-    return response
-
-# Development settings to prevent browser caching and enable auto-reload
-app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
-app.config['TEMPLATES_AUTO_RELOAD'] = True
-
 
 class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
-migrate = Migrate(app, db)
-
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI')
-
-db.init_app(app)
-
-from .models import *
-
-with app.app_context():
-    db.create_all()
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
 
+from . import metrics
+
+# phase -> seconds, read by /metrics
+STARTUP_SECONDS = {}
 
 
-# Import database setup
-# from database import database_setup
+def create_app(database_uri=None) -> Flask:
+    """Build the app; `database_uri` defaults to DATABASE_URI."""
+    started = time.perf_counter()
+    app = Flask(__name__)
+    app.secret_key = SECRET_KEY
+
+    # Add CORS headers for API access
+    @app.after_request
+    def after_request(response):
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE')
+        return response
+
+    # Per-request cProfile + SQL capture, only when PROFILE_TOKEN is set; registered
+    # first so it wraps every other hook. See profiling.py
+    from . import profiling
+    profiling.init_app(app)
 
-# Import all route modules
-from . import routes
-from . import politician_routes
-from . import graph_api
\ No newline at end of file
+    # Route latency, SQL and cache metrics at /metrics; registered first so its
+    # after_request hook runs last and times compression too. See metrics.py
+    metrics.init_app(app)
+
+    # OPENBALLOT_ENV=development keeps browser caching off and templates auto-reloading;
+    # production (default) serves fingerprinted, precompressed assets. See assets.py
+    from . import assets
+    assets.init_app(app)
+
+    # gzip/brotli/zstd for JSON and HTML responses; see compression.py
+    from . import compression
+    compression.init_app(app)
+
+    # Engine options (pooling, SQLite WAL + pragmas) come from DB_ENGINE_PROFILE; see db_engine.py
+    from .db_engine import configure_app, init_engine
+    configure_app(app, database_uri or os.getenv('DATABASE_URI'))
+    db.init_app(app)
+    init_engine(app, db)
+    if os.getenv('FLASK_RUN_FROM_CLI'):
+        # `flask db ...` needs Flask-Migrate; alembic is a slow import, so only then
+        init_migrate(app)
+
+    from . import models  # noqa: F401  (registers the tables on db.metadata)
+
+    # Route modules
+    from . import analytics_api, graph_api, politician_routes, routes
+    app.register_blueprint(routes.bp)
+    app.register_blueprint(politician_routes.bp)
+    app.register_blueprint(graph_api.bp)
+    app.register_blueprint(analytics_api.bp)
+
+    app.cli.add_command(init_db_command)
+    STARTUP_SECONDS['create_app'] = time.perf_counter() - started
+    return app
+
+
+def init_migrate(app) -> None:
+    """Register Flask-Migrate on the app (once)."""
+    from flask_migrate import Migrate
+
+    if 'migrate' not in app.extensions:
+        Migrate(app, db, directory=MIGRATIONS_DIR)
+
+
+def init_db(app=None) -> None:
+    """
+    Create any missing tables (existing ones are left alone). An empty database
+    gets the current schema, so it is stamped as up to date for `flask db upgrade`.
+    """
+    from flask_migrate import stamp
+    from sqlalchemy import inspect
+
+    from . import models  # noqa: F401
+
+    app = app or sys.modules[__name__].app  # module __getattr__ creates the default app
+    init_migrate(app)
+    with app.app_context():
+        new = not inspect(db.engine).get_table_names()
+        db.create_all()
+        if new:
+            stamp()
+
+
+@click.command('init-db')
+def init_db_command():
+    """Create any missing tables for a new database."""
+    from flask import current_app
+
+    init_db(current_app)
+    click.echo('Database tables ready.')
+
+
+def warm_up(freeze: bool = False, app=None) -> None:
+    """
+    Load the datasets, the analytics sketches and the Gemini SDK now instead of
+    on the first requests that need them. `app` defaults to flask_app.app.
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+
+    from . import Gemini_API, analytics_api, datasets
+
+    started = time.perf_counter()
+    if not Gemini_API.GEMINI_STUB:
+        Gemini_API.load_sdk()
+    app = app or sys.modules[__name__].app
+    with app.app_context():
+        try:
+            analytics_api.get_sketch_index()
+        except SQLAlchemyError as e:  # e.g. a new database before init-db
+            print(f"Skipping analytics warm-up: {e}")
+        db.session.remove()
+        # No pooled connections may be inherited by forked workers
+        db.engine.dispose()
+    datasets.preload(freeze=freeze)
+    STARTUP_SECONDS['warm_up'] = time.perf_counter() - started
+
+
+_app_lock = threading.Lock()
+
+
+def __getattr__(name):
+    # The default app, created on first use of flask_app.app
+    if name != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _app_lock:
+        if 'app' not in globals():
+            globals()['app'] = create_app()
+    return globals()['app']
+
+
+STARTUP_SECONDS['import'] = time.perf_counter() - _import_started
+metrics.register(metrics.CallbackGauge(
+    'openballot_startup_seconds', 'Time spent starting this process, by phase (import, create_app, warm_up).',
+    ('phase',), lambda: [((phase,), seconds) for phase, seconds in sorted(STARTUP_SECONDS.items())]))
@@ -0,0 +1,161 @@
+"""
+Analytics API endpoints.
+Serves quantiles and histograms for numeric Politician columns from per-group
+t-digest sketches, so any filter combination is answered by merging sketches.
+The sketches are built once per cycle (at startup by warm_up, or on first use)
+and again only after an ingest; requests never read the raw rows.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from flask import Blueprint, jsonify, request
+from sqlalchemy import Float
+
+from .datasets import DEFAULT_CYCLE
+from .db_engine import read_session
+from .facets import facet_version
+from .models import Politician
+from .sketches import TDigest
+
+bp = Blueprint('analytics_api', __name__)
+
+DEFAULT_QUANTILES = [0.1, 0.5, 0.9, 0.99]
+DEFAULT_BINS = 20
+MAX_BINS = 200
+
+NUMERIC_COLUMNS = [c.name for c in Politician.__table__.columns if isinstance(c.type, Float)]
+
+# Filter/group dimensions -> Politician column
+DIMENSIONS = {
+    "chamber": "chamber",
+    "state": "office_state",
+    "party": "political_party_affiliation",
+}
+DIMENSION_ORDER = ["chamber", "state", "party"]
+
+GroupKey = Tuple[str, str, str]
+
+
+class SketchIndex:
+    """One TDigest per (chamber, state, party) group and numeric column."""
+
+    def __init__(self, sketches: Dict[str, Dict[GroupKey, TDigest]]):
+        self.sketches = sketches
+
+    @property
+    def empty(self) -> bool:
+        return not any(self.sketches.values())
+
+    @classmethod
+    def build(cls, cycle: int) -> "SketchIndex":
+        dims = [getattr(Politician, DIMENSIONS[d]) for d in DIMENSION_ORDER]
+        cols = [getattr(Politician, c) for c in NUMERIC_COLUMNS]
+        rows = read_session().query(*dims, *cols).filter(Politician.cycle == cycle).all()
+
+        keys = [tuple(r[:len(dims)]) for r in rows]
+        values = np.array([r[len(dims):] for r in rows], dtype=np.float64).reshape(len(rows), len(cols))
+
+        groups: Dict[GroupKey, List[int]] = {}
+        for i, k in enumerate(keys):
+            groups.setdefault(k, []).append(i)
+
+        sketches: Dict[str, Dict[GroupKey, TDigest]] = {c: {} for c in NUMERIC_COLUMNS}
+        for k, idx in groups.items():
+            sub = values[idx]
+            for j, c in enumerate(NUMERIC_COLUMNS):
+                sketches[c][k] = TDigest.from_values(sub[:, j])
+        return cls(sketches)
+
+    def grouped(self, column: str, filters: Dict[str, List[str]],
+                group_by: Optional[str]) -> Dict[str, TDigest]:
+        """Merge the sketches matching `filters`, one merged sketch per `group_by` value."""
+        buckets: Dict[str, List[TDigest]] = {}
+        for key, digest in self.sketches[column].items():
+            if any(values and key[DIMENSION_ORDER.index(d)] not in values for d, values in filters.items()):
+                continue
+            label = key[DIMENSION_ORDER.index(group_by)] if group_by else "all"
+            buckets.setdefault(label or "", []).append(digest)
+        return {label: TDigest.merge_all(ds) for label, ds in buckets.items()}
+
+
+# cycle -> (facet_version when built, index)
+_indexes: Dict[int, Tuple[Any, SketchIndex]] = {}
+_index_lock = threading.Lock()
+
+
+def get_sketch_index(cycle: int = DEFAULT_CYCLE) -> Optional[SketchIndex]:
+    """
+    A cycle's sketch index, built on first use (or by warm_up) and rebuilt only
+    after an ingest, which runs in another process and bumps the cycle's
+    facet_count refresh time. None if the cycle has no rows.
+    """
+    version = facet_version(read_session(), cycle)
+    cached = _indexes.get(cycle)
+    if cached is None or cached[0] != version:
+        with _index_lock:
+            cached = _indexes.get(cycle)
+            if cached is None or cached[0] != version:
+                index = SketchIndex.build(cycle)
+                if index.empty:
+                    return None
+                cached = _indexes[cycle] = (version, index)
+    return cached[1]
+
+
+def _parse_quantiles(raw: Optional[str]) -> List[float]:
+    if not raw:
+        return list(DEFAULT_QUANTILES)
+    qs = []
+    for part in raw.split(","):
+        part = part.strip().lower()
+        q = float(part[1:]) / 100 if part.startswith("p") else float(part)
+        if not 0.0 <= q <= 1.0:
+            raise ValueError(part)
+        qs.append(q)
+    return qs
+
+
+@bp.route('/api/analytics/quantiles')
+def analytics_quantiles():
+    """Quantiles and histograms of a numeric Politician column, optionally grouped."""
+    column = request.args.get('column', 'total_receipts')
+    group_by = request.args.get('group_by') or None
+    cycle = request.args.get('cycle', DEFAULT_CYCLE, type=int)
+    filters = {d: request.args.getlist(d) for d in DIMENSION_ORDER}
+
+    if column not in NUMERIC_COLUMNS:
+        return jsonify({'error': f'column must be one of {", ".join(NUMERIC_COLUMNS)}'}), 400
+    if group_by is not None and group_by not in DIMENSIONS:
+        return jsonify({'error': f'group_by must be one of {", ".join(DIMENSION_ORDER)}'}), 400
+    try:
+        qs = _parse_quantiles(request.args.get('q'))
+        bins = int(request.args.get('bins', DEFAULT_BINS))
+    except ValueError:
+        return jsonify({'error': 'q must be comma-separated quantiles in [0, 1] or p0-p100; bins must be an integer'}), 400
+    if not 0 <= bins <= MAX_BINS:
+        return jsonify({'error': f'bins must be between 0 and {MAX_BINS}'}), 400
+
+    index = get_sketch_index(cycle)
+    if index is None:
+        return jsonify({'error': f'No data for cycle {cycle}'}), 404
+    groups = index.grouped(column, filters, group_by)
+    overall = TDigest.merge_all(groups.values())
+
+    # Shared bin edges across groups so histograms are comparable.
+    edges = None
+    if bins and overall.n:
+        edges = np.linspace(overall.min, overall.max, bins + 1)
+
+    return jsonify({
+        'column': column,
+        'cycle': cycle,
+        'group_by': group_by,
+        'filters': filters,
+        'overall': overall.summary(qs, edges),
+        'groups': [
+            {'group': label, **digest.summary(qs, edges)}
+            for label, digest in sorted(groups.items(), key=lambda kv: -kv[1].n)
+        ],
+    })
@@ -0,0 +1,157 @@
+"""
+Static asset pipeline: content-hashed URLs, precompressed variants and
+long-lived caching.
+
+build_assets.py copies every file under static/ to static/dist/ with a content
+hash in its name (css/politician-graph.css -> css/politician-graph.3f2a9c1b7e04.css),
+writes .gz (and .br, if the brotli package is installed) variants next to each
+copy, and records the mapping in static/dist/manifest.json.
+
+Templates link assets with asset_url('css/politician-graph.css'). In production
+mode that resolves through the manifest to /static/dist/..., which is served
+with a one-year immutable Cache-Control and the best precompressed variant the
+client accepts; a changed file gets a new hash, so a new URL. Without a manifest
+(or in development mode) asset_url is plain url_for('static', ...).
+
+OPENBALLOT_ENV selects the mode:
+  - production (default): manifest URLs, Flask's default static caching,
+    templates and the /network pages read from disk once.
+  - development: no browser caching, templates auto-reload, files re-read on
+    every request.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from typing import Dict, Optional
+
+from flask import abort, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # optional; gzip variants are always built
+    brotli = None
+
+ENV = os.getenv('OPENBALLOT_ENV', 'production')
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+DIST_DIRNAME = 'dist'
+DIST_DIR = os.path.join(STATIC_DIR, DIST_DIRNAME)
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+HASH_LENGTH = 12
+# Already-compressed formats gain nothing from another pass
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.json', '.svg', '.html', '.txt', '.map', '.xml'}
+# Served in order of preference when the client accepts them
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def is_development() -> bool:
+    return ENV == 'development'
+
+
+def fingerprinted_name(path: str, data: bytes) -> str:
+    """css/app.css -> css/app.<content hash>.css"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def build(static_dir: str = STATIC_DIR, dist_dir: str = DIST_DIR) -> Dict[str, str]:
+    """
+    (Re)build dist_dir from static_dir: fingerprinted copies, .gz/.br variants of
+    compressible files and manifest.json. Returns the manifest (logical path ->
+    fingerprinted path, both relative to the dist root).
+    """
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist_dir and not d.startswith('.'))
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            src = os.path.join(root, name)
+            logical = os.path.relpath(src, static_dir).replace(os.sep, '/')
+            with open(src, 'rb') as f:
+                data = f.read()
+            target = fingerprinted_name(logical, data)
+            dest = os.path.join(dist_dir, target)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            with open(dest, 'wb') as f:
+                f.write(data)
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                with open(dest + '.gz', 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    with open(dest + '.br', 'wb') as f:
+                        f.write(brotli.compress(data, quality=11))
+            manifest[logical] = target
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(os.path.join(dist_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, str]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+_manifest: Optional[Dict[str, str]] = None
+
+
+def manifest() -> Dict[str, str]:
+    """The build manifest, read once (empty in development mode or before a build)."""
+    global _manifest
+    if is_development():
+        return {}
+    if _manifest is None:
+        _manifest = load_manifest()
+    return _manifest
+
+
+def asset_url(filename: str) -> str:
+    """URL for a static asset: fingerprinted under /static/dist/ when built, else plain /static/."""
+    target = manifest().get(filename)
+    if target is None:
+        return url_for('static', filename=filename)
+    return url_for('dist_asset', filename=target)
+
+
+def serve_dist(filename: str):
+    """Serve a fingerprinted asset, precompressed when the client accepts it, cached for a year."""
+    path = os.path.join(DIST_DIR, filename)
+    if filename == 'manifest.json' or not os.path.isfile(path):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    accepted = request.accept_encodings
+    response = None
+    for encoding, suffix in ENCODINGS:
+        if accepted[encoding] and os.path.isfile(path + suffix):
+            response = send_from_directory(DIST_DIR, filename + suffix, mimetype=mimetype,
+                                           max_age=IMMUTABLE_MAX_AGE)
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory(DIST_DIR, filename, max_age=IMMUTABLE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_app(app) -> None:
+    """Apply the OPENBALLOT_ENV settings and register asset_url and the /static/dist/ route."""
+    if is_development():
+        # Prevent browser caching and reload templates on change
+        app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
+        app.config['TEMPLATES_AUTO_RELOAD'] = True
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.add_url_rule(f'{app.static_url_path}/{DIST_DIRNAME}/<path:filename>', 'dist_asset', serve_dist)
@@ -0,0 +1,182 @@
+"""
+Response compression for the Flask app.
+
+An after_request hook compresses text responses (JSON, HTML, JS, CSS) with
+the best encoding both sides support, negotiated from Accept-Encoding:
+brotli (if the brotli package is installed), zstd (if zstandard is
+installed), then gzip. Bodies under COMPRESS_MIN_BYTES go out as is. Bodies
+over COMPRESS_CHUNKED_BYTES are already in memory, but their compressed form
+is produced chunk by chunk as it is sent, so it never exists as a second
+full-size buffer. (Responses that are already streamed, e.g. from a
+generator, are not compressed.)
+
+Responses built from a CachedBody (see cached_response) reuse the compressed
+bytes stored on the entry. The first request for an encoding compresses at the
+normal level; a background thread then replaces that with a CACHED_LEVELS
+variant, too slow to produce on a request, for the requests after it.
+
+Responses that already carry Content-Encoding (the precompressed /static/dist/
+files), files sent with send_file and non-200 responses are left alone.
+
+Env: COMPRESS_MIN_BYTES (1024), COMPRESS_CHUNKED_BYTES (262144)
+"""
+
+import gzip
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+CHUNKED_BYTES = int(os.getenv('COMPRESS_CHUNKED_BYTES', 256 * 1024))
+CHUNK = 64 * 1024
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'text/javascript', 'text/html',
+    'text/css', 'text/plain', 'text/csv', 'image/svg+xml',
+}
+
+# Per-request levels favour speed; cached bodies are recompressed harder once,
+# in the background
+LEVELS = {'br': 5, 'zstd': 3, 'gzip': 6}
+CACHED_LEVELS = {'br': 9, 'zstd': 19, 'gzip': 9}
+
+# One thread, so background recompression never takes more than one core
+_recompress_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recompress')
+
+
+def _gzip_stream(level: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    return obj.compress, obj.flush
+
+
+def _brotli_stream(level: int):
+    obj = brotli.Compressor(quality=level)
+    return obj.process, obj.finish
+
+
+def _zstd_stream(level: int):
+    obj = zstandard.ZstdCompressor(level=level).compressobj()
+    return obj.compress, obj.flush
+
+
+# name -> (one-shot compress(data, level), streaming factory(level)); server preference order
+ENCODERS: Dict[str, Tuple[Callable[[bytes, int], bytes], Callable]] = {}
+if brotli is not None:
+    ENCODERS['br'] = (lambda data, level: brotli.compress(data, quality=level), _brotli_stream)
+if zstandard is not None:
+    ENCODERS['zstd'] = (lambda data, level: zstandard.ZstdCompressor(level=level).compress(data), _zstd_stream)
+ENCODERS['gzip'] = (lambda data, level: gzip.compress(data, compresslevel=level, mtime=0), _gzip_stream)
+
+
+def negotiate(accept_encoding) -> Optional[str]:
+    """The preferred encoding in ENCODERS the client accepts (q > 0), or None."""
+    best, best_q = None, 0.0
+    for name in ENCODERS:
+        q = accept_encoding[name]
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    return ENCODERS[encoding][0](data, LEVELS[encoding] if level is None else level)
+
+
+def compress_chunks(data: bytes, encoding: str, chunk_size: int = CHUNK) -> Iterator[bytes]:
+    """Compress in-memory `data` chunk by chunk, yielding output as it is produced."""
+    feed, finish = ENCODERS[encoding][1](LEVELS[encoding])
+    view = memoryview(data)
+    for i in range(0, len(view), chunk_size):
+        out = feed(bytes(view[i:i + chunk_size]))
+        if out:
+            yield out
+    yield finish()
+
+
+class CachedBody:
+    """A serialized response body kept in a cache, plus its compressed variants."""
+
+    __slots__ = ('body', 'mimetype', 'encoded', 'lock')
+
+    def __init__(self, body: bytes, mimetype: str):
+        self.body = body
+        self.mimetype = mimetype
+        self.encoded: Dict[str, bytes] = {}
+        self.lock = threading.Lock()
+
+    def encoded_as(self, encoding: str) -> bytes:
+        data = self.encoded.get(encoding)
+        if data is None:
+            # Normal level now, outside the lock; the first one stored wins
+            data = compress(self.body, encoding)
+            with self.lock:
+                if encoding in self.encoded:
+                    return self.encoded[encoding]
+                self.encoded[encoding] = data
+            _recompress_pool.submit(self._recompress, encoding)
+        return data
+
+    def _recompress(self, encoding: str) -> None:
+        self.encoded[encoding] = compress(self.body, encoding, CACHED_LEVELS[encoding])
+
+
+def cached_response(entry: CachedBody) -> Response:
+    """Response for a cached body; the compression hook uses the entry's variants."""
+    response = Response(entry.body, mimetype=entry.mimetype)
+    response.cached_body = entry
+    return response
+
+
+def _weaken_etag(response: Response) -> None:
+    # The compressed bytes are a different representation of the same content
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def compress_response(response: Response) -> Response:
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    entry: Optional[CachedBody] = getattr(response, 'cached_body', None)
+    if entry is not None and len(entry.body) >= MIN_BYTES:
+        response.set_data(entry.encoded_as(encoding))
+    else:
+        data = response.get_data()
+        if len(data) < MIN_BYTES:
+            return response
+        if len(data) > CHUNKED_BYTES:
+            response.response = compress_chunks(data, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    return response
+
+
+def available_encodings() -> List[str]:
+    return list(ENCODERS)
+
+
+def init_app(app) -> None:
+    app.after_request(compress_response)
@@ -0,0 +1,355 @@
+"""
+Shared read-only data layer for the Flask app and the FastAPI openballot_server.
+
+Loads the funding graph JSON and the percentile CSVs once per process and
+builds the lookup structures both servers use. Nothing here (or in
+percentiles.py) imports Flask: openballot_server loads both by file path, see
+its data_layer.py, so flask_app/__init__.py never runs there.
+
+Data is kept per election cycle. Cycle C reads graph/graph_C.json and
+new_data/C/*.csv; the default cycle (OPENBALLOT_CYCLE, 2024) falls back to the
+unversioned graph_house.json and new_data/*.csv when its own files are absent.
+get_dataset(cycle) loads each cycle on first use, so a request only touches
+that cycle's data.
+
+Deployment notes:
+  - Under gunicorn, gunicorn.conf.py calls preload() in the master before
+    workers fork, and freezes the loaded objects out of the garbage collector,
+    so workers share the data copy-on-write.
+  - Set OPENBALLOT_MMAP_DIR to back the percentile columns with .npy files
+    opened via mmap. Every process (including servers that spawn rather than
+    fork their workers) then shares one copy through the OS page cache.
+"""
+
+import csv
+import gc
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional
+
+from .percentiles import PercentileCube, RowStore
+
+APP_NAME = "OpenBallot"
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+GRAPH_PATH = os.environ.get("OPENBALLOT_GRAPH_PATH", os.path.join(HERE, "graph", "graph_house.json"))
+DATA_DIR = os.environ.get("OPENBALLOT_DATA_DIR", os.path.join(HERE, "new_data"))
+HOUSE_CSV = os.path.join(DATA_DIR, "house_candidates_indiv_percentiles.csv")
+SEN_CSV = os.path.join(DATA_DIR, "senate_candidates_indiv_percentiles.csv")
+MMAP_DIR = os.environ.get("OPENBALLOT_MMAP_DIR")
+DEFAULT_CYCLE = int(os.environ.get("OPENBALLOT_CYCLE", 2024))
+
+
+def graph_path_for(cycle: int) -> str:
+    """Graph JSON for a cycle (the unversioned GRAPH_PATH for the default cycle, unless graph_<cycle>.json exists)."""
+    path = os.path.join(os.path.dirname(GRAPH_PATH), f"graph_{cycle}.json")
+    if cycle == DEFAULT_CYCLE and not os.path.exists(path):
+        return GRAPH_PATH
+    return path
+
+
+_cycles_cache: Optional[tuple] = None  # (directory mtimes, cycles)
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def available_cycles() -> List[int]:
+    """
+    DEFAULT_CYCLE plus every cycle with its own graph JSON or data directory,
+    newest first. The directories are only listed again when their mtime changes.
+    """
+    global _cycles_cache
+    graph_dir = os.path.dirname(GRAPH_PATH)
+    key = (_mtime(graph_dir), _mtime(DATA_DIR))
+    cached = _cycles_cache
+    if cached is not None and cached[0] == key:
+        return list(cached[1])
+    cycles = {DEFAULT_CYCLE}
+    for name in os.listdir(graph_dir) if os.path.isdir(graph_dir) else []:
+        stem = name[len("graph_"):-len(".json")] if name.startswith("graph_") and name.endswith(".json") else ""
+        if stem.isdigit():
+            cycles.add(int(stem))
+    for name in os.listdir(DATA_DIR) if os.path.isdir(DATA_DIR) else []:
+        if name.isdigit() and os.path.isdir(os.path.join(DATA_DIR, name)):
+            cycles.add(int(name))
+    _cycles_cache = (key, sorted(cycles, reverse=True))
+    return list(_cycles_cache[1])
+
+
+def has_cycle(cycle: int) -> bool:
+    """Whether a cycle has data; an already loaded dataset answers without touching the filesystem."""
+    return cycle in _datasets or cycle in available_cycles()
+
+
+def data_dir_for(cycle: int) -> str:
+    """Candidate CSV directory for a cycle (DATA_DIR itself for the default cycle, unless DATA_DIR/<cycle> exists)."""
+    path = os.path.join(DATA_DIR, str(cycle))
+    if cycle == DEFAULT_CYCLE and not os.path.isdir(path):
+        return DATA_DIR
+    return path
+
+
+# -----------------------------
+# Helpers for CSV reading
+# -----------------------------
+def _slim_party(raw: str) -> str:
+    """Normalize party codes to D / R / Other."""
+    if not raw:
+        return "Other"
+    r = raw.strip().upper()
+    if r.startswith("DEM"): return "D"
+    if r.startswith("REP"): return "R"
+    if r in {"D", "R"}:     return r
+    return "Other"
+
+def _to_float(x, default=0.0) -> float:
+    try:
+        return float(x)
+    except Exception:
+        return default
+
+def normalize_pct(pct: float) -> float:
+    """An individual share as a 0-100 percent, the scale the percentile data uses."""
+    # Heuristic: if looks like 0..1, treat as fraction; else assume already a percent
+    if 0.0 <= pct <= 1.0:
+        pct *= 100.0
+    return max(0.0, min(100.0, pct))
+
+
+def _read_percentile_csv(path: str) -> List[Dict[str, Any]]:
+    """
+    Reads either House or Senate CSV and returns rows with:
+      name, party (D/R/Other), state, pct_indiv (0-100), plus some totals (if present).
+    Supports columns 'Pct_Individual' or 'PCT_INDIV_CONTRIB'.
+    """
+    out: List[Dict[str, Any]] = []
+    if not os.path.exists(path):
+        return out
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rdr = csv.DictReader(f)
+        for r in rdr:
+            name = (r.get("CAND_NAME") or "").strip()
+            if not name:
+                # Some rows may be totals/blank; skip
+                continue
+            party = _slim_party(r.get("CAND_PTY_AFFILIATION") or r.get("CAND_PTY") or "")
+            state = (r.get("CAND_OFFICE_ST") or r.get("STATE") or "").strip() or "NA"
+
+            # Individual share % — try multiple keys; coerce to [0,100]
+            pct_raw = r.get("Pct_Individual", "")
+            if pct_raw == "" and "PCT_INDIV_CONTRIB" in r:
+                pct_raw = r.get("PCT_INDIV_CONTRIB")
+
+            pct = normalize_pct(_to_float(pct_raw, 0.0))
+
+            out.append({
+                "name": name,
+                "party": party,
+                "state": state,
+                "pct_indiv": pct,
+                "ttl_indiv": _to_float(r.get("TTL_INDIV_CONTRIB", 0.0)),
+                "ttl_rcpts": _to_float(r.get("TTL_RECEIPTS", 0.0)),
+            })
+    return out
+
+def _source_version(paths: List[str]) -> str:
+    """Short hash of the source files' size and mtime; changes whenever a file is replaced."""
+    h = hashlib.sha1()
+    for p in paths:
+        try:
+            st = os.stat(p)
+            h.update(f"{p}:{st.st_size}:{st.st_mtime_ns};".encode())
+        except OSError:
+            h.update(f"{p}:missing;".encode())
+    return h.hexdigest()[:12]
+
+def _source_mtime(paths: List[str]) -> Optional[float]:
+    """Newest mtime (epoch seconds) of the source files that exist, or None."""
+    mtimes = [os.stat(p).st_mtime for p in paths if os.path.exists(p)]
+    return max(mtimes) if mtimes else None
+
+def _load_graph(path: str) -> Dict[str, Any]:
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            return {"nodes": [], "links": [], "meta": {"app": APP_NAME, "error": str(e)}}
+    return {"nodes": [], "links": [], "meta": {"app": APP_NAME}}
+
+def _load_row_store(version: str, csv_paths: List[str]) -> RowStore:
+    """Read the percentile CSVs, going through the mmap cache when OPENBALLOT_MMAP_DIR is set."""
+    if not MMAP_DIR:
+        return RowStore.from_rows([r for p in csv_paths for r in _read_percentile_csv(p)])
+    cache_dir = os.path.join(MMAP_DIR, f"percentiles-{version}")
+    if not os.path.exists(os.path.join(cache_dir, "categories.json")):
+        store = RowStore.from_rows([r for p in csv_paths for r in _read_percentile_csv(p)])
+        tmp_dir = f"{cache_dir}.tmp{os.getpid()}"
+        store.save(tmp_dir)
+        try:
+            os.replace(tmp_dir, cache_dir)
+        except OSError:
+            # another process published it first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return RowStore.load(cache_dir, mmap=True)
+
+
+class Dataset:
+    """One cycle's graph and percentile data plus the indexes built from them."""
+
+    def __init__(self, cycle: int = DEFAULT_CYCLE):
+        self.cycle = cycle
+        self.graph_path = graph_path_for(cycle)
+        data_dir = data_dir_for(cycle)
+        self.data_dir = data_dir
+        self.house_csv = os.path.join(data_dir, os.path.basename(HOUSE_CSV))
+        self.sen_csv = os.path.join(data_dir, os.path.basename(SEN_CSV))
+        self.version = _source_version([self.graph_path, self.house_csv, self.sen_csv])
+        self.modified = _source_mtime([self.graph_path, self.house_csv, self.sen_csv])
+
+        self.graph = _load_graph(self.graph_path)
+        nodes = self.graph.get("nodes", [])
+        self.funding_group_ids = {n.get("id") for n in nodes if n.get("type") == "FundingGroup"}
+        self.politician_ids = {n.get("id") for n in nodes if n.get("type") == "Politician"}
+        self.politicians = {n.get("id"): n for n in nodes if n.get("type") == "Politician"}
+        # Per-politician lookups, so one politician's neighbourhood is not a scan of every link
+        self.node_index = {n.get("id"): i for i, n in enumerate(nodes)}
+        self.donations_by_target: Dict[str, List[Dict[str, Any]]] = {}
+        for l in self.graph.get("links", []):
+            if l.get("type") == "donation":
+                self.donations_by_target.setdefault(l.get("target"), []).append(l)
+
+        self.row_store = _load_row_store(self.version, [self.house_csv, self.sen_csv])
+        self.percentiles = PercentileCube(self.row_store)
+
+    def graph_payload(self, party: Optional[str], state: Optional[str], min_amount: int) -> Dict[str, Any]:
+        """Subgraph with the FundingGroup nodes and filtered Politicians + inbound donation links."""
+        nodes: List[Dict[str, Any]] = self.graph.get("nodes", [])
+        links: List[Dict[str, Any]] = self.graph.get("links", [])
+
+        keep_pols = set()
+        # accept D/R/Other or raw codes (DEM, REP, ...) on either side
+        wanted_party = _slim_party(party) if party is not None else None
+        for pid, p in self.politicians.items():
+            ok = True
+            if party is not None:
+                ok = ok and (_slim_party(p.get("party", "")) == wanted_party)
+            if state is not None:
+                ok = ok and (p.get("state", "") == state)
+            if ok:
+                keep_pols.add(pid)
+
+        if party is None and state is None:
+            keep_pols = set(self.politician_ids)
+
+        kept_links: List[Dict[str, Any]] = []
+        for l in links:
+            if l.get("type") != "donation":
+                continue
+            if l.get("target") in keep_pols and float(l.get("amount", 0) or 0) >= float(min_amount):
+                kept_links.append(l)
+
+        used_ids = set(self.funding_group_ids) | {l["target"] for l in kept_links} | {l["source"] for l in kept_links}
+        kept_nodes = [n for n in nodes if n.get("id") in used_ids]
+
+        graph_meta = self.graph.get("meta", {})
+        meta = {
+            "app": graph_meta.get("app", APP_NAME),
+            "currency": graph_meta.get("currency", "USD"),
+            "filters": {"party": party, "state": state, "min_amount": min_amount},
+            "counts": {"nodes": len(kept_nodes), "links": len(kept_links), "politicians": len(keep_pols)},
+            "note": graph_meta.get("note", "Funding mix → Politician."),
+        }
+        return {"meta": meta, "nodes": kept_nodes, "links": kept_links}
+
+    def politician_graph(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        """The FundingGroup nodes, one politician and its donors with their links; None if not in the graph."""
+        politician_id = f"pol_{candidate_id}"
+        node = self.politicians.get(politician_id)
+        if node is None:
+            return None
+        kept_links = list(self.donations_by_target.get(politician_id, []))
+        used_ids = set(self.funding_group_ids) | {politician_id} | {l["source"] for l in kept_links}
+        nodes = self.graph.get("nodes", [])
+        kept_nodes = [nodes[i] for i in sorted(self.node_index[n] for n in used_ids if n in self.node_index)]
+        name = node.get("name", "Unknown")
+        meta = {
+            "app": APP_NAME,
+            "currency": "USD",
+            "politician_id": candidate_id,
+            "politician_name": name,
+            "counts": {"nodes": len(kept_nodes), "links": len(kept_links)},
+            "note": f"Funding connections for {name}",
+        }
+        return {"meta": meta, "nodes": kept_nodes, "links": kept_links}
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "cycle": self.cycle,
+            "version": self.version,
+            "graph_path": self.graph_path,
+            "data_dir": self.data_dir,
+            "nodes": len(self.graph.get("nodes", [])),
+            "links": len(self.graph.get("links", [])),
+            "rows_loaded": len(self.row_store),
+            "has_house_csv": os.path.exists(self.house_csv),
+            "has_senate_csv": os.path.exists(self.sen_csv),
+            "mmap_dir": MMAP_DIR,
+        }
+
+
+_datasets: Dict[int, Dataset] = {}
+_lock = threading.Lock()
+
+
+def get_dataset(cycle: Optional[int] = None) -> Dataset:
+    """The process-wide Dataset for a cycle (default: DEFAULT_CYCLE), loaded on first use."""
+    if cycle is None:
+        cycle = DEFAULT_CYCLE
+    ds = _datasets.get(cycle)
+    if ds is None:
+        with _lock:
+            ds = _datasets.get(cycle)
+            if ds is None:
+                ds = _datasets[cycle] = Dataset(cycle)
+    return ds
+
+
+def loaded_dataset(cycle: Optional[int] = None) -> Optional[Dataset]:
+    """A cycle's Dataset if it is already loaded, else None; never reads files."""
+    return _datasets.get(DEFAULT_CYCLE if cycle is None else cycle)
+
+
+def preload(freeze: bool = False, cycles: Optional[List[int]] = None) -> Dataset:
+    """
+    Load the datasets for `cycles` (default: just DEFAULT_CYCLE) now, e.g. in a
+    pre-fork server master. With freeze, the loaded objects are moved out of GC
+    tracking so collections in forked workers do not write to (and so copy) the
+    shared pages. Returns the default cycle's dataset.
+    """
+    for cycle in cycles or [DEFAULT_CYCLE]:
+        get_dataset(cycle)
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    return get_dataset()
+
+
+def reload(cycle: Optional[int] = None) -> Dataset:
+    """Replace a cycle's dataset with a fresh load from disk."""
+    if cycle is None:
+        cycle = DEFAULT_CYCLE
+    fresh = Dataset(cycle)
+    with _lock:
+        _datasets[cycle] = fresh
+    return fresh
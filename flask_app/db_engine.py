@@ -0,0 +1,142 @@
+"""
+Database engine profiles and the optional read replica.
+
+DB_ENGINE_PROFILE selects how the SQLAlchemy engine is configured:
+  - production (default): connection pool sizing from the environment and, on
+    SQLite, WAL journaling plus per-connection pragmas, so reads keep going while
+    /generate_description commits and writers wait instead of failing.
+  - basic: SQLAlchemy defaults (the app's original behaviour).
+
+Set DATABASE_REPLICA_URI to serve the read-only list, search and API routes
+from a second engine. For SQLite this can be the same file opened read-only,
+e.g. sqlite:///file:/path/database.db?mode=ro&uri=true; in WAL mode those
+readers never block on the writer.
+
+Env: DB_POOL_SIZE (10), DB_MAX_OVERFLOW (20), DB_POOL_TIMEOUT (30 s),
+     DB_POOL_RECYCLE (1800 s), SQLITE_BUSY_TIMEOUT_MS (5000),
+     SQLITE_MMAP_SIZE (256MB), SQLITE_CACHE_SIZE (-64000, i.e. 64MB)
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from flask import g
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+PROFILE = os.getenv('DB_ENGINE_PROFILE', 'production')
+REPLICA_URI = os.getenv('DATABASE_REPLICA_URI')
+
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+
+BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+# Applied to every new SQLite connection under the production profile.
+SQLITE_PRAGMAS = {
+    'busy_timeout': BUSY_TIMEOUT_MS,
+    'synchronous': 'NORMAL',  # durable with WAL except on power loss; no fsync per commit
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64000)),
+    'temp_store': 'MEMORY',
+}
+
+
+def _is_sqlite(uri: str) -> bool:
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def _is_sqlite_memory(uri: str) -> bool:
+    url = make_url(uri)
+    return url.database in (None, '', ':memory:') or 'mode=memory' in str(url)
+
+
+def engine_options(uri: Optional[str], profile: str = PROFILE) -> Dict[str, Any]:
+    """create_engine() keyword arguments for `uri` under `profile`."""
+    if profile != 'production' or not uri:
+        return {}
+    if _is_sqlite(uri):
+        if _is_sqlite_memory(uri):
+            return {}  # single shared connection; pool settings do not apply
+        return {
+            'pool_size': POOL_SIZE,
+            'max_overflow': MAX_OVERFLOW,
+            'pool_timeout': POOL_TIMEOUT,
+            'connect_args': {'check_same_thread': False},
+        }
+    return {
+        'pool_size': POOL_SIZE,
+        'max_overflow': MAX_OVERFLOW,
+        'pool_timeout': POOL_TIMEOUT,
+        'pool_recycle': POOL_RECYCLE,
+        'pool_pre_ping': True,
+    }
+
+
+def install_sqlite_pragmas(engine: Engine, read_only: bool = False) -> None:
+    """Set WAL and SQLITE_PRAGMAS on every connection `engine` opens."""
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if read_only:
+                cursor.execute('PRAGMA query_only = ON')
+            else:
+                # WAL is stored in the file; after the first connection this is a no-op
+                cursor.execute('PRAGMA journal_mode = WAL')
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+
+def configure_app(app, uri: Optional[str], profile: str = PROFILE) -> None:
+    """Put the engine options for `profile` into the Flask-SQLAlchemy config."""
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri, profile)
+
+
+def init_engine(app, db, profile: str = PROFILE) -> None:
+    """Install connection hooks on the app's engine; call after db.init_app(app)."""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if profile == 'production' and uri and _is_sqlite(uri) and not _is_sqlite_memory(uri):
+        with app.app_context():
+            install_sqlite_pragmas(db.engine)
+
+    @app.teardown_appcontext
+    def _close_read_session(exc):
+        session = g.pop('read_session', None)
+        if session is not None:
+            session.close()
+
+
+_replica_sessionmaker: Optional[sessionmaker] = None
+
+
+def replica_engine(uri: str, profile: str = PROFILE) -> Engine:
+    """Engine for the read replica at `uri`."""
+    engine = create_engine(uri, **engine_options(uri, profile))
+    if profile == 'production' and _is_sqlite(uri) and not _is_sqlite_memory(uri):
+        install_sqlite_pragmas(engine, read_only=True)
+    return engine
+
+
+def read_session() -> Session:
+    """
+    Session for read-only routes: one per app context on the replica when
+    DATABASE_REPLICA_URI is set, otherwise the primary db.session.
+    """
+    from . import db
+
+    if not REPLICA_URI:
+        return db.session
+    global _replica_sessionmaker
+    if _replica_sessionmaker is None:
+        _replica_sessionmaker = sessionmaker(bind=replica_engine(REPLICA_URI), autoflush=False)
+    if 'read_session' not in g:
+        g.read_session = _replica_sessionmaker()
+    return g.read_session
@@ -0,0 +1,104 @@
+"""
+Materialized facet counts for the politician list sidebar.
+
+The facet_count table holds the number of politicians per chamber, state and
+party value, and per pair of values from two of those facets, per cycle. It only changes
+when candidates are ingested, so populate_database.py rebuilds it at the end
+of every load of a cycle (refresh_facet_counts) and the list routes read it instead of
+running GROUP BY over the whole Politician table.
+
+A facet's counts exclude its own filter, so they are answerable from the table
+when at most one *other* facet is filtered (any number of values) and there is
+no search term; facet_counts returns None otherwise and callers count live.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, and_, func, insert, literal, select
+
+from .models import FacetCount, Politician
+
+# Facet name -> Politician column, in the order pairs are stored (first, second).
+FACETS = {
+    "chamber": Politician.chamber,
+    "state": Politician.office_state,
+    "party": Politician.political_party_affiliation,
+}
+FACET_ORDER = list(FACETS)
+
+
+def refresh_facet_counts(connection, cycle: int) -> int:
+    """
+    Rebuild a cycle's facet_count rows from the Politician table with INSERT ...
+    SELECT GROUP BY statements on `connection` (run it inside the ingest
+    transaction). Every row gets the same refreshed_at, which readers use as
+    the cycle's data version (see facet_version). Returns the number of rows
+    written.
+    """
+    table = FacetCount.__table__
+    connection.execute(table.delete().where(table.c.cycle == cycle))
+    columns = ["cycle", "dimension", "value", "other_dimension", "other_value", "count", "refreshed_at"]
+    in_cycle = Politician.cycle == cycle
+    refreshed_at = literal(datetime.now(timezone.utc).replace(tzinfo=None), DateTime)
+    for i, name in enumerate(FACET_ORDER):
+        column = FACETS[name]
+        connection.execute(insert(table).from_select(columns, select(
+            literal(cycle), literal(name), column, literal(None), literal(None), func.count(Politician.id),
+            refreshed_at,
+        ).where(in_cycle).group_by(column)))
+        for other in FACET_ORDER[i + 1:]:
+            other_column = FACETS[other]
+            connection.execute(insert(table).from_select(columns, select(
+                literal(cycle), literal(name), column, literal(other), other_column, func.count(Politician.id),
+                refreshed_at,
+            ).where(in_cycle).group_by(column, other_column)))
+    return connection.execute(select(func.count()).select_from(table).where(table.c.cycle == cycle)).scalar()
+
+
+def facet_version(session, cycle: int):
+    """
+    When a cycle's facet counts were last rebuilt, i.e. its last ingest; None if
+    they never were. One indexed row lookup.
+    """
+    row = session.query(FacetCount.refreshed_at).filter(
+        FacetCount.cycle == cycle, FacetCount.dimension == FACET_ORDER[0], FacetCount.other_dimension.is_(None),
+    ).first()
+    return row[0] if row is not None else None
+
+
+def facet_counts(session, cycle: int, facet: str,
+                 filters: Dict[str, Sequence[str]]) -> Optional[List[Tuple[str, int]]]:
+    """
+    (value, count) pairs for `facet` in `cycle`, most common first, restricted by
+    `filters` (facet name -> selected values; the facet's own entry is ignored).
+
+    Returns None when the table cannot answer: more than one other facet is
+    filtered, or facet_count has not been built for the cycle yet.
+    """
+    active = [(name, list(values)) for name, values in filters.items() if values and name != facet]
+    if len(active) > 1:
+        return None
+
+    fc = FacetCount
+    if not active:
+        query = session.query(fc.value, fc.count).filter(fc.cycle == cycle, fc.dimension == facet,
+                                                          fc.other_dimension.is_(None))
+    else:
+        other, values = active[0]
+        if FACET_ORDER.index(facet) < FACET_ORDER.index(other):
+            value_col, match = fc.value, and_(fc.dimension == facet, fc.other_dimension == other,
+                                              fc.other_value.in_(values))
+        else:
+            value_col, match = fc.other_value, and_(fc.dimension == other, fc.other_dimension == facet,
+                                                    fc.value.in_(values))
+        total = func.sum(fc.count)
+        query = session.query(value_col, total).filter(fc.cycle == cycle, match).group_by(value_col)
+
+    rows = query.all()
+    if not rows and session.query(fc.id).filter(fc.cycle == cycle).first() is None:
+        return None
+    shown = [(value, int(count)) for value, count in rows
+             if value is not None and not (facet == "state" and value == "00")]
+    shown.sort(key=lambda r: -r[1])
+    return shown
@@ -0,0 +1,203 @@
+"""
+Streaming readers for the FEC bulk data files.
+
+itcont.txt (itemized individual contributions) is pipe-delimited, has no
+header and runs to several GB, so it is never loaded whole: the file is cut
+into byte ranges aligned to line boundaries, each range is parsed by a pool
+worker into per-committee totals, and the (small) partial totals are merged.
+Memory use depends on the number of committees, not on the file size.
+
+Committees are tied to candidates through the candidate-committee linkage
+file (ccl.txt); committee names come from the committee master (cm.txt).
+File layouts: https://www.fec.gov/campaign-finance-data/
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# itcont.txt columns
+ITCONT_COLUMNS = [
+    "CMTE_ID", "AMNDT_IND", "RPT_TP", "TRANSACTION_PGI", "IMAGE_NUM", "TRANSACTION_TP", "ENTITY_TP",
+    "NAME", "CITY", "STATE", "ZIP_CODE", "EMPLOYER", "OCCUPATION", "TRANSACTION_DT", "TRANSACTION_AMT",
+    "OTHER_ID", "TRAN_ID", "FILE_NUM", "MEMO_CD", "MEMO_TEXT", "SUB_ID",
+]
+CCL_COLUMNS = ["CAND_ID", "CAND_ELECTION_YR", "FEC_ELECTION_YR", "CMTE_ID", "CMTE_TP", "CMTE_DSGN", "LINKAGE_ID"]
+CM_COLUMNS = [
+    "CMTE_ID", "CMTE_NM", "TRES_NM", "CMTE_ST1", "CMTE_ST2", "CMTE_CITY", "CMTE_ST", "CMTE_ZIP", "CMTE_DSGN",
+    "CMTE_TP", "CMTE_PTY_AFFILIATION", "CMTE_FILING_FREQ", "ORG_TP", "CONNECTED_ORG_NM", "CAND_ID",
+]
+
+_CMTE_ID = ITCONT_COLUMNS.index("CMTE_ID")
+_AMOUNT = ITCONT_COLUMNS.index("TRANSACTION_AMT")
+_MEMO_CD = ITCONT_COLUMNS.index("MEMO_CD")
+
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+# committee id -> [total amount, contribution count]
+CommitteeTotals = Dict[str, List[float]]
+
+
+def chunk_ranges(path: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> List[Tuple[str, int, int]]:
+    """Split a file into (path, start, end) byte ranges of about chunk_bytes."""
+    size = os.path.getsize(path)
+    return [(path, start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes)]
+
+
+def _lines_in_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    """Lines that start inside [start, end); a line straddling `end` belongs to this range."""
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()  # finish the line the previous range owns
+        pos = f.tell()
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line
+
+
+def aggregate_range(task: Tuple[str, int, int]) -> Tuple[CommitteeTotals, int, int]:
+    """
+    Sum itcont amounts per committee over one byte range.
+
+    Memo lines (MEMO_CD == 'X') repeat amounts already reported elsewhere and are
+    skipped. Returns (totals, rows read, rows skipped as malformed).
+    """
+    path, start, end = task
+    totals: CommitteeTotals = {}
+    rows = bad = 0
+    for line in _lines_in_range(path, start, end):
+        rows += 1
+        fields = line.split(b"|")
+        if len(fields) <= _MEMO_CD:
+            bad += 1
+            continue
+        if fields[_MEMO_CD].strip() == b"X":
+            continue
+        try:
+            amount = float(fields[_AMOUNT])
+        except ValueError:
+            bad += 1
+            continue
+        cmte = fields[_CMTE_ID].decode("ascii", "replace")
+        rec = totals.get(cmte)
+        if rec is None:
+            totals[cmte] = [amount, 1]
+        else:
+            rec[0] += amount
+            rec[1] += 1
+    return totals, rows, bad
+
+
+def merge_totals(into: CommitteeTotals, part: CommitteeTotals) -> None:
+    for cmte, (amount, count) in part.items():
+        rec = into.get(cmte)
+        if rec is None:
+            into[cmte] = [amount, count]
+        else:
+            rec[0] += amount
+            rec[1] += count
+
+
+def _bounded_map(pool: ProcessPoolExecutor, fn, tasks, window: int) -> Iterator:
+    """pool.map() that keeps at most `window` tasks in flight, so pending results stay bounded."""
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def aggregate_itcont(paths: Iterable[str], workers: Optional[int] = None,
+                     chunk_bytes: int = DEFAULT_CHUNK_BYTES, progress=None) -> Tuple[CommitteeTotals, Dict[str, int]]:
+    """
+    Per-committee totals over one or more itcont files, parsed in parallel.
+
+    progress, if given, is called with (ranges done, ranges total) as results
+    arrive. Returns (totals, stats) with stats counting rows and malformed rows.
+    """
+    tasks = [t for p in paths for t in chunk_ranges(p, chunk_bytes)]
+    totals: CommitteeTotals = {}
+    stats = {"rows": 0, "malformed": 0, "chunks": len(tasks)}
+    if workers == 1 or len(tasks) <= 1:
+        results = map(aggregate_range, tasks)
+        pool = None
+    else:
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=workers)
+        # Finished chunks wait in memory until merged; keep two per worker in flight
+        results = _bounded_map(pool, aggregate_range, tasks, 2 * workers)
+    try:
+        for done, (part, rows, bad) in enumerate(results, start=1):
+            merge_totals(totals, part)
+            stats["rows"] += rows
+            stats["malformed"] += bad
+            if progress:
+                progress(done, len(tasks))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return totals, stats
+
+
+def _read_pipe_file(path: str, n_columns: int) -> Iterator[List[str]]:
+    with open(path, "r", encoding="latin-1", newline="") as f:
+        for line in f:
+            fields = line.rstrip("\r\n").split("|")
+            if len(fields) >= n_columns:
+                yield fields
+
+
+def read_linkage(path: str, cycle: Optional[int] = None) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    committee id -> [(candidate id, election year)] from a ccl.txt linkage file.
+
+    A committee is often linked to the same candidate for several election
+    years; each pair is kept once, with the year matching `cycle` if there is
+    one, else the latest.
+    """
+    cand, year, cmte = CCL_COLUMNS.index("CAND_ID"), CCL_COLUMNS.index("CAND_ELECTION_YR"), CCL_COLUMNS.index("CMTE_ID")
+    wanted = str(cycle) if cycle is not None else None
+    years: Dict[str, Dict[str, str]] = {}
+    for fields in _read_pipe_file(path, len(CCL_COLUMNS)):
+        links = years.setdefault(fields[cmte], {})
+        kept = links.get(fields[cand])
+        if kept is None or (kept != wanted and (fields[year] == wanted or fields[year] > kept)):
+            links[fields[cand]] = fields[year]
+    return {c: list(links.items()) for c, links in years.items()}
+
+
+def read_committee_names(path: str) -> Dict[str, str]:
+    """committee id -> committee name from a cm.txt committee master file."""
+    cmte, name = CM_COLUMNS.index("CMTE_ID"), CM_COLUMNS.index("CMTE_NM")
+    return {fields[cmte]: fields[name].strip() for fields in _read_pipe_file(path, len(CM_COLUMNS))}
+
+
+def committee_candidate_rows(totals: CommitteeTotals, linkage: Dict[str, List[Tuple[str, str]]],
+                             names: Optional[Dict[str, str]] = None) -> List[dict]:
+    """
+    Join committee totals to candidates through the linkage.
+
+    A committee linked to several candidates (e.g. a joint fundraising
+    committee) contributes its full total to each of them. Committees with no
+    linked candidate are dropped.
+    """
+    names = names or {}
+    rows = []
+    for cmte, (amount, count) in totals.items():
+        for cand, year in linkage.get(cmte, ()):
+            rows.append({
+                "committee_id": cmte,
+                "committee_name": names.get(cmte),
+                "candidate_id": cand,
+                "election_year": int(year) if year.isdigit() else None,
+                "total_amount": round(amount, 2),
+                "contribution_count": int(count),
+            })
+    return rows
@@ -0,0 +1,91 @@
+"""
+Derived funding metrics for candidate rows, computed with pandas/NumPy.
+
+The *_indiv_percentiles.csv files in new_data carry columns that were produced
+offline (Pct_Individual, Funding_Group, the percentile ranks and the adjusted
+PAC/party amounts). derive_funding_metrics recomputes all of them from the raw
+FEC columns in one vectorized pass, so raw candidate files (the data/ layout,
+president_data.csv) can be ingested directly and get the same values.
+
+Definitions (they reproduce the existing new_data files):
+  - Adj_PAC_Contrib      = max(OTHER_POL_CMTE_CONTRIB, 0)
+  - Adj_Party_Contrib    = max(POL_PTY_CONTRIB - CMTE_REFUNDS, 0)
+  - PAC_Contribution_%, Party_Contribution_%, Pct_Individual
+                         = share of TTL_RECEIPTS in percent (0 when receipts <= 0)
+  - Funding_Group        = TTL_RECEIPTS bucket (FUNDING_GROUPS); empty when receipts < 0
+  - Individual_Pctile_All = percentile rank (average ties) of Pct_Individual within the chamber
+  - Individual_Pctile_Bin = the same rank within chamber and Funding_Group (0 without a group)
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# (label, lower bound inclusive) in ascending order of TTL_RECEIPTS
+FUNDING_GROUPS = [
+    ("<$100K", 0.0),
+    ("$100K–$1M", 100_000.0),
+    ("$1M–$5M", 1_000_000.0),
+    ("$5M–$10M", 5_000_000.0),
+    (">$10M", 10_000_000.0),
+]
+
+RAW_COLUMNS = ["TTL_RECEIPTS", "TTL_INDIV_CONTRIB", "OTHER_POL_CMTE_CONTRIB", "POL_PTY_CONTRIB", "CMTE_REFUNDS"]
+DERIVED_COLUMNS = [
+    "PAC_Contribution_%", "Party_Contribution_%", "Adj_Party_Contrib", "Adj_PAC_Contrib",
+    "Pct_Individual", "Funding_Group", "Individual_Pctile_All", "Individual_Pctile_Bin",
+]
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[column], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def _share(part: np.ndarray, receipts: np.ndarray) -> np.ndarray:
+    """part / receipts in percent, 0 where receipts <= 0."""
+    positive = receipts > 0
+    out = np.zeros(len(receipts))
+    np.divide(part, receipts, out=out, where=positive)
+    return out * 100.0
+
+
+def derive_funding_metrics(df: pd.DataFrame, chamber: Optional[str] = "chamber") -> pd.DataFrame:
+    """
+    Return a copy of `df` with DERIVED_COLUMNS (re)computed from RAW_COLUMNS.
+
+    Percentiles are ranked within each value of the `chamber` column; pass
+    chamber=None to rank the whole frame as one group. Missing or unparseable
+    raw values count as 0.
+    """
+    out = df.copy()
+    receipts = _numeric(df, "TTL_RECEIPTS")
+
+    adj_pac = np.clip(_numeric(df, "OTHER_POL_CMTE_CONTRIB"), 0.0, None)
+    adj_party = np.clip(_numeric(df, "POL_PTY_CONTRIB") - _numeric(df, "CMTE_REFUNDS"), 0.0, None)
+    out["Adj_PAC_Contrib"] = adj_pac
+    out["Adj_Party_Contrib"] = adj_party
+    out["PAC_Contribution_%"] = _share(adj_pac, receipts)
+    out["Party_Contribution_%"] = _share(adj_party, receipts)
+    pct_indiv = _share(_numeric(df, "TTL_INDIV_CONTRIB"), receipts)
+    out["Pct_Individual"] = pct_indiv
+
+    labels = np.array([label for label, _ in FUNDING_GROUPS], dtype=object)
+    edges = np.array([lower for _, lower in FUNDING_GROUPS])
+    bucket = np.searchsorted(edges, receipts, side="right") - 1
+    group = np.where(bucket >= 0, labels[np.maximum(bucket, 0)], "")
+    out["Funding_Group"] = group
+
+    keys = pd.DataFrame({
+        "chamber": df[chamber].to_numpy() if chamber else "",
+        "group": group,
+        "pct": pct_indiv,
+    }, index=df.index)
+    by_chamber = keys.groupby("chamber", sort=False)["pct"]
+    out["Individual_Pctile_All"] = by_chamber.rank(method="average", pct=True).to_numpy() * 100.0
+    by_bin = keys.groupby(["chamber", "group"], sort=False)["pct"]
+    pctile_bin = by_bin.rank(method="average", pct=True).to_numpy() * 100.0
+    out["Individual_Pctile_Bin"] = np.where(group == "", 0.0, pctile_bin)
+    return out
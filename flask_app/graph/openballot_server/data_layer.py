@@ -0,0 +1,19 @@
+# data_layer.py — the shared data layer (flask_app/datasets.py) for the FastAPI servers
+#
+# flask_app/__init__.py builds the Flask app's extensions, so importing
+# flask_app.datasets would need Flask and SQLAlchemy installed here. Instead the
+# flask_app directory is registered under another package name without running
+# its __init__, and datasets.py (plus percentiles.py, which it imports
+# relatively) load from there. Both only need numpy.
+
+import importlib, os, sys, types
+
+FLASK_APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+PACKAGE = "openballot_data"
+
+if PACKAGE not in sys.modules:
+    _package = types.ModuleType(PACKAGE)
+    _package.__path__ = [FLASK_APP_DIR]
+    sys.modules[PACKAGE] = _package
+
+datasets = importlib.import_module(f"{PACKAGE}.datasets")
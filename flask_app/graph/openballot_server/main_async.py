@@ -0,0 +1,276 @@
+# main_async.py — OpenBallot API, async serving mode
+#
+# Same endpoints and parameters as main.py, but:
+# - handlers are `async def`, so cache hits never touch the threadpool
+# - response bodies are cached per cycle and dataset version (serialized once)
+# - gzip (and brotli, if installed) bodies are precomputed for hot entries, in a
+#   worker thread so the event loop keeps serving
+# - cold graph/percentile computations run in a process pool, and concurrent
+#   requests for the same cold entry wait on a single computation
+#
+# Run:  uvicorn main_async:app --port 8001
+# Env:  OPENBALLOT_POOL_WORKERS (default: CPU count), OPENBALLOT_CACHE_ENTRIES (default 512)
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, Tuple
+import asyncio, gzip, hashlib, json, os, sys
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, HERE)
+
+from data_layer import datasets  # noqa: E402  (flask_app/datasets.py, without the Flask app)
+
+APP_NAME = datasets.APP_NAME
+POOL_WORKERS = int(os.environ.get("OPENBALLOT_POOL_WORKERS", os.cpu_count() or 1))
+CACHE_ENTRIES = int(os.environ.get("OPENBALLOT_CACHE_ENTRIES", 512))
+HOT_HITS = 2             # precompress an entry once it has been served this many times
+MIN_COMPRESS_BYTES = 1024
+
+CacheKey = Tuple[Any, ...]
+
+
+# -----------------------------
+# Work done in pool processes
+# -----------------------------
+def _dumps(obj: Any) -> bytes:
+    # Same encoding FastAPI's JSONResponse uses
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def _compute(kind: str, cycle: int, params: Tuple[Any, ...]) -> Tuple[str, bytes]:
+    """Build one response body for a cycle; returns (dataset version, JSON bytes)."""
+    ds = datasets.get_dataset(cycle)
+    if kind == "graph":
+        payload = ds.graph_payload(*params)
+    elif kind == "percentiles":
+        # An empty store gives the same shape as a populated one
+        party, state, topn, include_rows, rows_page, rows_per_page, rows_format = params
+        payload = ds.percentiles.query(party, state, topn, include_rows=include_rows, rows_page=rows_page,
+                                       rows_per_page=rows_per_page, rows_format=rows_format)
+    else:
+        raise ValueError(kind)
+    return ds.version, _dumps(payload)
+
+
+# -----------------------------
+# Response cache
+# -----------------------------
+class CachedBody:
+    """A serialized response body plus its precompressed variants."""
+
+    __slots__ = ("body", "etag", "encoded", "hits", "compressing")
+
+    def __init__(self, version: str, body: bytes):
+        self.body = body
+        self.etag = '"%s-%s"' % (version, hashlib.sha1(body).hexdigest()[:16])
+        self.encoded: Dict[str, bytes] = {}
+        self.hits = 0
+        self.compressing = False
+
+    def precompress(self) -> None:
+        if len(self.body) < MIN_COMPRESS_BYTES:
+            return
+        if "gzip" not in self.encoded:
+            self.encoded["gzip"] = gzip.compress(self.body, compresslevel=6)
+        if brotli is not None and "br" not in self.encoded:
+            self.encoded["br"] = brotli.compress(self.body, quality=5)
+
+
+class ResponseCache:
+    """LRU of CachedBody keyed by (cycle, dataset version, endpoint, params)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[CacheKey, CachedBody]" = OrderedDict()
+        self.pending: Dict[CacheKey, asyncio.Task] = {}
+        self.versions: Dict[int, str] = {}
+
+    def get(self, key: CacheKey) -> Optional[CachedBody]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, cycle: int, version: str, key: CacheKey, entry: CachedBody) -> None:
+        if version != self.versions.get(cycle):
+            # Source files changed: everything cached for the cycle's old version is stale
+            for stale in [k for k in self.entries if k[0] == cycle]:
+                del self.entries[stale]
+            self.versions[cycle] = version
+        self.entries[key] = entry
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+CACHE = ResponseCache(CACHE_ENTRIES)
+POOL: Optional[ProcessPoolExecutor] = None
+
+
+async def _build(kind: str, cycle: int, params: Tuple[Any, ...]) -> CachedBody:
+    # POOL None runs it on the default thread pool; either way not on the event loop
+    body_version, body = await asyncio.get_running_loop().run_in_executor(POOL, _compute, kind, cycle, params)
+    entry = CachedBody(body_version, body)
+    CACHE.put(cycle, body_version, (cycle, body_version, kind, params), entry)
+    return entry
+
+
+def _build_done(key: CacheKey, task: asyncio.Task) -> None:
+    if CACHE.pending.get(key) is task:
+        del CACHE.pending[key]
+    if not task.cancelled():
+        task.exception()  # mark retrieved when every waiter has gone
+
+
+async def _cached(kind: str, cycle: int, params: Tuple[Any, ...]) -> CachedBody:
+    loop = asyncio.get_running_loop()
+    ds = datasets.loaded_dataset(cycle)
+    if ds is None:
+        # First request for the cycle: load it off the event loop
+        ds = await loop.run_in_executor(None, datasets.get_dataset, cycle)
+    key = (cycle, ds.version, kind, params)
+    entry = CACHE.get(key)
+    if entry is not None:
+        return entry
+
+    task = CACHE.pending.get(key)
+    if task is None:
+        task = CACHE.pending[key] = loop.create_task(_build(kind, cycle, params))
+        task.add_done_callback(lambda t: _build_done(key, t))
+    # Concurrent requests for the entry share one build; shielded so a
+    # cancelled request (client gone) does not cancel it for the others
+    return await asyncio.shield(task)
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            out[name.strip().lower()] = q
+    return out
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match check: any listed tag equal to `etag` under weak comparison, or "*"."""
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+def _respond(request: Request, entry: CachedBody) -> Response:
+    entry.hits += 1
+    if entry.hits >= HOT_HITS and not entry.compressing:
+        # Compress off the event loop; until it finishes the entry is served as is
+        entry.compressing = True
+        asyncio.get_running_loop().run_in_executor(None, entry.precompress)
+
+    headers = {"ETag": entry.etag, "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match", ""), entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    for enc in ("br", "gzip"):
+        if accepted.get(enc, 0) > 0 and enc in entry.encoded:
+            headers["Content-Encoding"] = enc
+            return Response(entry.encoded[enc], media_type="application/json", headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+# -----------------------------
+# App
+# -----------------------------
+app = FastAPI(title=f"{APP_NAME} API (async)", version="0.3.0")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"], allow_methods=["*"], allow_headers=["*"],
+)
+
+
+@app.on_event("startup")
+async def _startup():
+    global POOL
+    datasets.get_dataset()
+    if POOL_WORKERS > 0:
+        # Workers are forked after the dataset is loaded, so they start with it in memory
+        POOL = ProcessPoolExecutor(max_workers=POOL_WORKERS, initializer=datasets.get_dataset)
+    # Warm and precompress the default views every page load asks for
+    for kind, params in (
+        ("graph", (None, None, 0)),
+        ("percentiles", ("All", None, 15, True, 1, None, "objects")),
+    ):
+        (await _cached(kind, datasets.DEFAULT_CYCLE, params)).precompress()
+
+
+@app.on_event("shutdown")
+def _shutdown():
+    if POOL is not None:
+        POOL.shutdown(cancel_futures=True)
+
+
+# -----------------------------
+# Endpoints
+# -----------------------------
+def _known_cycle(cycle: int) -> int:
+    if not datasets.has_cycle(cycle):
+        raise HTTPException(status_code=404, detail=f"No data for cycle {cycle}")
+    return cycle
+
+@app.get("/api/graph")
+async def get_graph(
+    request: Request,
+    party: Optional[str] = Query(None, description="Filter by party code (D/R/Other or raw in JSON)"),
+    state: Optional[str] = Query(None, description="Filter by state code (e.g., MA, TX)"),
+    min_amount: int = Query(0, ge=0, description="Keep donation links with amount >= min_amount"),
+    cycle: int = Query(datasets.DEFAULT_CYCLE, description="Election cycle (e.g., 2024)"),
+):
+    """
+    Returns a subgraph with the three FundingGroup nodes and filtered Politicians + inbound donation links.
+    """
+    return _respond(request, await _cached("graph", _known_cycle(cycle), (party, state, min_amount)))
+
+@app.get("/api/indiv_percentiles")
+async def indiv_percentiles(
+    request: Request,
+    party: str = Query("All", description="One of: All | D | R | Other"),
+    state: Optional[str] = Query(None, description="State code (e.g., CA)"),
+    topn: int = Query(15, ge=1, le=100),
+    include_rows: bool = Query(True, description="Include rows used by charts"),
+    rows_page: int = Query(1, ge=1, description="Page of rows to return"),
+    rows_per_page: Optional[int] = Query(None, ge=1, le=10000, description="Rows per page (default: all)"),
+    rows_format: str = Query("objects", pattern="^(objects|columns|binary)$",
+                             description="objects | columns (parallel arrays) | binary (base64 typed arrays)"),
+    cycle: int = Query(datasets.DEFAULT_CYCLE, description="Election cycle (e.g., 2024)"),
+):
+    """Same response as main.py's /api/indiv_percentiles, served from the per-version cache."""
+    params = (party, state, topn, include_rows, rows_page, rows_per_page, rows_format)
+    return _respond(request, await _cached("percentiles", _known_cycle(cycle), params))
+
+@app.get("/api/healthz")
+async def healthz(cycle: int = Query(datasets.DEFAULT_CYCLE)):
+    out = datasets.get_dataset(_known_cycle(cycle)).health()
+    out.update({
+        "mode": "async",
+        "pool_workers": POOL_WORKERS,
+        "cache_entries": len(CACHE.entries),
+        "brotli": brotli is not None,
+        "cycles": datasets.available_cycles(),
+    })
+    return out
@@ -0,0 +1,208 @@
+"""
+Incremental builder for the funding graph served by graph_api.
+
+Produces the same {meta, nodes, links} structure as graph_house.json from
+Politician rows (all chambers), with state and party filled in. Each
+candidate's node-relevant fields are fingerprinted; on rebuild, candidates
+whose fingerprint is unchanged reuse their node and links from the previous
+graph, so only the delta is recomputed.
+
+Committee nodes and their edges (from the contribution table, see
+ingest_contributions.py) are added on every build by add_committee_edges.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .datasets import _slim_party
+
+FUNDING_GROUPS = [
+    {"id": "grp_indiv", "type": "FundingGroup", "name": "Individuals", "issues": ["General"]},
+    {"id": "grp_pac", "type": "FundingGroup", "name": "PACs/Committees", "issues": ["General"]},
+    {"id": "grp_party", "type": "FundingGroup", "name": "Party Committees", "issues": ["General"]},
+]
+
+# Politician columns that feed a candidate's node and edges, in fingerprint order.
+GRAPH_FIELDS = [
+    "candidate_id",
+    "candidate_name",
+    "chamber",
+    "office_state",
+    "political_party_affiliation",
+    "total_individual_contributions",
+    "other_political_committee_contributions",
+    "political_party_contributions",
+    "individual_percentile_all",
+]
+
+COMMITTEE_PREFIX = "cmte_"
+
+# Funding group -> Politician column carrying that donation amount.
+EDGE_SOURCES = [
+    ("grp_indiv", "total_individual_contributions"),
+    ("grp_pac", "other_political_committee_contributions"),
+    ("grp_party", "political_party_contributions"),
+]
+
+
+def fingerprint_path(graph_path: str) -> str:
+    """Sidecar file that stores candidate fingerprints next to the graph."""
+    root, _ = os.path.splitext(graph_path)
+    return root + ".fingerprints.json"
+
+
+def fingerprint(row: Dict[str, Any]) -> str:
+    """Stable hash of the fields that determine a candidate's node and edges."""
+    raw = "\x1f".join(repr(row.get(f)) for f in GRAPH_FIELDS)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def build_candidate(row: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return (node, links) for one candidate, or (None, []) if it has no positive funding."""
+    pid = f"pol_{row['candidate_id']}"
+    links = []
+    for source, field in EDGE_SOURCES:
+        amount = float(row.get(field) or 0.0)
+        if amount > 0:
+            links.append({"source": source, "target": pid, "type": "donation", "amount": amount})
+    if not links:
+        return None, []
+
+    node = {
+        "id": pid,
+        "type": "Politician",
+        "name": row.get("candidate_name") or "",
+        "state": row.get("office_state") or "",
+        "party": _slim_party(row.get("political_party_affiliation") or ""),
+        "chamber": row.get("chamber") or "",
+        "indiv_pctile": float(row.get("individual_percentile_all") or 0.0),
+    }
+    return node, links
+
+
+def load_previous(graph_path: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Load the previous graph and its fingerprints, tolerating missing files.
+
+    Fingerprints without a readable graph are dropped: they would mark
+    candidates as unchanged with no node to reuse.
+    """
+    graph: Dict[str, Any] = {"nodes": [], "links": []}
+    fps: Dict[str, str] = {}
+    if not os.path.exists(graph_path):
+        return graph, fps
+    try:
+        with open(graph_path, "r", encoding="utf-8") as f:
+            graph = json.load(f)
+    except Exception as e:
+        print(f"Could not read previous graph ({e}); doing a full build")
+        return {"nodes": [], "links": []}, fps
+    fp_path = fingerprint_path(graph_path)
+    if os.path.exists(fp_path):
+        with open(fp_path, "r", encoding="utf-8") as f:
+            fps = json.load(f)
+    return graph, fps
+
+
+def build_graph(rows: Iterable[Dict[str, Any]], previous: Dict[str, Any],
+                previous_fps: Dict[str, str]) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, int]]:
+    """
+    Build the graph from candidate rows, reusing unchanged candidates from `previous`.
+
+    Returns (graph, fingerprints, stats) where stats counts added, changed,
+    unchanged and removed candidates.
+    """
+    prev_nodes = {n.get("id"): n for n in previous.get("nodes", []) if n.get("type") == "Politician"}
+    group_ids = {g["id"] for g in FUNDING_GROUPS}
+    prev_links: Dict[str, List[Dict[str, Any]]] = {}
+    for l in previous.get("links", []):
+        if l.get("source") in group_ids:  # committee edges are rebuilt separately
+            prev_links.setdefault(l.get("target"), []).append(l)
+
+    nodes: List[Dict[str, Any]] = [dict(g) for g in FUNDING_GROUPS]
+    links: List[Dict[str, Any]] = []
+    fps: Dict[str, str] = {}
+    stats = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+
+    for row in rows:
+        cid = row["candidate_id"]
+        fp = fingerprint(row)
+        fps[cid] = fp
+        pid = f"pol_{cid}"
+        old = previous_fps.get(cid)
+
+        if old == fp:
+            stats["unchanged"] += 1
+            node = prev_nodes.get(pid)
+            if node is not None:
+                nodes.append(node)
+                links.extend(prev_links.get(pid, []))
+                continue
+            # No node to reuse (no links last time, or the previous graph is
+            # out of step with its fingerprints): rebuild it below
+        else:
+            stats["added" if old is None else "changed"] += 1
+        node, cand_links = build_candidate(row)
+        if node is not None:
+            nodes.append(node)
+            links.extend(cand_links)
+
+    stats["removed"] = len(set(previous_fps) - set(fps))
+
+    chambers = sorted({n["chamber"] for n in nodes if n.get("type") == "Politician" and n.get("chamber")})
+    graph = {
+        "meta": {
+            "app": "OpenBallot",
+            "source": "politician table",
+            "n_candidates": len(nodes) - len(FUNDING_GROUPS),
+            "currency": "USD",
+            "chambers": chambers,
+            "note": "Funding mix → Politician (%s)." % ", ".join(chambers),
+        },
+        "nodes": nodes,
+        "links": links,
+    }
+    return graph, fps, stats
+
+
+def add_committee_edges(graph: Dict[str, Any], contributions: Iterable[Dict[str, Any]],
+                        per_candidate: int = 5) -> int:
+    """
+    Add Committee nodes and committee -> Politician donation links to `graph`.
+
+    contributions are contribution-table rows (committee_id, committee_name,
+    candidate_id, total_amount). Only each candidate's `per_candidate` largest
+    committees with a positive total are kept, and only for candidates already
+    in the graph. Returns the number of links added.
+    """
+    politicians = {n["id"] for n in graph["nodes"] if n.get("type") == "Politician"}
+    by_candidate: Dict[str, List[Dict[str, Any]]] = {}
+    for c in contributions:
+        pid = f"pol_{c['candidate_id']}"
+        if pid in politicians and (c.get("total_amount") or 0) > 0:
+            by_candidate.setdefault(pid, []).append(c)
+
+    committees: Dict[str, Dict[str, Any]] = {}
+    links: List[Dict[str, Any]] = []
+    for pid in sorted(by_candidate):
+        top = sorted(by_candidate[pid], key=lambda c: (-c["total_amount"], c["committee_id"]))[:per_candidate]
+        for c in top:
+            cid = COMMITTEE_PREFIX + c["committee_id"]
+            committees.setdefault(cid, {"id": cid, "type": "Committee", "name": c.get("committee_name") or c["committee_id"]})
+            links.append({"source": cid, "target": pid, "type": "donation", "amount": float(c["total_amount"])})
+
+    graph["nodes"].extend(committees[k] for k in sorted(committees))
+    graph["links"].extend(links)
+    graph["meta"]["n_committees"] = len(committees)
+    return len(links)
+
+
+def write_graph(graph_path: str, graph: Dict[str, Any], fps: Dict[str, str]) -> None:
+    """Atomically replace the graph JSON and its fingerprint sidecar."""
+    for path, obj, indent in ((graph_path, graph, 2), (fingerprint_path(graph_path), fps, None)):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(obj, f, indent=indent)
+        os.replace(tmp, path)
@@ -0,0 +1,179 @@
+"""
+Compact columnar wire format for graph payloads.
+
+Layout (all integers little-endian):
+
+    b"OBG1"                      magic
+    uint32                       header length in bytes
+    header                       UTF-8 JSON: meta, counts, column names, extras
+    padding to a 4-byte boundary
+    string table                 UTF-8 strings joined with "\\0"
+    padding to a 4-byte boundary
+    node string columns          one uint32[node_count] per NODE_STRING_FIELDS entry
+                                 (index into the string table, MISSING if absent)
+    node float columns           one float32[node_count] per NODE_FLOAT_FIELDS entry
+                                 (NaN if absent)
+    link source / target         uint32[link_count] node indices
+    link type                    uint32[link_count] string table indices
+    link amount                  float32[link_count]
+
+Any node or link keys outside the fixed columns travel in the header under
+"node_extras" / "link_extras" keyed by row index, so a decode round-trips the
+original objects. Amounts are float32, which is plenty for drawing edges but
+not for accounting.
+"""
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List
+
+GRAPH_BINARY_MIMETYPE = "application/x-openballot-graph"
+MAGIC = b"OBG1"
+MISSING = 0xFFFFFFFF
+
+NODE_STRING_FIELDS = ["id", "type", "name", "state", "party", "chamber"]
+NODE_FLOAT_FIELDS = ["indiv_pctile"]
+LINK_FIELDS = {"source", "target", "type", "amount"}
+
+
+def _pad4(buf: bytearray) -> None:
+    buf.extend(b"\0" * (-len(buf) % 4))
+
+
+def _le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_graph(payload: Dict[str, Any]) -> bytes:
+    """Encode a {"meta", "nodes", "links"} payload into the binary format."""
+    nodes: List[Dict[str, Any]] = payload.get("nodes", [])
+    links: List[Dict[str, Any]] = payload.get("links", [])
+
+    strings: List[str] = []
+    string_idx: Dict[str, int] = {}
+
+    def intern(s) -> int:
+        if s is None:
+            return MISSING
+        s = str(s)
+        i = string_idx.get(s)
+        if i is None:
+            i = string_idx[s] = len(strings)
+            strings.append(s)
+        return i
+
+    node_idx = {n.get("id"): i for i, n in enumerate(nodes)}
+    known_node_keys = set(NODE_STRING_FIELDS) | set(NODE_FLOAT_FIELDS)
+
+    str_cols = [array("I", [intern(n.get(f)) for n in nodes]) for f in NODE_STRING_FIELDS]
+    float_cols = []
+    for f in NODE_FLOAT_FIELDS:
+        col = array("f")
+        for n in nodes:
+            v = n.get(f)
+            col.append(float("nan") if v is None else float(v))
+        float_cols.append(col)
+
+    node_extras: Dict[str, Dict[str, Any]] = {}
+    for i, n in enumerate(nodes):
+        extra = {k: v for k, v in n.items() if k not in known_node_keys}
+        if extra:
+            node_extras[str(i)] = extra
+
+    src = array("I")
+    tgt = array("I")
+    typ = array("I")
+    amt = array("f")
+    link_extras: Dict[str, Dict[str, Any]] = {}
+    for i, l in enumerate(links):
+        src.append(node_idx[l["source"]])
+        tgt.append(node_idx[l["target"]])
+        typ.append(intern(l.get("type")))
+        amt.append(float(l.get("amount", 0) or 0))
+        extra = {k: v for k, v in l.items() if k not in LINK_FIELDS}
+        if extra:
+            link_extras[str(i)] = extra
+
+    string_blob = "\0".join(strings).encode("utf-8")
+    header = json.dumps({
+        "meta": payload.get("meta", {}),
+        "node_count": len(nodes),
+        "link_count": len(links),
+        "string_count": len(strings),
+        "string_bytes": len(string_blob),
+        "node_strings": NODE_STRING_FIELDS,
+        "node_floats": NODE_FLOAT_FIELDS,
+        "node_extras": node_extras,
+        "link_extras": link_extras,
+    }, separators=(",", ":")).encode("utf-8")
+
+    out = bytearray(MAGIC)
+    out += struct.pack("<I", len(header))
+    out += header
+    _pad4(out)
+    out += string_blob
+    _pad4(out)
+    for col in str_cols:
+        out += _le(col)
+    for col in float_cols:
+        out += _le(col)
+    for col in (src, tgt, typ, amt):
+        out += _le(col)
+    return bytes(out)
+
+
+def decode_graph(data: bytes) -> Dict[str, Any]:
+    """Decode the binary format back into a {"meta", "nodes", "links"} payload."""
+    if data[:4] != MAGIC:
+        raise ValueError("not an OpenBallot graph payload")
+    (hlen,) = struct.unpack_from("<I", data, 4)
+    header = json.loads(data[8:8 + hlen].decode("utf-8"))
+    off = 8 + hlen
+    off += -off % 4
+
+    blob = data[off:off + header["string_bytes"]].decode("utf-8")
+    strings = blob.split("\0") if header["string_count"] else []
+    off += header["string_bytes"]
+    off += -off % 4
+
+    def take(typecode: str, n: int) -> array:
+        nonlocal off
+        col = array(typecode)
+        col.frombytes(data[off:off + n * col.itemsize])
+        if sys.byteorder == "big":
+            col.byteswap()
+        off += n * col.itemsize
+        return col
+
+    n_nodes, n_links = header["node_count"], header["link_count"]
+    str_cols = [take("I", n_nodes) for _ in header["node_strings"]]
+    float_cols = [take("f", n_nodes) for _ in header["node_floats"]]
+    src, tgt, typ, amt = take("I", n_links), take("I", n_links), take("I", n_links), take("f", n_links)
+
+    nodes: List[Dict[str, Any]] = []
+    for i in range(n_nodes):
+        n: Dict[str, Any] = {}
+        for f, col in zip(header["node_strings"], str_cols):
+            if col[i] != MISSING:
+                n[f] = strings[col[i]]
+        for f, col in zip(header["node_floats"], float_cols):
+            if col[i] == col[i]:  # NaN marks a missing value
+                n[f] = col[i]
+        n.update(header["node_extras"].get(str(i), {}))
+        nodes.append(n)
+
+    links: List[Dict[str, Any]] = []
+    for i in range(n_links):
+        l = {"source": nodes[src[i]]["id"], "target": nodes[tgt[i]]["id"]}
+        if typ[i] != MISSING:
+            l["type"] = strings[typ[i]]
+        l["amount"] = amt[i]
+        l.update(header["link_extras"].get(str(i), {}))
+        links.append(l)
+
+    return {"meta": header["meta"], "nodes": nodes, "links": links}
@@ -0,0 +1,252 @@
+"""
+Built-in instrumentation, exposed in Prometheus text format at /metrics.
+
+  openballot_http_request_duration_seconds   histogram per route, method and status
+  openballot_http_request_sql_statements     histogram of SQL statements per request, per route
+  openballot_http_request_sql_seconds        histogram of time in SQL per request, per route
+  openballot_sql_statements_total            every statement, inside a request or not
+  openballot_gemini_request_duration_seconds histogram per operation and outcome
+  openballot_gemini_errors_total             Gemini failures per operation and exception type
+  openballot_cache_hits_total / _misses_total / _entries
+                                             response caches (read at scrape time)
+
+SQL is counted with SQLAlchemy cursor events on every engine (the primary and
+the read replica). Each response also gets a Server-Timing header (app time,
+SQL time and statement count) so a slow call can be broken down from the
+browser's network panel.
+
+Recording is a lock plus a few additions, so this stays on in production. The
+numbers are per process: under gunicorn each worker reports its own, so
+scrape the workers individually or sum them in queries.
+"""
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+GEMINI_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Labels, extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self.values: Dict[Labels, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def expose(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.doc}'
+        yield f'# TYPE {self.name} counter'
+        with self.lock:
+            items = sorted(self.values.items())
+        for labels, value in items:
+            yield f'{self.name}{_label_text(self.labels, labels)} {_number(value)}'
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (non-cumulative, last is +Inf), sum, count]
+        self.values: Dict[Labels, list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def expose(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.doc}'
+        yield f'# TYPE {self.name} histogram'
+        with self.lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self.values.items())
+        for labels, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float('inf'),), counts):
+                cumulative += c
+                le = f'le="{_number(bound)}"'
+                yield f'{self.name}_bucket{_label_text(self.labels, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_label_text(self.labels, labels)} {_number(total)}'
+            yield f'{self.name}_count{_label_text(self.labels, labels)} {n}'
+
+
+class CallbackGauge:
+    """Values read from `collect()` at scrape time: an iterable of (labels, value)."""
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str], collect: Callable[[], Iterable[Tuple[Labels, float]]],
+                 kind: str = 'gauge'):
+        self.name, self.doc, self.labels, self.collect, self.kind = name, doc, tuple(labels), collect, kind
+
+    def expose(self) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.doc}'
+        yield f'# TYPE {self.name} {self.kind}'
+        for labels, value in self.collect():
+            yield f'{self.name}{_label_text(self.labels, labels)} {_number(value)}'
+
+
+REGISTRY: List = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return '\n'.join(lines) + '\n'
+
+
+REQUEST_SECONDS = register(Histogram(
+    'openballot_http_request_duration_seconds', 'Time to handle a request, by route.',
+    ('route', 'method', 'status')))
+REQUEST_SQL_STATEMENTS = register(Histogram(
+    'openballot_http_request_sql_statements', 'SQL statements run while handling a request.',
+    ('route',), COUNT_BUCKETS))
+REQUEST_SQL_SECONDS = register(Histogram(
+    'openballot_http_request_sql_seconds', 'Time spent in SQL while handling a request.', ('route',)))
+SQL_STATEMENTS = register(Counter(
+    'openballot_sql_statements_total', 'SQL statements executed, inside a request or not.', ('context',)))
+GEMINI_SECONDS = register(Histogram(
+    'openballot_gemini_request_duration_seconds', 'Gemini API call latency.', ('operation', 'outcome'), GEMINI_BUCKETS))
+GEMINI_ERRORS = register(Counter(
+    'openballot_gemini_errors_total', 'Failed Gemini API calls.', ('operation', 'error')))
+
+# cache name -> stats() callable returning a dict with hits, misses and entries
+CACHES: Dict[str, Callable[[], dict]] = {}
+
+
+def register_cache(name: str, stats: Callable[[], dict]) -> None:
+    CACHES[name] = stats
+
+
+def _cache_values(key: str) -> Iterable[Tuple[Labels, float]]:
+    for name, stats in sorted(CACHES.items()):
+        yield (name,), stats().get(key, 0)
+
+
+register(CallbackGauge('openballot_cache_hits_total', 'Response cache hits.', ('cache',),
+                       lambda: _cache_values('hits'), kind='counter'))
+register(CallbackGauge('openballot_cache_misses_total', 'Response cache misses.', ('cache',),
+                       lambda: _cache_values('misses'), kind='counter'))
+register(CallbackGauge('openballot_cache_entries', 'Entries held by a response cache.', ('cache',),
+                       lambda: _cache_values('entries')))
+
+
+class timed_gemini_call:
+    """Context manager recording one Gemini call's latency and, on failure, its error."""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = 'error' if exc_type else 'ok'
+        GEMINI_SECONDS.observe(time.perf_counter() - self.start, self.operation, outcome)
+        if exc_type:
+            GEMINI_ERRORS.inc(self.operation, exc_type.__name__)
+        return False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_start')
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    if has_request_context() and 'metrics_start' in g:
+        g.sql_statements += 1
+        g.sql_seconds += elapsed
+        SQL_STATEMENTS.inc('request')
+    else:
+        SQL_STATEMENTS.inc('other')
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for a failed statement
+    connection = exception_context.connection
+    starts = connection.info.get('metrics_start') if connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _route() -> str:
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _start_request():
+    g.metrics_start = time.perf_counter()
+    g.sql_statements = 0
+    g.sql_seconds = 0.0
+
+
+def _finish_request(response: Response) -> Response:
+    start = g.get('metrics_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    route = _route()
+    REQUEST_SECONDS.observe(elapsed, route, request.method, str(response.status_code))
+    REQUEST_SQL_STATEMENTS.observe(g.sql_statements, route)
+    REQUEST_SQL_SECONDS.observe(g.sql_seconds, route)
+    response.headers.add('Server-Timing', f'app;dur={elapsed * 1000:.1f}')
+    response.headers.add('Server-Timing', f'sql;dur={g.sql_seconds * 1000:.1f};desc="{g.sql_statements} queries"')
+    return response
+
+
+def metrics_view():
+    return Response(render(), content_type=CONTENT_TYPE)
+
+
+def init_app(app) -> None:
+    """Install the request hooks, the SQL event listeners and the /metrics route."""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
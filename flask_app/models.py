@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, ForeignKey, Float, Date, DateTime
+from sqlalchemy import Integer, String, ForeignKey, Float, Date, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from . import db
@@ -11,8 +11,9 @@ from . import db
 
 class Politician(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
-    candidate_id: Mapped[str] = mapped_column(String, unique=True)
-    candidate_name: Mapped[str] = mapped_column(String)
+    cycle: Mapped[int] = mapped_column(Integer) # Election cycle the row was loaded for
+    candidate_id: Mapped[str] = mapped_column(String, index=True)
+    candidate_name: Mapped[str] = mapped_column(String, index=True)
     chamber: Mapped[str] = mapped_column(String) # Custom
     website_url: Mapped[str] = mapped_column(String, nullable=True)
     incumbent_challenger_indicator: Mapped[str] = mapped_column(String)
@@ -38,4 +39,50 @@ class Politician(db.Model):
     individual_percentile_bin: Mapped[str] = mapped_column(String)
     description_generated_at: Mapped[DateTime] = mapped_column(DateTime, nullable=True)
     description: Mapped[str] = mapped_column(String, nullable=True)
+    row_hash: Mapped[str] = mapped_column(String, nullable=True) # Hash of the CSV-derived fields, for incremental ingest
+    updated_at: Mapped[DateTime] = mapped_column(DateTime, nullable=True, default=func.now(), onupdate=func.now()) # UTC, any write to the row
 
+    # One row per candidate per cycle; the list filters all lead with cycle so a
+    # cycle's queries only touch that cycle's index range.
+    __table_args__ = (
+        db.UniqueConstraint('cycle', 'candidate_id', name='uq_politician_cycle_candidate'),
+        db.Index('ix_politician_cycle_chamber', 'cycle', 'chamber'),
+        db.Index('ix_politician_cycle_state', 'cycle', 'office_state'),
+        db.Index('ix_politician_cycle_party', 'cycle', 'political_party_affiliation'),
+    )
+
+
+class Contribution(db.Model):
+    """Itemized individual contributions from the FEC bulk files, summed per committee and candidate."""
+    id: Mapped[int] = mapped_column(primary_key=True)
+    cycle: Mapped[int] = mapped_column(Integer)
+    committee_id: Mapped[str] = mapped_column(String, index=True)
+    committee_name: Mapped[str] = mapped_column(String, nullable=True)
+    candidate_id: Mapped[str] = mapped_column(String, index=True)
+    election_year: Mapped[int] = mapped_column(Integer, nullable=True)
+    total_amount: Mapped[float] = mapped_column(Float)
+    contribution_count: Mapped[int] = mapped_column(Integer)
+
+    __table_args__ = (
+        db.UniqueConstraint('cycle', 'committee_id', 'candidate_id', name='uq_contribution_cycle_committee_candidate'),
+    )
+
+
+class FacetCount(db.Model):
+    """
+    Politician counts per facet value (chamber, state, party) and per pair of
+    facet values in a cycle, rebuilt by facets.refresh_facet_counts after every
+    ingest. Single-facet rows have other_dimension NULL. refreshed_at (UTC) is
+    the same on all of a cycle's rows and changes with every rebuild, so it
+    doubles as the cycle's data version.
+    """
+    id: Mapped[int] = mapped_column(primary_key=True)
+    cycle: Mapped[int] = mapped_column(Integer)
+    dimension: Mapped[str] = mapped_column(String)
+    value: Mapped[str] = mapped_column(String, nullable=True)
+    other_dimension: Mapped[str] = mapped_column(String, nullable=True)
+    other_value: Mapped[str] = mapped_column(String, nullable=True)
+    count: Mapped[int] = mapped_column(Integer)
+    refreshed_at: Mapped[DateTime] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (db.Index('ix_facet_count_cycle_dimensions', 'cycle', 'dimension', 'other_dimension'),)
@@ -0,0 +1,112 @@
+"""
+Rendered-HTML cache for /politician/<id>, and JSON cache for /api/politician/<id>.
+
+A politician page only changes when its row does: an ingest that changes the
+CSV-derived fields (row_hash), a new Gemini description
+(description_generated_at) or any other write (updated_at), or when the
+cycle's graph/percentile files are replaced (the dataset version, since the
+page embeds the politician's funding graph and percentile ranks). Those values
+are part of the cache key, so a changed row can never be served from a stale
+entry, even by another worker process that did not see the write.
+generate_description also calls invalidate() so the old entry is dropped
+right away instead of waiting for LRU eviction.
+
+The same key gives the page's ETag, and the later of updated_at and the
+dataset files' mtime its Last-Modified, so browsers and proxies revalidate
+with a 304 and no render.
+
+Env: POLITICIAN_PAGE_CACHE_SIZE (default 2048 pages, 0 in development mode so
+     template edits show up; 0 disables the cache)
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Hashable, Optional, Tuple
+
+from .assets import is_development
+from .metrics import register_cache
+
+PAGE_CACHE_SIZE = int(os.getenv('POLITICIAN_PAGE_CACHE_SIZE', 0 if is_development() else 2048))
+
+PageKey = Tuple[Hashable, ...]
+
+
+def page_key(politician, dataset_version: Optional[str] = None) -> PageKey:
+    """Cache key for a Politician row's rendered page or detail JSON."""
+    return (politician.candidate_id, politician.cycle, politician.row_hash,
+            politician.description_generated_at, politician.updated_at, dataset_version)
+
+
+def page_etag(key: PageKey) -> str:
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+
+
+def page_last_modified(politician, dataset=None) -> Optional[datetime]:
+    """
+    The later of updated_at (stored as naive UTC) and the dataset's source
+    files' mtime, as an aware datetime to whole seconds; both are in the key.
+    """
+    times = []
+    if politician.updated_at is not None:
+        times.append(politician.updated_at.replace(tzinfo=timezone.utc))
+    if dataset is not None and dataset.modified is not None:
+        times.append(datetime.fromtimestamp(dataset.modified, timezone.utc))
+    return max(times).replace(microsecond=0) if times else None
+
+
+class PageCache:
+    """Thread-safe LRU of rendered pages (or response bodies) keyed by page_key()."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[PageKey, object]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: PageKey):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: PageKey, body) -> None:
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, candidate_id: str) -> int:
+        """Drop every cached page for a candidate (all cycles); returns how many."""
+        with self.lock:
+            stale = [k for k in self.entries if k[0] == candidate_id]
+            for k in stale:
+                del self.entries[k]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'entries': len(self.entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+page_cache = PageCache(PAGE_CACHE_SIZE)
+register_cache('politician_page', page_cache.stats)
+
+# /api/politician/<id> bodies (CachedBody, so compressed variants are kept too)
+detail_cache = PageCache(PAGE_CACHE_SIZE)
+register_cache('politician_detail', detail_cache.stats)
@@ -0,0 +1,308 @@
+"""
+Precomputed summaries for /api/indiv_percentiles.
+
+Percentile rows are held as NumPy columns (party and state as categorical
+codes) in a RowStore. The rows only change when the CSVs are reloaded, so
+every (party x state) filter combination is summarized once at load time into
+index arrays plus medians. A request then becomes a lookup, an argpartition for
+the leaderboards, and slicing.
+"""
+
+import base64
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+PARTIES = ["D", "R", "Other"]
+ROW_FORMATS = ("objects", "columns", "binary")
+STORE_COLUMNS = ["names", "party_codes", "state_codes", "pct_indiv", "ttl_indiv", "ttl_rcpts"]
+
+
+def _p50(vals) -> float:
+    vals = np.asarray(vals, dtype=np.float64)
+    if vals.size == 0:
+        return 0.0
+    return float(np.median(vals))
+
+
+class RowStore:
+    """Columnar percentile rows with categorical party/state codes."""
+
+    def __init__(self, names: np.ndarray, party_codes: np.ndarray, parties: List[str],
+                 state_codes: np.ndarray, states: List[str], pct_indiv: np.ndarray,
+                 ttl_indiv: np.ndarray, ttl_rcpts: np.ndarray):
+        self.names = names
+        self.party_codes = party_codes
+        self.parties = parties
+        self.state_codes = state_codes
+        self.states = states
+        self.pct_indiv = pct_indiv
+        self.ttl_indiv = ttl_indiv
+        self.ttl_rcpts = ttl_rcpts
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "RowStore":
+        parties = sorted({r["party"] for r in rows})
+        states = sorted({r["state"] for r in rows})
+        party_idx = {p: i for i, p in enumerate(parties)}
+        state_idx = {s: i for i, s in enumerate(states)}
+        return cls(
+            names=np.array([r["name"] for r in rows], dtype=object),
+            party_codes=np.array([party_idx[r["party"]] for r in rows], dtype=np.uint8),
+            parties=parties,
+            state_codes=np.array([state_idx[r["state"]] for r in rows], dtype=np.uint16),
+            states=states,
+            pct_indiv=np.array([r["pct_indiv"] for r in rows], dtype=np.float64),
+            ttl_indiv=np.array([r["ttl_indiv"] for r in rows], dtype=np.float64),
+            ttl_rcpts=np.array([r["ttl_rcpts"] for r in rows], dtype=np.float64),
+        )
+
+    def save(self, directory: str) -> None:
+        """Write the columns as .npy files (names as fixed-width UTF-8) so they can be memory-mapped."""
+        os.makedirs(directory, exist_ok=True)
+        for col in STORE_COLUMNS:
+            arr = getattr(self, col)
+            if col == "names" and arr.dtype.kind == "O":
+                encoded = [n.encode("utf-8") for n in arr.tolist()]
+                arr = np.array(encoded, dtype="S%d" % max((len(n) for n in encoded), default=1))
+            np.save(os.path.join(directory, col + ".npy"), arr)
+        with open(os.path.join(directory, "categories.json"), "w", encoding="utf-8") as f:
+            json.dump({"parties": self.parties, "states": self.states}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "RowStore":
+        """Load columns written by save(); with mmap, processes share the page cache instead of copies."""
+        with open(os.path.join(directory, "categories.json"), encoding="utf-8") as f:
+            cats = json.load(f)
+        cols = {c: np.load(os.path.join(directory, c + ".npy"), mmap_mode="r" if mmap else None)
+                for c in STORE_COLUMNS}
+        return cls(parties=cats["parties"], states=cats["states"], **cols)
+
+    def __len__(self) -> int:
+        return len(self.pct_indiv)
+
+    def _names(self, idx: np.ndarray) -> List[str]:
+        names = self.names[idx]
+        if names.dtype.kind == "S":
+            return [n.decode("utf-8") for n in names.tolist()]
+        return names.tolist()
+
+    def rows(self, idx: np.ndarray) -> List[Dict[str, Any]]:
+        """Full row dicts (as read from the CSV) for the given indices."""
+        return [
+            {"name": n, "party": self.parties[p], "state": self.states[s],
+             "pct_indiv": v, "ttl_indiv": ti, "ttl_rcpts": tr}
+            for n, p, s, v, ti, tr in zip(
+                self._names(idx), self.party_codes[idx].tolist(), self.state_codes[idx].tolist(),
+                self.pct_indiv[idx].tolist(), self.ttl_indiv[idx].tolist(), self.ttl_rcpts[idx].tolist())
+        ]
+
+    def slim_rows(self, idx: np.ndarray) -> List[Dict[str, Any]]:
+        """The {name, party, state, pct_indiv} rows used by the charts."""
+        return [
+            {"name": n, "party": self.parties[p], "state": self.states[s], "pct_indiv": v}
+            for n, p, s, v in zip(
+                self._names(idx), self.party_codes[idx].tolist(),
+                self.state_codes[idx].tolist(), self.pct_indiv[idx].tolist())
+        ]
+
+
+    def columns(self, idx: np.ndarray) -> Dict[str, Any]:
+        """Slim rows as parallel arrays."""
+        parties, states = self.parties, self.states
+        return {
+            "name": self._names(idx),
+            "party": [parties[p] for p in self.party_codes[idx].tolist()],
+            "state": [states[s] for s in self.state_codes[idx].tolist()],
+            "pct_indiv": self.pct_indiv[idx].tolist(),
+        }
+
+    def binary_columns(self, idx: np.ndarray) -> Dict[str, Any]:
+        """
+        Slim rows as base64 typed arrays: party as uint8 and state as uint16
+        codes into the category lists, pct_indiv as float64, all little-endian.
+        """
+        def b64(arr, dtype):
+            return base64.b64encode(np.ascontiguousarray(arr, dtype=dtype).tobytes()).decode("ascii")
+        return {
+            "parties": self.parties,
+            "states": self.states,
+            "name": self._names(idx),
+            "party": b64(self.party_codes[idx], "<u1"),
+            "state": b64(self.state_codes[idx], "<u2"),
+            "pct_indiv": b64(self.pct_indiv[idx], "<f8"),
+        }
+
+    def encode_rows(self, idx: np.ndarray, fmt: str):
+        if fmt == "columns":
+            return self.columns(idx)
+        if fmt == "binary":
+            return self.binary_columns(idx)
+        return self.slim_rows(idx)
+
+
+def _smallest(vals: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k smallest values, ordered as a stable ascending sort would."""
+    n = len(vals)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        return np.argsort(vals, kind="stable")
+    part = np.argpartition(vals, k - 1)
+    kth = vals[part[k - 1]]
+    head = part[:k]
+    less = head[vals[head] < kth]
+    ties = np.flatnonzero(vals == kth)[:k - len(less)]
+    sel = np.concatenate([less, ties])
+    return sel[np.lexsort((sel, vals[sel]))]
+
+
+def _largest(vals: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the last k values of a stable ascending sort, in reverse order."""
+    n = len(vals)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        return np.argsort(vals, kind="stable")[::-1]
+    m = n - k
+    part = np.argpartition(vals, m)
+    kth = vals[part[m]]
+    tail = part[m:]
+    greater = tail[vals[tail] > kth]
+    eq = np.flatnonzero(vals == kth)
+    ties = eq[len(eq) - (k - len(greater)):]
+    sel = np.concatenate([greater, ties])
+    return sel[np.lexsort((-sel, -vals[sel]))]
+
+
+def _slice_len(n: int, start: Optional[int], stop: Optional[int]) -> int:
+    """How many items Python slicing [start:stop] keeps from a length-n list."""
+    return len(range(n)[start:stop])
+
+
+class _Cell:
+    """Row indices matching one (party, state) filter, in file order."""
+
+    __slots__ = ("idx", "n", "p50", "by_state", "sorted_pct")
+
+    def __init__(self, idx: np.ndarray, p50: float):
+        self.idx = idx
+        self.n = len(idx)
+        self.p50 = p50
+        self.by_state: List[Dict[str, Any]] = []
+        self.sorted_pct: Optional[np.ndarray] = None  # built by PercentileCube.rank
+
+
+_EMPTY = _Cell(np.empty(0, dtype=np.intp), 0.0)
+
+
+class PercentileCube:
+    """All filter combinations of a RowStore, summarized up front."""
+
+    def __init__(self, store: RowStore):
+        self.store = store
+        self.cells: Dict[Tuple[Optional[str], Optional[str]], _Cell] = {}
+        n = len(store)
+        pct = store.pct_indiv
+
+        def add(key, idx):
+            self.cells[key] = _Cell(idx, round(_p50(pct[idx]), 2))
+
+        # int32 indices halve the per-cell memory for anything short of 2**31 rows.
+        idx_dtype = np.int32 if n < 2**31 else np.int64
+        if n:
+            add((None, None), np.arange(n, dtype=idx_dtype))
+
+        # Stable argsorts group rows by code while keeping file order inside each group.
+        n_states = max(len(store.states), 1)
+        groupings = [
+            (store.party_codes.astype(np.int64), lambda c: (store.parties[c], None)),
+            (store.state_codes.astype(np.int64), lambda c: (None, store.states[c])),
+            (store.party_codes.astype(np.int64) * n_states + store.state_codes,
+             lambda c: (store.parties[c // n_states], store.states[c % n_states])),
+        ]
+        for codes, key_of in groupings:
+            order = np.argsort(codes, kind="stable").astype(idx_dtype)
+            sorted_codes = codes[order]
+            bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+            for chunk in np.split(order, bounds):
+                if len(chunk):
+                    add(key_of(int(codes[chunk[0]])), chunk)
+
+        states = sorted({s for (_, s) in self.cells if s is not None})
+        for (party, state), cell in self.cells.items():
+            keys = states if state is None else [state]
+            by_state = []
+            for s in keys:
+                sub = self.cells.get((party, s))
+                if sub is not None:
+                    by_state.append({"state": s, "p50": sub.p50, "n": sub.n})
+            cell.by_state = by_state
+
+    def cell(self, party: Optional[str], state: Optional[str]) -> _Cell:
+        return self.cells.get((party, state), _EMPTY)
+
+    def rank(self, value: float, party: Optional[str] = None, state: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Percentile rank of a pct_indiv value within one filter cell: the share
+        of its rows at or below the value. None for an empty cell.
+        """
+        cell = self.cell(party, state)
+        if not cell.n:
+            return None
+        if cell.sorted_pct is None:
+            cell.sorted_pct = np.sort(self.store.pct_indiv[cell.idx])
+        at_or_below = int(np.searchsorted(cell.sorted_pct, value, side="right"))
+        return {"rank": round(100.0 * at_or_below / cell.n, 2), "n": cell.n}
+
+    def query(self, party: Optional[str], state: Optional[str], topn: int, include_rows: bool = True,
+              rows_page: int = 1, rows_per_page: Optional[int] = None,
+              rows_format: str = "objects") -> Dict[str, Any]:
+        """
+        Build the /api/indiv_percentiles response for one filter combination.
+
+        rows are included unless include_rows is False; rows_per_page pages
+        them (all rows otherwise) and rows_format picks one of ROW_FORMATS.
+        """
+        party_key = party if party and party != "All" else None
+        state_key = state or None
+        cell = self.cell(party_key, state_key)
+
+        by_party = []
+        for p in PARTIES:
+            pc = self.cell(p, state_key)
+            by_party.append({"party": p, "p50": pc.p50, "n": pc.n})
+
+        # Same row counts as slicing a fully sorted list with [:topn] / [-topn:].
+        vals = self.store.pct_indiv[cell.idx]
+        low = cell.idx[_smallest(vals, _slice_len(cell.n, None, topn))]
+        high = cell.idx[_largest(vals, _slice_len(cell.n, -topn, None))]
+
+        out = {
+            "summary": {
+                "n": cell.n,
+                "p50_overall": cell.p50,
+                "p50_D": next((x["p50"] for x in by_party if x["party"]=="D"), 0.0),
+                "p50_R": next((x["p50"] for x in by_party if x["party"]=="R"), 0.0),
+                "unit": "percent",
+            },
+            "by_party": by_party,
+            "by_state": cell.by_state,
+            "leaders_low": self.store.rows(low),
+            "leaders_high": self.store.rows(high),
+        }
+        if include_rows:
+            per_page = rows_per_page or max(cell.n, 1)
+            start = (rows_page - 1) * per_page
+            page_idx = cell.idx[start:start + per_page]
+            out["rows"] = self.store.encode_rows(page_idx, rows_format)
+            out["rows_meta"] = {
+                "total": cell.n,
+                "page": rows_page,
+                "per_page": per_page,
+                "total_pages": (cell.n + per_page - 1) // per_page,
+                "format": rows_format,
+            }
+        return out
@@ -1,39 +1,134 @@
-from flask import redirect, render_template, request, jsonify, url_for
-import pandas as pd
+from flask import Blueprint, make_response, redirect, render_template, request, jsonify, url_for
 from fuzzywuzzy import process
 import csv
-from datetime import datetime
+import hashlib
+import os
+from datetime import datetime, timezone
 from sqlalchemy import func
 
-from . import app, db
+from . import db
+from .assets import is_development
+from .compression import CachedBody, cached_response
+from .datasets import DEFAULT_CYCLE, _slim_party, get_dataset, has_cycle, normalize_pct
+from .db_engine import read_session
+from .facets import facet_counts
 from .models import Politician
+from .page_cache import detail_cache, page_cache, page_etag, page_key, page_last_modified
 from .Gemini_API import describe_politician
 
-@app.route('/politician/<string:politician_id>')
+bp = Blueprint('politicians', __name__)
+
+def find_politician(politician_id, cycle=None):
+    """A candidate's row for `cycle`, or their most recent cycle's row when cycle is None."""
+    query = Politician.query.filter_by(candidate_id=politician_id)
+    if cycle is not None:
+        query = query.filter_by(cycle=cycle)
+    return query.order_by(Politician.cycle.desc()).first()
+
+# Politician columns sent as the detail profile
+DETAIL_EXCLUDED = {'id', 'description', 'description_generated_at', 'row_hash', 'updated_at'}
+PROFILE_FIELDS = [c.name for c in Politician.__table__.columns if c.name not in DETAIL_EXCLUDED]
+
+def politician_dataset(politician):
+    """The graph/percentile dataset for the politician's cycle, or None if that cycle has no data files."""
+    return get_dataset(politician.cycle) if has_cycle(politician.cycle) else None
+
+def politician_detail(politician, ds):
+    """Profile, description status, funding-graph neighbourhood and percentile ranks for one politician."""
+    graph = ds.politician_graph(politician.candidate_id) if ds is not None else None
+    party = _slim_party(politician.political_party_affiliation or '')
+    state = politician.office_state or None
+    ranks = None
+    if ds is not None and len(ds.row_store):
+        # Where the politician's individual-contribution share falls among all, party, state and party+state peers;
+        # the cube holds shares normalized to 0-100, so the DB value is too. No state, no state ranks
+        value = normalize_pct(politician.percent_individual or 0.0)
+        cube = ds.percentiles
+        ranks = {'all': cube.rank(value), 'party': cube.rank(value, party),
+                 'state': cube.rank(value, None, state) if state else None,
+                 'party_state': cube.rank(value, party, state) if state else None}
+    generated_at = politician.description_generated_at
+    return {
+        'candidate_id': politician.candidate_id,
+        'cycle': politician.cycle,
+        'profile': {field: getattr(politician, field) for field in PROFILE_FIELDS},
+        'description': {
+            'status': 'ready' if politician.description else 'missing',
+            'html': politician.description,
+            'generated_at': generated_at.isoformat() if generated_at else None,
+            'generate_url': url_for('politicians.generate_description', politician_id=politician.candidate_id,
+                                    cycle=politician.cycle),
+        },
+        'graph': graph,
+        'percentiles': {
+            'pct_indiv': politician.percent_individual,
+            'party': party,
+            'state': state,
+            'individual_percentile_all': politician.individual_percentile_all,
+            'individual_percentile_bin': politician.individual_percentile_bin,
+            'ranks': ranks,
+        },
+    }
+
+@bp.route('/api/politician/<string:politician_id>')
+def api_politician(politician_id):
+    """Everything the politician page needs in one response; revalidate with If-None-Match."""
+    politician = find_politician(politician_id, request.args.get('cycle', type=int))
+    if politician is None:
+        return jsonify({'error': 'Politician not found'}), 404
+
+    ds = politician_dataset(politician)
+    key = page_key(politician, ds.version if ds is not None else None)
+    etag = page_etag(key)
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        entry = detail_cache.get(key)
+        if entry is None:
+            body = jsonify(politician_detail(politician, ds))
+            entry = CachedBody(body.get_data(), body.mimetype)
+            detail_cache.put(key, entry)
+        response = cached_response(entry)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+@bp.route('/politician/<string:politician_id>')
 def politician(politician_id):
-    print(politician_id)
-    politician = Politician.query.filter_by(candidate_id=politician_id).first()
-    print(politician)
-    
-    # Generate description if it doesn't exist
-    # if politician and not politician.description:
-        
-    #     try:
-    #         description = describe_politician(politician.candidate_name, politician.website_url)
-    #         politician.description = description
-    #         db.session.commit()
-    #     except Exception as e:
-    #         print(f"Error generating description for {politician.candidate_name}: {e}")
-    #         # Set a default description if Gemini API fails
-    #         politician.description = f"{politician.candidate_name} is a {politician.political_party_affiliation} politician representing {politician.office_state}."
-    #         db.session.commit()
-    
-    return render_template('politician.html', politician = politician)
+    politician = find_politician(politician_id, request.args.get('cycle', type=int))
+    if politician is None:
+        return render_template('politician.html', politician = politician)
+
+    ds = politician_dataset(politician)
+    key = page_key(politician, ds.version if ds is not None else None)
+    etag = page_etag(key)
+    last_modified = page_last_modified(politician, ds)
+    if request.if_none_match:
+        # Weak comparison: compressed responses carry the weak form of the ETag
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        not_modified = bool(last_modified and request.if_modified_since
+                            and last_modified <= request.if_modified_since)
 
-@app.route('/generate_description/<string:politician_id>')
+    if not_modified:
+        response = make_response('', 304)
+    else:
+        body = page_cache.get(key)
+        if body is None:
+            body = render_template('politician.html', politician = politician,
+                                   detail = politician_detail(politician, ds))
+            page_cache.put(key, body)
+        response = make_response(body)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Let browsers and proxies store the page but check the ETag on every use
+    response.cache_control.no_cache = True
+    return response
+
+@bp.route('/generate_description/<string:politician_id>')
 def generate_description(politician_id):
     try:
-        politician = Politician.query.filter_by(candidate_id=politician_id).first()
+        politician = find_politician(politician_id, request.args.get('cycle', type=int))
         if not politician:
             return jsonify({'error': 'Politician not found'}), 404
         
@@ -42,8 +137,10 @@ def generate_description(politician_id):
         
         # Save description to database
         politician.description = description
-        politician.description_generated_at = datetime.now()
+        politician.description_generated_at = datetime.now(timezone.utc).replace(tzinfo=None)  # naive UTC, like updated_at
         db.session.commit()
+        page_cache.invalidate(politician.candidate_id)
+        detail_cache.invalidate(politician.candidate_id)
         
         return jsonify({
             'description': description,
@@ -54,14 +151,15 @@ def generate_description(politician_id):
         print(f"Error generating description for {politician_id}: {e}")
         return jsonify({'error': 'Failed to generate description'}), 500
 
-@app.route('/search', methods=['POST'])
+@bp.route('/search', methods=['POST'])
 def search():
     search_term = request.form['search']
-    return redirect(url_for('search_results', search_term = search_term))
+    return redirect(url_for('.search_results', search_term = search_term))
 
-@app.route('/search/<string:search_term>')
+@bp.route('/search/<string:search_term>')
 def search_results(search_term: str):
-    matches = fuzzy_search_politicians(search_term, limit=20)
+    cycle = request.args.get('cycle', DEFAULT_CYCLE, type=int)
+    matches = fuzzy_search_politicians(search_term, limit=20, cycle=cycle)
     return render_template('search_results.html', search_term=search_term, search_results=matches)
 
 def format_name_for_search(name):
@@ -74,19 +172,21 @@ def format_name_for_search(name):
             return f"{first_name} {last_name}"
     return name.strip()
 
-def fuzzy_search_politicians(search_term, limit=20):
+def fuzzy_search_politicians(search_term, limit=20, cycle=DEFAULT_CYCLE):
     """
-    Perform fuzzy search on politician names in the database.
+    Perform fuzzy search on politician names in one election cycle.
     Returns top matches with their IDs and scores.
     """
-    # Get all politicians from the database
-    politicians = Politician.query.all()
+    # Get the cycle's politicians from the database
+    politicians = read_session().query(Politician).filter_by(cycle=cycle).all()
     
     if not politicians:
         return []
     
     politician_id_to_name = {}
+    by_id = {}
     for politician in politicians:
+        by_id[politician.candidate_id] = politician
         # Convert "LAST, FIRST" to "FIRST LAST" for better matching
         formatted_name = format_name_for_search(politician.candidate_name)
         politician_id_to_name[politician.candidate_id] = formatted_name
@@ -97,7 +197,7 @@ def fuzzy_search_politicians(search_term, limit=20):
     politician_results = []
 
     for match in matches:
-        politician = Politician.query.filter_by(candidate_id=match[2]).first()
+        politician = by_id[match[2]]
         politician_results.append((politician, match[1]))
 
     # return politician_results
@@ -116,16 +216,17 @@ def fuzzy_search_politicians(search_term, limit=20):
         })
     return results
 
-@app.route('/list_politicians')
+@bp.route('/list_politicians')
 def list_politicians():
     # Get query parameters for filtering
     search_term = request.args.get('search', '').strip()
     chambers = request.args.getlist('chamber')
     states = request.args.getlist('state')
     parties = request.args.getlist('party')
+    cycle = request.args.get('cycle', DEFAULT_CYCLE, type=int)
     
-    # Start with base query
-    query = Politician.query
+    # Start with base query, scoped to the election cycle
+    query = read_session().query(Politician).filter(Politician.cycle == cycle)
     
     # Apply search filter
     if search_term:
@@ -145,52 +246,63 @@ def list_politicians():
     
     politicians = query.all()
     
+    # Sidebar counts are unfiltered; they come from the facet_count table once an ingest has built it
     # Get chambers with counts
-    chamber_counts = db.session.query(
-        Politician.chamber,
-        func.count(Politician.id).label('count')
-    ).filter(
-        Politician.chamber.isnot(None)
-    ).group_by(
-        Politician.chamber
-    ).order_by(
-        func.count(Politician.id).desc()
-    ).all()
+    chamber_counts = facet_counts(read_session(), cycle, 'chamber', {})
+    if chamber_counts is None:
+        chamber_counts = read_session().query(
+            Politician.chamber,
+            func.count(Politician.id).label('count')
+        ).filter(
+            Politician.cycle == cycle,
+            Politician.chamber.isnot(None)
+        ).group_by(
+            Politician.chamber
+        ).order_by(
+            func.count(Politician.id).desc()
+        ).all()
     
     all_chambers = [chamber[0] for chamber in chamber_counts]
     
     # Get states with counts
-    state_counts = db.session.query(
-        Politician.office_state,
-        func.count(Politician.id).label('count')
-    ).filter(
-        Politician.office_state.isnot(None),
-        Politician.office_state != '00'
-    ).group_by(
-        Politician.office_state
-    ).order_by(
-        func.count(Politician.id).desc()
-    ).all()
+    state_counts = facet_counts(read_session(), cycle, 'state', {})
+    if state_counts is None:
+        state_counts = read_session().query(
+            Politician.office_state,
+            func.count(Politician.id).label('count')
+        ).filter(
+            Politician.cycle == cycle,
+            Politician.office_state.isnot(None),
+            Politician.office_state != '00'
+        ).group_by(
+            Politician.office_state
+        ).order_by(
+            func.count(Politician.id).desc()
+        ).all()
     
     all_states = [state[0] for state in state_counts]
     
     # Get parties sorted by number of candidates (most to least)
-    party_counts = db.session.query(
-        Politician.political_party_affiliation,
-        func.count(Politician.id).label('count')
-    ).filter(
-        Politician.political_party_affiliation.isnot(None)
-    ).group_by(
-        Politician.political_party_affiliation
-    ).order_by(
-        func.count(Politician.id).desc()
-    ).all()
+    party_counts = facet_counts(read_session(), cycle, 'party', {})
+    if party_counts is None:
+        party_counts = read_session().query(
+            Politician.political_party_affiliation,
+            func.count(Politician.id).label('count')
+        ).filter(
+            Politician.cycle == cycle,
+            Politician.political_party_affiliation.isnot(None)
+        ).group_by(
+            Politician.political_party_affiliation
+        ).order_by(
+            func.count(Politician.id).desc()
+        ).all()
     
     all_parties = [party[0] for party in party_counts]
     
     return render_template('list_politicians.html', 
                          politicians=politicians,
                          search_term=search_term,
+                         cycle=cycle,
                          selected_chambers=chambers,
                          selected_states=states,
                          selected_parties=parties,
@@ -201,7 +313,7 @@ def list_politicians():
                          state_counts=state_counts,
                          party_counts=party_counts)
 
-@app.route('/api/politicians')
+@bp.route('/api/politicians')
 def api_politicians():
     """API endpoint for live search and filtering"""
     # Get query parameters for filtering
@@ -211,9 +323,10 @@ def api_politicians():
     parties = request.args.getlist('party')
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 100))
+    cycle = request.args.get('cycle', DEFAULT_CYCLE, type=int)
     
-    # Start with base query
-    query = Politician.query
+    # Start with base query, scoped to the election cycle
+    query = read_session().query(Politician).filter(Politician.cycle == cycle)
     
     # Apply search filter
     if search_term:
@@ -234,67 +347,75 @@ def api_politicians():
     # Get total count for pagination
     total_count = query.count()
     
-    # Get live counts for each filter category (based on current search + other filters)
+    # Get live counts for each filter category (based on current search + other filters).
+    # Without a search term they come from the facet_count table when it can answer.
+    filters = {'chamber': chambers, 'state': states, 'party': parties}
     # Chamber counts (excluding chamber filter to show remaining options)
-    chamber_query = Politician.query
-    if search_term:
-        chamber_query = chamber_query.filter(Politician.candidate_name.ilike(f'%{search_term}%'))
-    if states:
-        chamber_query = chamber_query.filter(Politician.office_state.in_(states))
-    if parties:
-        chamber_query = chamber_query.filter(Politician.political_party_affiliation.in_(parties))
-    
-    chamber_counts = chamber_query.filter(
-        Politician.chamber.isnot(None)
-    ).with_entities(
-        Politician.chamber,
-        func.count(Politician.id).label('count')
-    ).group_by(
-        Politician.chamber
-    ).order_by(
-        func.count(Politician.id).desc()
-    ).all()
+    chamber_counts = None if search_term else facet_counts(read_session(), cycle, 'chamber', filters)
+    if chamber_counts is None:
+        chamber_query = read_session().query(Politician).filter(Politician.cycle == cycle)
+        if search_term:
+            chamber_query = chamber_query.filter(Politician.candidate_name.ilike(f'%{search_term}%'))
+        if states:
+            chamber_query = chamber_query.filter(Politician.office_state.in_(states))
+        if parties:
+            chamber_query = chamber_query.filter(Politician.political_party_affiliation.in_(parties))
+    
+        chamber_counts = chamber_query.filter(
+            Politician.chamber.isnot(None)
+        ).with_entities(
+            Politician.chamber,
+            func.count(Politician.id).label('count')
+        ).group_by(
+            Politician.chamber
+        ).order_by(
+            func.count(Politician.id).desc()
+        ).all()
     
     # State counts (excluding state filter to show remaining options)
-    state_query = Politician.query
-    if search_term:
-        state_query = state_query.filter(Politician.candidate_name.ilike(f'%{search_term}%'))
-    if chambers:
-        state_query = state_query.filter(Politician.chamber.in_(chambers))
-    if parties:
-        state_query = state_query.filter(Politician.political_party_affiliation.in_(parties))
-    
-    state_counts = state_query.filter(
-        Politician.office_state.isnot(None),
-        Politician.office_state != '00'
-    ).with_entities(
-        Politician.office_state,
-        func.count(Politician.id).label('count')
-    ).group_by(
-        Politician.office_state
-    ).order_by(
-        func.count(Politician.id).desc()
-    ).all()
+    state_counts = None if search_term else facet_counts(read_session(), cycle, 'state', filters)
+    if state_counts is None:
+        state_query = read_session().query(Politician).filter(Politician.cycle == cycle)
+        if search_term:
+            state_query = state_query.filter(Politician.candidate_name.ilike(f'%{search_term}%'))
+        if chambers:
+            state_query = state_query.filter(Politician.chamber.in_(chambers))
+        if parties:
+            state_query = state_query.filter(Politician.political_party_affiliation.in_(parties))
+    
+        state_counts = state_query.filter(
+            Politician.office_state.isnot(None),
+            Politician.office_state != '00'
+        ).with_entities(
+            Politician.office_state,
+            func.count(Politician.id).label('count')
+        ).group_by(
+            Politician.office_state
+        ).order_by(
+            func.count(Politician.id).desc()
+        ).all()
     
     # Party counts (excluding party filter to show remaining options)
-    party_query = Politician.query
-    if search_term:
-        party_query = party_query.filter(Politician.candidate_name.ilike(f'%{search_term}%'))
-    if chambers:
-        party_query = party_query.filter(Politician.chamber.in_(chambers))
-    if states:
-        party_query = party_query.filter(Politician.office_state.in_(states))
-    
-    party_counts = party_query.filter(
-        Politician.political_party_affiliation.isnot(None)
-    ).with_entities(
-        Politician.political_party_affiliation,
-        func.count(Politician.id).label('count')
-    ).group_by(
-        Politician.political_party_affiliation
-    ).order_by(
-        func.count(Politician.id).desc()
-    ).all()
+    party_counts = None if search_term else facet_counts(read_session(), cycle, 'party', filters)
+    if party_counts is None:
+        party_query = read_session().query(Politician).filter(Politician.cycle == cycle)
+        if search_term:
+            party_query = party_query.filter(Politician.candidate_name.ilike(f'%{search_term}%'))
+        if chambers:
+            party_query = party_query.filter(Politician.chamber.in_(chambers))
+        if states:
+            party_query = party_query.filter(Politician.office_state.in_(states))
+    
+        party_counts = party_query.filter(
+            Politician.political_party_affiliation.isnot(None)
+        ).with_entities(
+            Politician.political_party_affiliation,
+            func.count(Politician.id).label('count')
+        ).group_by(
+            Politician.political_party_affiliation
+        ).order_by(
+            func.count(Politician.id).desc()
+        ).all()
     
     # Apply pagination
     politicians = query.offset((page - 1) * per_page).limit(per_page).all()
@@ -317,6 +438,7 @@ def api_politicians():
     return jsonify({
         'politicians': results,
         'total_count': total_count,
+        'cycle': cycle,
         'page': page,
         'per_page': per_page,
         'total_pages': (total_count + per_page - 1) // per_page,
@@ -325,7 +447,7 @@ def api_politicians():
         'party_counts': [{'party': p[0], 'count': p[1]} for p in party_counts]
     })
 
-@app.route('/admin/clear-cache')
+@bp.route('/admin/clear-cache')
 def clear_description_cache():
     """Admin route to clear all politician description cache."""
     try:
@@ -343,25 +465,49 @@ def clear_description_cache():
             'error': str(e)
         }), 500
 
-@app.route('/graph')
+@bp.route('/graph')
 def graph_viewer():
     """Graph viewer page without specific politician."""
     return render_template('graph_viewer.html')
 
-@app.route('/graph/<string:politician_id>')
+@bp.route('/graph/<string:politician_id>')
 def graph_viewer_politician(politician_id):
     """Graph viewer page for specific politician."""
-    politician = Politician.query.filter_by(candidate_id=politician_id).first()
-    return render_template('graph_viewer.html', politician=politician)
+    politician = find_politician(politician_id, request.args.get('cycle', type=int))
+    detail = politician_detail(politician, politician_dataset(politician)) if politician else None
+    return render_template('graph_viewer.html', politician=politician, detail=detail)
+
+OPENBALLOT_PAGES_DIR = os.path.join(os.path.dirname(__file__), 'graph', 'openballot_server')
+_openballot_pages = {}
+
+def openballot_page(name):
+    """(html, etag) for a page in graph/openballot_server, read from disk once outside development mode."""
+    page = None if is_development() else _openballot_pages.get(name)
+    if page is None:
+        path = os.path.join(OPENBALLOT_PAGES_DIR, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        page = _openballot_pages[name] = (content, hashlib.sha1(content.encode('utf-8')).hexdigest()[:20])
+    return page
 
-@app.route('/network')
+def serve_openballot_page(name, missing_message):
+    page = openballot_page(name)
+    if page is None:
+        return missing_message, 404
+    content, etag = page
+    response = make_response(content)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@bp.route('/network')
 def network_viewer():
     """Serve the working OpenBallot network visualization."""
-    import os
-    demo_path = os.path.join(os.path.dirname(__file__), 'graph', 'openballot_server', 'demo.html')
-    if os.path.exists(demo_path):
-        with open(demo_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return content
-    else:
-        return "Network visualization not found", 404
+    return serve_openballot_page('demo.html', "Network visualization not found")
+
+@bp.route('/charts.html')
+def charts_viewer():
+    """Serve the OpenBallot charts page (linked from the network visualization)."""
+    return serve_openballot_page('charts.html', "Charts not found")
@@ -0,0 +1,175 @@
+"""
+On-demand profiling of single requests.
+
+Set PROFILE_TOKEN to enable it, then send the token in an X-Profile header:
+
+    curl -H "X-Profile: $PROFILE_TOKEN" "https://host/api/politicians?state=CA&party=DEM"
+
+That request runs under cProfile, and every SQL statement it executes is
+recorded with its duration. The result is written to PROFILE_DIR as
+<id>.prof (pstats format, for snakeviz or pstats.Stats) and <id>.json (request,
+timings, SQL and the top functions by cumulative time). The response's
+X-Profile-Id header names the profile. The same token is needed to fetch it:
+
+    GET /_profiles                 recent profiles, newest first
+    GET /_profiles/<id>            the JSON summary
+    GET /_profiles/<id>.prof       the raw pstats file
+
+Without PROFILE_TOKEN no hooks or listeners are installed, so regular requests
+pay nothing. With it set, an unprofiled request costs one header lookup.
+
+Env: PROFILE_TOKEN, PROFILE_DIR (<instance>/profiles), PROFILE_KEEP (50 newest kept)
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import abort, g, has_request_context, jsonify, request, send_from_directory
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+TOKEN = os.getenv('PROFILE_TOKEN')
+KEEP = int(os.getenv('PROFILE_KEEP', 50))
+HEADER = 'X-Profile'
+TOP_FUNCTIONS = 40
+MAX_STATEMENT_CHARS = 2000
+
+PROFILE_ID = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$')
+
+profile_dir: Optional[str] = None
+
+
+def _authorized() -> bool:
+    supplied = request.headers.get(HEADER)
+    # Compare bytes: compare_digest rejects str with non-ASCII characters, and
+    # WSGI headers arrive decoded as latin-1
+    return bool(supplied) and hmac.compare_digest(supplied.encode('latin-1', 'replace'), TOKEN.encode())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'profile_sql' in g:
+        conn.info.setdefault('profile_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'profile_sql' in g:
+        starts = conn.info.get('profile_start')
+        elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+        g.profile_sql.append({
+            'statement': statement[:MAX_STATEMENT_CHARS],
+            'parameters': repr(parameters)[:MAX_STATEMENT_CHARS],
+            'executemany': executemany,
+            'ms': round(elapsed * 1000, 3),
+        })
+
+
+def _start_profile():
+    if request.endpoint in ('list_profiles', 'get_profile') or not _authorized():
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiler is already active on this thread
+        return
+    g.profiler = profiler
+    g.profile_sql = []
+    g.profile_start = time.perf_counter()
+
+
+def _top_functions(stats: pstats.Stats) -> str:
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    return out.getvalue()
+
+
+def _prune():
+    names = sorted(n for n in os.listdir(profile_dir) if n.endswith('.json'))
+    for name in names[:-KEEP] if KEEP > 0 else names:
+        for suffix in ('.json', '.prof'):
+            path = os.path.join(profile_dir, name[:-5] + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _finish_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    elapsed = time.perf_counter() - g.pop('profile_start')
+    sql = g.pop('profile_sql')
+
+    now = datetime.now(timezone.utc)
+    profile_id = f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler.dump_stats(os.path.join(profile_dir, f'{profile_id}.prof'))
+    summary = {
+        'id': profile_id,
+        'created_at': now.isoformat(),
+        'method': request.method,
+        'path': request.path,
+        'query_string': request.query_string.decode('utf-8', 'replace'),
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'ms': round(elapsed * 1000, 3),
+        'sql_count': len(sql),
+        'sql_ms': round(sum(s['ms'] for s in sql), 3),
+        'sql': sql,
+        'top_functions': _top_functions(pstats.Stats(profiler)),
+    }
+    with open(os.path.join(profile_dir, f'{profile_id}.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    _prune()
+    response.headers['X-Profile-Id'] = profile_id
+    return response
+
+
+def list_profiles():
+    if not _authorized():
+        return jsonify({'error': f'{HEADER} header with the profiling token required'}), 403
+    profiles = []
+    names = sorted((n for n in os.listdir(profile_dir) if n.endswith('.json')), reverse=True) \
+        if os.path.isdir(profile_dir) else []
+    for name in names:
+        with open(os.path.join(profile_dir, name)) as f:
+            summary = json.load(f)
+        profiles.append({k: summary[k] for k in ('id', 'created_at', 'method', 'path', 'query_string',
+                                                  'status', 'ms', 'sql_count', 'sql_ms')})
+    return jsonify({'profiles': profiles})
+
+
+def get_profile(name):
+    if not _authorized():
+        return jsonify({'error': f'{HEADER} header with the profiling token required'}), 403
+    profile_id, _, ext = name.partition('.')
+    if not PROFILE_ID.match(profile_id) or ext not in ('', 'prof'):
+        abort(404)
+    if ext == 'prof':
+        return send_from_directory(profile_dir, f'{profile_id}.prof', mimetype='application/octet-stream',
+                                   as_attachment=True)
+    return send_from_directory(profile_dir, f'{profile_id}.json', mimetype='application/json')
+
+
+def init_app(app) -> None:
+    """Install the profiling hooks and routes when PROFILE_TOKEN is set; otherwise do nothing."""
+    global profile_dir
+    if not TOKEN:
+        return
+    profile_dir = os.getenv('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.add_url_rule('/_profiles', 'list_profiles', list_profiles)
+    app.add_url_rule('/_profiles/<name>', 'get_profile', get_profile)
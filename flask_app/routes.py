@@ -1,7 +1,7 @@
-from flask import render_template
+from flask import Blueprint, render_template
 
-from . import app
+bp = Blueprint('main', __name__)
 
-@app.route('/')
+@bp.route('/')
 def index():
     return render_template('index.html')
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+Mergeable quantile sketches.
+
+TDigest is a merging t-digest kept as NumPy arrays of centroid means and
+weights. Building from raw values and merging are both a sort plus a
+vectorized regrouping of centroids under the k1 scale function, so merging
+the sketches of any set of groups costs O(total centroids) and never touches
+raw rows.
+"""
+
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+DEFAULT_COMPRESSION = 500
+
+
+class TDigest:
+    """Approximate distribution of a numeric column; mergeable with other digests."""
+
+    __slots__ = ("means", "weights", "n", "min", "max", "compression")
+
+    def __init__(self, means=None, weights=None, vmin: float = np.inf, vmax: float = -np.inf,
+                 compression: int = DEFAULT_COMPRESSION):
+        self.means = np.empty(0) if means is None else np.asarray(means, dtype=np.float64)
+        self.weights = np.empty(0) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.n = float(self.weights.sum())
+        self.min = float(vmin)
+        self.max = float(vmax)
+        self.compression = compression
+
+    @classmethod
+    def from_values(cls, values, compression: int = DEFAULT_COMPRESSION) -> "TDigest":
+        vals = np.asarray(values, dtype=np.float64)
+        vals = vals[np.isfinite(vals)]
+        if vals.size == 0:
+            return cls(compression=compression)
+        digest = cls(vals, np.ones_like(vals), vals.min(), vals.max(), compression)
+        digest._compress()
+        return digest
+
+    @classmethod
+    def merge_all(cls, digests: Iterable["TDigest"], compression: int = DEFAULT_COMPRESSION) -> "TDigest":
+        digests = [d for d in digests if d.n]
+        if not digests:
+            return cls(compression=compression)
+        merged = cls(
+            np.concatenate([d.means for d in digests]),
+            np.concatenate([d.weights for d in digests]),
+            min(d.min for d in digests),
+            max(d.max for d in digests),
+            compression,
+        )
+        merged._compress()
+        return merged
+
+    def _compress(self) -> None:
+        """Regroup centroids so each spans at most one unit of the k1 scale."""
+        if self.means.size <= 1:
+            return
+        order = np.argsort(self.means, kind="stable")
+        means, weights = self.means[order], self.weights[order]
+        cum = np.cumsum(weights)
+        q = (cum - weights / 2.0) / cum[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        bucket = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, np.diff(bucket) != 0])
+        w = np.add.reduceat(weights, starts)
+        m = np.add.reduceat(means * weights, starts) / w
+        self.means, self.weights = m, w
+
+    def _knots(self):
+        """(value, quantile) points at each centroid's mean rank, as np.quantile's linear method uses."""
+        if self.n <= 1:
+            return np.r_[self.min, self.max], np.r_[0.0, 1.0]
+        cum = np.cumsum(self.weights)
+        y = np.clip((cum - (self.weights + 1.0) / 2.0) / (self.n - 1.0), 0.0, 1.0)
+        x = np.r_[self.min, self.means, self.max]
+        return x, np.r_[0.0, y, 1.0]
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        if not self.n:
+            return [0.0 for _ in qs]
+        x, y = self._knots()
+        return np.interp(np.asarray(qs, dtype=np.float64), y, x).tolist()
+
+    def cdf(self, xs) -> np.ndarray:
+        if not self.n:
+            return np.zeros(len(xs))
+        x, y = self._knots()
+        return np.interp(np.asarray(xs, dtype=np.float64), x, y)
+
+    def histogram(self, edges) -> List[float]:
+        """Estimated number of values falling in each [edges[i], edges[i+1]) bin."""
+        c = self.cdf(edges)
+        return (np.diff(c) * self.n).round(2).tolist()
+
+    def summary(self, qs: List[float], edges: Optional[np.ndarray] = None) -> dict:
+        out = {
+            "n": int(round(self.n)),
+            "min": self.min if self.n else 0.0,
+            "max": self.max if self.n else 0.0,
+            "quantiles": dict(zip(quantile_labels(qs), self.quantiles(qs))),
+        }
+        if edges is not None:
+            out["histogram"] = {"edges": list(map(float, edges)), "counts": self.histogram(edges)}
+        return out
+
+
+def quantile_labels(qs: List[float]) -> List[str]:
+    return ["p%g" % (q * 100) for q in qs]
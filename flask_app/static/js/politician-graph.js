@@ -3,6 +3,90 @@
  * Adapted from OpenBallot demo.html for Flask integration
  */
 
+const GRAPH_BINARY_MIMETYPE = 'application/x-openballot-graph';
+
+/**
+ * Decode the columnar binary graph format served by /api/graph and
+ * /api/politician/<id>/graph (see flask_app/graph_codec.py) into the
+ * {meta, nodes, links} shape D3 expects.
+ */
+function decodeGraphBinary(buf) {
+    const dv = new DataView(buf);
+    const magic = String.fromCharCode(dv.getUint8(0), dv.getUint8(1), dv.getUint8(2), dv.getUint8(3));
+    if (magic !== 'OBG1') {
+        throw new Error('Not an OpenBallot graph payload');
+    }
+    const utf8 = new TextDecoder('utf-8');
+    const headerLen = dv.getUint32(4, true);
+    const header = JSON.parse(utf8.decode(new Uint8Array(buf, 8, headerLen)));
+    const align = n => (n + 3) & ~3;
+
+    let off = align(8 + headerLen);
+    const strings = header.string_count
+        ? utf8.decode(new Uint8Array(buf, off, header.string_bytes)).split('\0')
+        : [];
+    off = align(off + header.string_bytes);
+
+    const take = (Ctor, n) => {
+        const col = new Ctor(buf, off, n);
+        off += n * 4;
+        return col;
+    };
+    const N = header.node_count;
+    const M = header.link_count;
+    const MISSING = 0xFFFFFFFF;
+    const strCols = header.node_strings.map(() => take(Uint32Array, N));
+    const floatCols = header.node_floats.map(() => take(Float32Array, N));
+    const src = take(Uint32Array, M);
+    const tgt = take(Uint32Array, M);
+    const typ = take(Uint32Array, M);
+    const amt = take(Float32Array, M);
+
+    const nodes = new Array(N);
+    for (let i = 0; i < N; i++) {
+        const n = {};
+        header.node_strings.forEach((f, c) => {
+            const s = strCols[c][i];
+            if (s !== MISSING) n[f] = strings[s];
+        });
+        header.node_floats.forEach((f, c) => {
+            const v = floatCols[c][i];
+            if (!Number.isNaN(v)) n[f] = v;
+        });
+        const extra = header.node_extras[i];
+        if (extra) Object.assign(n, extra);
+        nodes[i] = n;
+    }
+
+    const links = new Array(M);
+    for (let i = 0; i < M; i++) {
+        const l = { source: nodes[src[i]].id, target: nodes[tgt[i]].id, amount: amt[i] };
+        if (typ[i] !== MISSING) l.type = strings[typ[i]];
+        const extra = header.link_extras[i];
+        if (extra) Object.assign(l, extra);
+        links[i] = l;
+    }
+
+    return { meta: header.meta, nodes, links };
+}
+
+/**
+ * Fetch graph data, preferring the binary format and falling back to JSON
+ * when the server does not offer it.
+ */
+async function fetchGraphData(url, options = {}) {
+    const headers = { Accept: `${GRAPH_BINARY_MIMETYPE}, application/json;q=0.9` };
+    const response = await fetch(url, { ...options, headers });
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+    }
+    const type = response.headers.get('Content-Type') || '';
+    if (type.startsWith(GRAPH_BINARY_MIMETYPE)) {
+        return decodeGraphBinary(await response.arrayBuffer());
+    }
+    return response.json();
+}
+
 class PoliticianGraph {
     constructor(containerId, politicianId) {
         this.containerId = containerId;
@@ -87,13 +171,17 @@ class PoliticianGraph {
         }
     }
 
+    embeddedGraph() {
+        // The page may inline its /api/politician/<id> payload, graph included
+        const el = document.getElementById('politician-data');
+        if (!el) return null;
+        const detail = JSON.parse(el.textContent);
+        return detail.candidate_id === this.politicianId ? detail.graph : null;
+    }
+
     async loadData() {
         try {
-            const response = await fetch(`/api/politician/${this.politicianId}/graph`);
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}`);
-            }
-            this.data = await response.json();
+            this.data = this.embeddedGraph() || await fetchGraphData(`/api/politician/${this.politicianId}/graph`);
             
             // Hide loading indicator and show graph
             const loadingEl = document.getElementById('graph-loading');
@@ -347,6 +435,8 @@ class PoliticianGraph {
         } else if (d.type === 'Politician') {
             const t = d._total || 0;
             return Math.max(4, Math.min(11, 4 + Math.log10(t + 10)));
+        } else if (d.type === 'Committee') {
+            return 6;
         }
         return 8;
     }
@@ -361,6 +451,8 @@ class PoliticianGraph {
                 party: '#a78bfa'
             };
             return colors[d._dom] || '#e74c3c';
+        } else if (d.type === 'Committee') {
+            return '#f59e0b';
         }
         return '#6c757d';
     }
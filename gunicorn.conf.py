@@ -0,0 +1,22 @@
+"""
+Gunicorn settings for the Flask app:  gunicorn -c gunicorn.conf.py run:app
+
+The app and its datasets (plus the Gemini SDK, see flask_app.warm_up) are
+loaded once in the master and then forked, so workers share the loaded data
+copy-on-write instead of each parsing the CSVs and graph JSON on their own.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+preload_app = True
+
+
+def when_ready(server):
+    from flask_app import datasets, warm_up
+
+    warm_up(freeze=True)
+    ds = datasets.get_dataset()
+    server.log.info("Preloaded dataset %s (%d rows) before forking workers", ds.version, len(ds.row_store))
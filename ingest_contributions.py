@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Script to load FEC itemized individual contributions (itcont.txt) into the
+contribution table, summed per committee and candidate.
+
+The itcont files are stream-parsed in byte-range chunks by a process pool, so
+memory stays bounded whatever their size. Committees are joined to candidates
+with the ccl.txt linkage file; cm.txt, if present, supplies committee names.
+Run build_graph.py afterwards to add the committee edges to the graph.
+
+    python ingest_contributions.py /data/fec/itcont.txt
+    python ingest_contributions.py itcont_2024.txt itcont_2022.txt --ccl ccl.txt --cm cm.txt
+    python ingest_contributions.py /data/fec/2022/itcont.txt --cycle 2022
+"""
+
+import argparse
+import os
+import time
+
+from flask_app import app, db, init_db
+from flask_app.datasets import DEFAULT_CYCLE
+from flask_app.fec_bulk import (DEFAULT_CHUNK_BYTES, aggregate_itcont, committee_candidate_rows,
+                                read_committee_names, read_linkage)
+from flask_app.models import Contribution, Politician
+
+
+def write_contributions(rows, cycle, batch_size=10000):
+    """Replace the contribution rows for `cycle` with `rows` in one transaction."""
+    table = Contribution.__table__
+    for r in rows:
+        r["cycle"] = cycle
+    with db.engine.begin() as connection:
+        connection.execute(table.delete().where(table.c.cycle == cycle))
+        for i in range(0, len(rows), batch_size):
+            connection.execute(table.insert(), rows[i:i + batch_size])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("itcont", nargs="+", help="itcont.txt file(s)")
+    parser.add_argument("--ccl", help="candidate-committee linkage file (default: ccl.txt next to the first itcont)")
+    parser.add_argument("--cm", help="committee master file (default: cm.txt next to the first itcont, if present)")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_BYTES // (1024 * 1024),
+                        help="bytes of itcont per parse task, in MB (default: %(default)s)")
+    parser.add_argument("--cycle", type=int, default=DEFAULT_CYCLE,
+                        help="election cycle the files belong to (default: %(default)s)")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(args.itcont[0]))
+    ccl_path = args.ccl or os.path.join(base_dir, "ccl.txt")
+    cm_path = args.cm or os.path.join(base_dir, "cm.txt")
+    if not os.path.exists(ccl_path):
+        print(f"Error: linkage file not found: {ccl_path}")
+        return
+    for path in args.itcont:
+        if not os.path.exists(path):
+            print(f"Error: File not found: {path}")
+            return
+
+    start = time.perf_counter()
+    print(f"Parsing {len(args.itcont)} itcont file(s)...")
+
+    def progress(done, total):
+        if done == total or done % 10 == 0:
+            print(f"Processed {done}/{total} chunks...")
+
+    totals, stats = aggregate_itcont(args.itcont, workers=args.workers,
+                                     chunk_bytes=args.chunk_mb * 1024 * 1024, progress=progress)
+    linkage = read_linkage(ccl_path, args.cycle)
+    names = read_committee_names(cm_path) if os.path.exists(cm_path) else {}
+    rows = committee_candidate_rows(totals, linkage, names)
+
+    init_db(app)  # creates the contribution table on a new database
+    with app.app_context():
+        write_contributions(rows, args.cycle)
+        known = {cid for (cid,) in db.session.query(Politician.candidate_id).filter(Politician.cycle == args.cycle)}
+
+    elapsed = time.perf_counter() - start
+    matched = sum(1 for r in rows if r["candidate_id"] in known)
+    print(f"\nContribution ingest for cycle {args.cycle} complete in {elapsed:.2f}s")
+    print(f"  - rows read: {stats['rows']} ({stats['malformed']} malformed)")
+    print(f"  - committees with contributions: {len(totals)}")
+    print(f"  - committee/candidate rows written: {len(rows)}")
+    print(f"  - rows for candidates in the politician table: {matched}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""add election cycle to politician, contribution and facet_count
+
+Revision ID: a9d3b5e17c42
+Revises: e6a4c1b7d205
+Create Date: 2026-10-19 15:02:11.830417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3b5e17c42'
+down_revision = 'e6a4c1b7d205'
+branch_labels = None
+depends_on = None
+
+# Rows loaded before cycles existed are from the 2024 cycle.
+EXISTING_CYCLE = '2024'
+
+# SQLite reflects politician's UNIQUE (candidate_id) without a name; batch mode
+# names it through this convention so it can be dropped.
+NAMING_CONVENTION = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def _has_cycle(table):
+    return 'cycle' in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _candidate_id_unique_name():
+    for uq in sa.inspect(op.get_bind()).get_unique_constraints('politician'):
+        if uq['column_names'] == ['candidate_id']:
+            return uq['name'] or 'uq_politician_candidate_id'
+    return None
+
+
+def upgrade():
+    # The app's db.create_all() at import may already have created tables with the column
+    if not _has_cycle('politician'):
+        old_unique = _candidate_id_unique_name()
+        with op.batch_alter_table('politician', schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.add_column(sa.Column('cycle', sa.Integer(), nullable=False, server_default=EXISTING_CYCLE))
+            if old_unique:
+                batch_op.drop_constraint(old_unique, type_='unique')
+            batch_op.create_unique_constraint('uq_politician_cycle_candidate', ['cycle', 'candidate_id'])
+            batch_op.create_index('ix_politician_candidate_id', ['candidate_id'], unique=False)
+            batch_op.create_index('ix_politician_cycle_chamber', ['cycle', 'chamber'], unique=False)
+            batch_op.create_index('ix_politician_cycle_state', ['cycle', 'office_state'], unique=False)
+            batch_op.create_index('ix_politician_cycle_party', ['cycle', 'political_party_affiliation'], unique=False)
+        with op.batch_alter_table('politician', schema=None) as batch_op:
+            batch_op.alter_column('cycle', server_default=None)
+
+    if not _has_cycle('contribution'):
+        with op.batch_alter_table('contribution', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('cycle', sa.Integer(), nullable=False, server_default=EXISTING_CYCLE))
+            batch_op.drop_constraint('uq_contribution_committee_candidate', type_='unique')
+            batch_op.create_unique_constraint('uq_contribution_cycle_committee_candidate',
+                                              ['cycle', 'committee_id', 'candidate_id'])
+        with op.batch_alter_table('contribution', schema=None) as batch_op:
+            batch_op.alter_column('cycle', server_default=None)
+
+    if not _has_cycle('facet_count'):
+        with op.batch_alter_table('facet_count', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('cycle', sa.Integer(), nullable=False, server_default=EXISTING_CYCLE))
+            batch_op.drop_index('ix_facet_count_dimensions')
+            batch_op.create_index('ix_facet_count_cycle_dimensions', ['cycle', 'dimension', 'other_dimension'],
+                                  unique=False)
+        with op.batch_alter_table('facet_count', schema=None) as batch_op:
+            batch_op.alter_column('cycle', server_default=None)
+
+
+def downgrade():
+    # Only possible while a single cycle is loaded
+    with op.batch_alter_table('facet_count', schema=None) as batch_op:
+        batch_op.drop_index('ix_facet_count_cycle_dimensions')
+        batch_op.create_index('ix_facet_count_dimensions', ['dimension', 'other_dimension'], unique=False)
+        batch_op.drop_column('cycle')
+
+    with op.batch_alter_table('contribution', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_contribution_cycle_committee_candidate', type_='unique')
+        batch_op.create_unique_constraint('uq_contribution_committee_candidate', ['committee_id', 'candidate_id'])
+        batch_op.drop_column('cycle')
+
+    with op.batch_alter_table('politician', schema=None) as batch_op:
+        batch_op.drop_index('ix_politician_cycle_party')
+        batch_op.drop_index('ix_politician_cycle_state')
+        batch_op.drop_index('ix_politician_cycle_chamber')
+        batch_op.drop_index('ix_politician_candidate_id')
+        batch_op.drop_constraint('uq_politician_cycle_candidate', type_='unique')
+        batch_op.create_unique_constraint('uq_politician_candidate_id', ['candidate_id'])
+        batch_op.drop_column('cycle')
@@ -0,0 +1,31 @@
+"""add politician updated_at
+
+Revision ID: c4f7e2a9b813
+Revises: a9d3b5e17c42
+Create Date: 2026-10-19 17:21:40.562193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f7e2a9b813'
+down_revision = 'a9d3b5e17c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The app's db.create_all() at import may already have created the column
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('politician')}
+    if 'updated_at' not in columns:
+        with op.batch_alter_table('politician', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # Existing rows' last write is unknown; start them at the upgrade time
+    op.execute(sa.text('UPDATE politician SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('politician', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
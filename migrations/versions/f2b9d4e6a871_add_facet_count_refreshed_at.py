@@ -0,0 +1,29 @@
+"""add facet_count refreshed_at
+
+Revision ID: f2b9d4e6a871
+Revises: c4f7e2a9b813
+Create Date: 2026-10-19 21:08:13.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b9d4e6a871'
+down_revision = 'c4f7e2a9b813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The app's db.create_all() may already have created the column
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('facet_count')}
+    if 'refreshed_at' not in columns:
+        with op.batch_alter_table('facet_count', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('refreshed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('facet_count', schema=None) as batch_op:
+        batch_op.drop_column('refreshed_at')
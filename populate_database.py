@@ -4,21 +4,30 @@ Script to populate the database with candidate data from CSV files.
 This is a one-time script to load the new_data CSV files into the database.
 """
 
+import argparse
 import csv
+import hashlib
 import os
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from fuzzywuzzy import process
 
 # Add the flask_app directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent / 'flask_app'))
 
-from flask_app import app, db
-from flask_app.models import Politician
+from flask_app import app, db, init_db
+from flask_app.datasets import DEFAULT_CYCLE, data_dir_for
+from flask_app.facets import refresh_facet_counts
+from flask_app.funding_metrics import derive_funding_metrics
+from flask_app.models import FacetCount, Politician
+import pandas as pd
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
 
 def safe_float(value):
-    """Convert string to float, handling empty strings and invalid values."""
-    if not value or value.strip() == '':
+    """Convert string (or number) to float, handling empty strings and invalid values."""
+    if value is None or (isinstance(value, str) and value.strip() == ''):
         return 0.0
     try:
         return float(value)
@@ -40,7 +49,48 @@ def get_chamber_from_candidate_id(candidate_id):
     else:
         return 'Unknown'
 
-def populate_from_csv(csv_file_path, chamber):
+# Columns the CSVs do not own: set by the website backfill, part of the key, or derived.
+ROW_HASH_EXCLUDE = ('website_url', 'cycle', 'row_hash')
+
+def row_hash(record):
+    """Stable hash of a record's CSV-derived fields."""
+    raw = '\x1f'.join(f'{k}={record[k]!r}' for k in sorted(record) if k not in ROW_HASH_EXCLUDE)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def politician_record(row, chamber, cycle=DEFAULT_CYCLE):
+    """Map one candidate CSV row to Politician column values for an election cycle."""
+    record = dict(
+        cycle=cycle,
+        candidate_id=safe_string(row['CAND_ID']),
+        candidate_name=safe_string(row['CAND_NAME']),
+        chamber=chamber,
+        website_url = None,
+        incumbent_challenger_indicator=safe_string(row['CAND_ICI']),
+        political_party_affiliation=safe_string(row['CAND_PTY_AFFILIATION']),
+        total_receipts=safe_float(row['TTL_RECEIPTS']),
+        debts_owed_by=safe_float(row['DEBTS_OWED_BY']),
+        total_individual_contributions=safe_float(row['TTL_INDIV_CONTRIB']),
+        office_state=safe_string(row['CAND_OFFICE_ST']),
+        office_district=safe_string(row['CAND_OFFICE_DISTRICT']),
+        other_political_committee_contributions=safe_float(row['OTHER_POL_CMTE_CONTRIB']),
+        political_party_contributions=safe_float(row['POL_PTY_CONTRIB']),
+        coverage_end_date=safe_string(row['CVG_END_DT']),
+        individual_refunds=safe_float(row['INDIV_REFUNDS']),
+        committee_refunds=safe_float(row['CMTE_REFUNDS']),
+        percent_individual_contributions=safe_float(row['PCT_INDIV_CONTRIB']),
+        pac_contribution_percentage=safe_float(row.get('PAC_Contribution_%', 0.0)),
+        party_contribution_percentage=safe_float(row.get('Party_Contribution_%', 0.0)),
+        adjusted_party_contributions=safe_float(row.get('Adj_Party_Contrib', 0.0)),
+        adjusted_pac_contributions=safe_float(row.get('Adj_PAC_Contrib', 0.0)),
+        percent_individual=safe_float(row.get('Pct_Individual', 0.0)) or safe_float(row.get('PCT_FROM_INDIV', 0.0)),
+        funding_group=safe_string(row.get('Funding_Group', '')),
+        individual_percentile_all=safe_float(row.get('Individual_Pctile_All', 0.0)),
+        individual_percentile_bin=safe_string(row.get('Individual_Pctile_Bin', ''))
+    )
+    record['row_hash'] = row_hash(record)
+    return record
+
+def populate_from_csv(csv_file_path, chamber, cycle=DEFAULT_CYCLE):
     """Populate database from a single CSV file."""
     print(f"Processing {chamber} data from: {csv_file_path}")
     
@@ -49,65 +99,224 @@ def populate_from_csv(csv_file_path, chamber):
         return 0
     
     count = 0
-    with open(csv_file_path, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        
-        for row in reader:
-            try:
-                # Create new Politician record
-                politician = Politician(
-                    candidate_id=safe_string(row['CAND_ID']),
-                    candidate_name=safe_string(row['CAND_NAME']),
-                    chamber=chamber,
-                    website_url = None,
-                    incumbent_challenger_indicator=safe_string(row['CAND_ICI']),
-                    political_party_affiliation=safe_string(row['CAND_PTY_AFFILIATION']),
-                    total_receipts=safe_float(row['TTL_RECEIPTS']),
-                    debts_owed_by=safe_float(row['DEBTS_OWED_BY']),
-                    total_individual_contributions=safe_float(row['TTL_INDIV_CONTRIB']),
-                    office_state=safe_string(row['CAND_OFFICE_ST']),
-                    office_district=safe_string(row['CAND_OFFICE_DISTRICT']),
-                    other_political_committee_contributions=safe_float(row['OTHER_POL_CMTE_CONTRIB']),
-                    political_party_contributions=safe_float(row['POL_PTY_CONTRIB']),
-                    coverage_end_date=safe_string(row['CVG_END_DT']),
-                    individual_refunds=safe_float(row['INDIV_REFUNDS']),
-                    committee_refunds=safe_float(row['CMTE_REFUNDS']),
-                    percent_individual_contributions=safe_float(row['PCT_INDIV_CONTRIB']),
-                    pac_contribution_percentage=safe_float(row.get('PAC_Contribution_%', 0.0)),
-                    party_contribution_percentage=safe_float(row.get('Party_Contribution_%', 0.0)),
-                    adjusted_party_contributions=safe_float(row.get('Adj_Party_Contrib', 0.0)),
-                    adjusted_pac_contributions=safe_float(row.get('Adj_PAC_Contrib', 0.0)),
-                    percent_individual=safe_float(row.get('Pct_Individual', 0.0)) or safe_float(row.get('PCT_FROM_INDIV', 0.0)),
-                    funding_group=safe_string(row.get('Funding_Group', '')),
-                    individual_percentile_all=safe_float(row.get('Individual_Pctile_All', 0.0)),
-                    individual_percentile_bin=safe_string(row.get('Individual_Pctile_Bin', ''))
-                )
-                
-                db.session.add(politician)
-                count += 1
-                
-                # Commit every 100 records to avoid memory issues
-                if count % 100 == 0:
-                    db.session.commit()
-                    print(f"Processed {count} {chamber} records...")
-                    
-            except Exception as e:
-                print(f"Error processing row {count + 1}: {e}")
-                print(f"Row data: {row}")
-                continue
+    for _, _, row in candidate_rows([(csv_file_path, chamber)]):
+        try:
+            # Create new Politician record
+            politician = Politician(**politician_record(row, chamber, cycle))
+
+            db.session.add(politician)
+            count += 1
+
+            # Commit every 100 records to avoid memory issues
+            if count % 100 == 0:
+                db.session.commit()
+                print(f"Processed {count} {chamber} records...")
+
+        except Exception as e:
+            print(f"Error processing row {count + 1}: {e}")
+            print(f"Row data: {row}")
+            continue
     
     # Commit any remaining records
     db.session.commit()
     print(f"Completed processing {count} {chamber} records")
     return count
 
-def main1():
+# SQLite settings for a one-shot bulk load: keep the rollback journal in memory,
+# skip fsyncs, and give the page cache room (~200MB) for the table and index.
+# A database already in WAL (db_engine's production profile) keeps its journal:
+# switching out of WAL needs the only connection, so it fails while the app is up.
+BULK_PRAGMAS = {
+    'journal_mode': 'MEMORY',
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': -200000,
+}
+
+@contextmanager
+def bulk_load_pragmas(connection):
+    """Apply BULK_PRAGMAS on a SQLite connection for the duration of a load, then restore them."""
+    if connection.dialect.name != 'sqlite':
+        yield
+        return
+    pragmas = dict(BULK_PRAGMAS)
+    if str(connection.exec_driver_sql('PRAGMA journal_mode').scalar()).lower() == 'wal':
+        del pragmas['journal_mode']
+    saved = {name: connection.exec_driver_sql(f'PRAGMA {name}').scalar() for name in pragmas}
+    for name, value in pragmas.items():
+        connection.exec_driver_sql(f'PRAGMA {name} = {value}')
+    connection.commit()
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            connection.exec_driver_sql(f'PRAGMA {name} = {value}')
+        connection.commit()
+
+def read_candidate_frame(csv_files):
+    """
+    Read (csv_path, chamber) files into one DataFrame with the derived funding
+    metrics (see flask_app/funding_metrics.py) recomputed per chamber.
+
+    Cells are kept as text, as csv.DictReader would give them; the derived
+    columns are floats. Missing files are reported and skipped.
+    """
+    frames = []
+    for csv_file_path, chamber in csv_files:
+        if not os.path.exists(csv_file_path):
+            print(f"Error: File not found: {csv_file_path}")
+            continue
+        frame = pd.read_csv(csv_file_path, dtype=str, keep_default_na=False, encoding='utf-8')
+        frame['chamber'] = chamber
+        frame['source_path'] = str(csv_file_path)
+        frame['source_line'] = range(2, len(frame) + 2)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame()
+    # Files differ in columns; give the gaps the empty text a CSV cell would have
+    return derive_funding_metrics(pd.concat(frames, ignore_index=True).fillna(''))
+
+def candidate_rows(csv_files):
+    """Yield (csv_path, line_no, row dict) for every candidate row, derived metrics included."""
+    frame = read_candidate_frame(csv_files)
+    for row in frame.to_dict('records'):
+        yield row['source_path'], row['source_line'], row
+
+def iter_politician_records(csv_files, cycle=DEFAULT_CYCLE):
+    """Yield Politician column dicts from (csv_path, chamber) pairs, skipping bad rows and repeated candidate ids."""
+    seen = set()
+    for csv_file_path, line_no, row in candidate_rows(csv_files):
+        try:
+            record = politician_record(row, row['chamber'], cycle)
+        except Exception as e:
+            print(f"Error processing {csv_file_path}:{line_no}: {e}")
+            continue
+        if record['candidate_id'] in seen:
+            continue
+        seen.add(record['candidate_id'])
+        yield record
+
+def bulk_populate(csv_files, batch_size=10000, replace=True, cycle=DEFAULT_CYCLE):
+    """
+    Load candidate CSVs for an election cycle with Core executemany inserts in one transaction.
+
+    csv_files is a list of (csv_path, chamber). With replace, the cycle's existing
+    Politician rows are deleted in the same transaction, so readers never see a half-loaded
+    table; the facet_count table is rebuilt in it too. Returns the number of rows
+    inserted.
+    """
+    table = Politician.__table__
+    records = iter_politician_records(csv_files, cycle)
+    first = next(records, None)
+    count = 0
+    with db.engine.connect() as connection:
+        with bulk_load_pragmas(connection), connection.begin():
+            if replace:
+                connection.execute(table.delete().where(table.c.cycle == cycle))
+            if first is None:
+                refresh_facet_counts(connection, cycle)
+                return 0
+
+            # Compile the INSERT once and hand the driver plain parameter tuples;
+            # per-row parameter processing in execute() costs more than the insert.
+            compiled = table.insert().compile(dialect=connection.dialect, column_keys=list(first))
+            insert_sql = str(compiled)
+            if compiled.positional:
+                order = compiled.positiontup
+                to_params = lambda record: tuple([record[k] for k in order])
+            else:
+                to_params = lambda record: record
+
+            batch = [to_params(first)]
+            for record in records:
+                batch.append(to_params(record))
+                if len(batch) >= batch_size:
+                    connection.exec_driver_sql(insert_sql, batch)
+                    count += len(batch)
+                    batch = []
+                    print(f"Inserted {count} records...")
+            if batch:
+                connection.exec_driver_sql(insert_sql, batch)
+                count += len(batch)
+            refresh_facet_counts(connection, cycle)
+    return count
+
+def incremental_populate(csv_files, batch_size=10000, remove_missing=True, cycle=DEFAULT_CYCLE):
+    """
+    Upsert candidate CSVs into an election cycle by candidate_id, writing only rows
+    whose row_hash changed. Other cycles' rows are never touched.
+
+    New candidates are inserted, changed ones updated in place (INSERT ... ON
+    CONFLICT DO UPDATE), and with remove_missing candidates absent from every CSV
+    are deleted. website_url, description and description_generated_at are never
+    written for existing rows, so cached Gemini descriptions survive a refresh.
+    facet_count is rebuilt in the same transaction when anything changed (or
+    it has never been built).
+    Returns counts of inserted, updated, unchanged and removed rows.
+    """
+    table = Politician.__table__
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+
+    with db.engine.connect() as connection:
+        dialect_insert = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}.get(connection.dialect.name)
+        if dialect_insert is None:
+            raise RuntimeError(f"Upsert ingest is not supported on {connection.dialect.name}")
+
+        with bulk_load_pragmas(connection), connection.begin():
+            existing = dict(connection.execute(
+                select(table.c.candidate_id, table.c.row_hash).where(table.c.cycle == cycle)
+            ).all())
+            seen = set()
+            upsert_stmt = None
+            batch = []
+
+            def flush():
+                if batch:
+                    connection.execute(upsert_stmt, batch)
+                    batch.clear()
+
+            for record in iter_politician_records(csv_files, cycle):
+                candidate_id = record['candidate_id']
+                seen.add(candidate_id)
+                if candidate_id not in existing:
+                    stats['inserted'] += 1
+                elif existing[candidate_id] != record['row_hash']:
+                    stats['updated'] += 1
+                else:
+                    stats['unchanged'] += 1
+                    continue
+
+                if upsert_stmt is None:
+                    stmt = dialect_insert(table)
+                    upsert_stmt = stmt.on_conflict_do_update(
+                        index_elements=[table.c.cycle, table.c.candidate_id],
+                        set_={**{k: stmt.excluded[k] for k in record if k not in ('cycle', 'candidate_id', 'website_url')},
+                              'updated_at': func.now()},
+                    )
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    flush()
+            flush()
+
+            if remove_missing:
+                missing = [cid for cid in existing if cid not in seen]
+                for i in range(0, len(missing), 500):
+                    connection.execute(table.delete().where(table.c.cycle == cycle,
+                                                            table.c.candidate_id.in_(missing[i:i + 500])))
+                stats['removed'] = len(missing)
+
+            changed = stats['inserted'] or stats['updated'] or stats['removed']
+            built = connection.execute(select(FacetCount.id).where(FacetCount.cycle == cycle).limit(1)).first()
+            if changed or built is None:
+                refresh_facet_counts(connection, cycle)
+    return stats
+
+def main1(cycle=DEFAULT_CYCLE):
     """Main function to populate the database."""
     print("Starting database population...")
     
-    # Get the base directory
-    base_dir = Path(__file__).parent
-    new_data_dir = base_dir / 'flask_app' / 'new_data'
+    # Get the cycle's data directory (flask_app/new_data for the default cycle)
+    new_data_dir = Path(data_dir_for(cycle))
     
     # Check if new_data directory exists
     if not new_data_dir.exists():
@@ -116,22 +325,25 @@ def main1():
     
     # Initialize database within Flask app context
     with app.app_context():
-        # Clear existing data (optional - remove if you want to keep existing data)
+        # Clear existing data for this cycle (optional - remove if you want to keep existing data)
         print("Clearing existing Politician records...")
-        Politician.query.delete()
+        Politician.query.filter_by(cycle=cycle).delete()
         db.session.commit()
         
         # Process House data
         house_csv = new_data_dir / 'house_candidates_indiv_percentiles.csv'
-        house_count = populate_from_csv(house_csv, 'House')
+        house_count = populate_from_csv(house_csv, 'House', cycle)
         
         # Process Senate data
         senate_csv = new_data_dir / 'senate_candidates_indiv_percentiles.csv'
-        senate_count = populate_from_csv(senate_csv, 'Senate')
+        senate_count = populate_from_csv(senate_csv, 'Senate', cycle)
 
         #Process President data
         president_csv = new_data_dir / 'president_data.csv'
-        president_count = populate_from_csv(president_csv, 'President')
+        president_count = populate_from_csv(president_csv, 'President', cycle)
+
+        with db.engine.begin() as connection:
+            refresh_facet_counts(connection, cycle)
         
         total_count = president_count
         print(f"\nDatabase population complete!")
@@ -140,7 +352,59 @@ def main1():
         print(f"  - House: {house_count}")
         print(f"  - Senate: {senate_count}")
 
-def main2():
+# Candidate file names per chamber, preferred first. The derived funding columns
+# are recomputed on ingest, so the raw FEC exports (data/ layout) load as-is.
+CANDIDATE_FILES = [
+    ('House', ['house_candidates_indiv_percentiles.csv', 'house_candidates.csv']),
+    ('Senate', ['senate_candidates_indiv_percentiles.csv', 'senate_candidates.csv']),
+    ('President', ['president_data.csv']),
+]
+
+def candidate_csv_files(new_data_dir):
+    """(csv_path, chamber) pairs for the candidate files in new_data_dir."""
+    files = []
+    for chamber, names in CANDIDATE_FILES:
+        paths = [new_data_dir / name for name in names]
+        files.append((next((p for p in paths if p.exists()), paths[0]), chamber))
+    return files
+
+def main_bulk(batch_size=10000, data_dir=None, cycle=DEFAULT_CYCLE):
+    """Bulk version of main1: replace the cycle's Politician rows in one transaction."""
+    print("Starting bulk database population...")
+
+    new_data_dir = Path(data_dir or data_dir_for(cycle))
+    if not new_data_dir.exists():
+        print(f"Error: new_data directory not found at {new_data_dir}")
+        return
+
+    start = time.perf_counter()
+    with app.app_context():
+        total_count = bulk_populate(candidate_csv_files(new_data_dir), batch_size=batch_size, cycle=cycle)
+    elapsed = time.perf_counter() - start
+    print("\nDatabase population complete!")
+    print(f"Total records added: {total_count} in {elapsed:.2f}s")
+
+def main_upsert(batch_size=10000, remove_missing=True, data_dir=None, cycle=DEFAULT_CYCLE):
+    """Incremental version of main1: upsert changed candidates, keeping descriptions."""
+    print("Starting incremental database update...")
+
+    new_data_dir = Path(data_dir or data_dir_for(cycle))
+    if not new_data_dir.exists():
+        print(f"Error: new_data directory not found at {new_data_dir}")
+        return
+
+    start = time.perf_counter()
+    with app.app_context():
+        stats = incremental_populate(candidate_csv_files(new_data_dir), batch_size=batch_size,
+                                     remove_missing=remove_missing, cycle=cycle)
+    elapsed = time.perf_counter() - start
+    print(f"\nDatabase update complete in {elapsed:.2f}s")
+    print(f"  - inserted: {stats['inserted']}")
+    print(f"  - updated: {stats['updated']}")
+    print(f"  - unchanged: {stats['unchanged']}")
+    print(f"  - removed: {stats['removed']}")
+
+def main2(unmatched_report='website_unmatched.csv', fuzzy_all=False, cycle=DEFAULT_CYCLE):
     """Main function to populate the database."""
     print("Starting database population...")
     
@@ -154,110 +418,178 @@ def main2():
         print(f"Error: new_data directory not found at {new_data_dir}")
         return
     
+    unmatched = []
     # Initialize database within Flask app context
     with app.app_context():
-        # Clear existing data (optional - remove if you want to keep existing data)
-        # print("Clearing existing Politician records...")
-        # Politician.query.delete()
-        # db.session.commit()
-        
         # Process House data
         house_csv = new_data_dir / 'house_websites.csv'
-        house_count = populate_website_urls_from_csv(house_csv, 'House')
+        house_count = populate_website_urls_from_csv(house_csv, 'House', unmatched, fuzzy_all, cycle)
         
         # Process Senate data
         senate_csv = new_data_dir / 'senate_websites.csv'
-        senate_count = populate_website_urls_from_csv(senate_csv, 'Senate')
+        senate_count = populate_website_urls_from_csv(senate_csv, 'Senate', unmatched, fuzzy_all, cycle)
         
-        total_count = senate_count
-        print(f"\nDatabase population complete!")
-        print(f"Total records added: {total_count}")
-        print(f"  - House: {house_count}")
-        print(f"  - Senate: {senate_count}")
+    total_count = house_count + senate_count
+    write_unmatched_report(unmatched_report, unmatched)
+    print("\nDatabase population complete!")
+    print(f"Total websites matched: {total_count}")
+    print(f"  - House: {house_count}")
+    print(f"  - Senate: {senate_count}")
+    print(f"  - Unmatched: {len(unmatched)} (see {unmatched_report})")
 
 
-def populate_website_urls_from_csv(csv_file_path, chamber):
-    """Populate database from a single CSV file."""
+US_STATE_ABBR = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
+    'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
+    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
+    'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
+    'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
+    'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
+    'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
+    'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY',
+    'District of Columbia': 'DC', 'American Samoa': 'AS', 'Guam': 'GU', 'Northern Mariana Islands': 'MP',
+    'Puerto Rico': 'PR', 'U.S. Virgin Islands': 'VI', 'Virgin Islands': 'VI',
+}
+
+# A fuzzy match is accepted if it scores at least FUZZY_MIN_SCORE and beats the
+# runner-up in the same block by FUZZY_MIN_MARGIN (the thresholds the old
+# interactive matcher used before asking a human), or if its surname is the only
+# one in the block equal to the website name's surname and it scores at least
+# SURNAME_MIN_SCORE (catches nicknames: "Mike Crapo" vs "CRAPO, MICHAEL D").
+FUZZY_MIN_SCORE = 85
+FUZZY_MIN_MARGIN = 11
+SURNAME_MIN_SCORE = 60
+
+UNMATCHED_COLUMNS = ['chamber', 'name', 'state', 'website', 'matched_name', 'best_guess', 'score', 'reason']
+
+
+def fuzzy_match_websites(rows, chamber, cycle=DEFAULT_CYCLE):
+    """
+    Match website rows to politicians of `chamber` in `cycle` with RapidFuzz, blocked by state.
+
+    Each state's website names are scored against that state's candidates in one
+    cdist call. Returns (matches, unmatched): matches are (candidate_id, url);
+    unmatched are report rows for UNMATCHED_COLUMNS.
+    """
+    from rapidfuzz import fuzz, process, utils
+
+    politicians = db.session.execute(
+        select(Politician.candidate_id, Politician.candidate_name, Politician.office_state)
+        .where(Politician.cycle == cycle, Politician.chamber == chamber)
+    ).all()
+    blocks = {}
+    for candidate_id, candidate_name, office_state in politicians:
+        surname = candidate_name.split(',', 1)[0].strip().upper()
+        blocks.setdefault(office_state, []).append((candidate_id, format_name_for_search(candidate_name),
+                                                    candidate_name, surname))
+    everyone = [p for block in blocks.values() for p in block]
+
+    by_state = {}
+    for row in rows:
+        by_state.setdefault(row['state'], []).append(row)
+
+    matches, unmatched = [], []
+    for state, state_rows in by_state.items():
+        candidates = blocks.get(state, []) if state else everyone
+        if not candidates:
+            unmatched.extend(dict(row, best_guess='', score='', reason='no candidates in state') for row in state_rows)
+            continue
+        scores = process.cdist([r['name'] for r in state_rows], [c[1] for c in candidates],
+                               scorer=fuzz.token_set_ratio, processor=utils.default_process, workers=-1)
+        surname_counts = {}
+        for c in candidates:
+            surname_counts[c[3]] = surname_counts.get(c[3], 0) + 1
+        for row, row_scores in zip(state_rows, scores):
+            order = row_scores.argsort()[::-1]
+            best = float(row_scores[order[0]])
+            runner_up = float(row_scores[order[1]]) if len(order) > 1 else 0.0
+            guess = candidates[order[0]]
+            surname = row['name'].split()[-1].upper() if row['name'] else ''
+            if best >= FUZZY_MIN_SCORE and best - runner_up >= FUZZY_MIN_MARGIN:
+                matches.append((guess[0], row['website']))
+            elif best >= SURNAME_MIN_SCORE and guess[3] == surname and surname_counts[surname] == 1:
+                matches.append((guess[0], row['website']))
+            else:
+                reason = 'low score' if best < FUZZY_MIN_SCORE else 'ambiguous'
+                unmatched.append(dict(row, best_guess=guess[2], score=round(best, 1), reason=reason))
+    return matches, unmatched
+
+
+def populate_website_urls_from_csv(csv_file_path, chamber, unmatched=None, fuzzy_all=False, cycle=DEFAULT_CYCLE):
+    """
+    Backfill website_url for politicians from a websites CSV.
+
+    Names are matched against `cycle`'s candidates; the URL is then written to
+    that candidate's rows in every cycle.
+
+    Rows are matched by their curated 'Matched Name' (exact candidate_name);
+    rows without one, or whose name is not in the table, go through
+    fuzzy_match_websites. All updates are applied as two executemany UPDATEs.
+    Rows that still do not match are appended to `unmatched`. Returns the
+    number of CSV rows matched.
+    """
     print(f"Processing {chamber} data from: {csv_file_path}")
     
     if not os.path.exists(csv_file_path):
         print(f"Error: File not found: {csv_file_path}")
         return 0
     
-    count = 0
-    with open(csv_file_path, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        
-        for row in reader:
-            # try:
-                
-            website_url = safe_string(row['Website'])
-            name = safe_string(row['Name'])
-            matched_name = safe_string(row['Matched Name'])
-
-            # state_politicians = Politician.query.filter_by(office_state=state_abbr).all()
-            
-            # politician_id_to_name = {}
-            # for politician in state_politicians:
-            #     # Convert "LAST, FIRST" to "FIRST LAST" for better matching
-            #     formatted_name = format_name_for_search(politician.candidate_name)
-            #     politician_id_to_name[politician.candidate_id] = formatted_name
-
-            # # Perform fuzzy matching
-            # matches = process.extract(name, politician_id_to_name, limit=3)
-
-            # # politician_results = []
-
-            # # for match in matches:
-            # #     politician = Politician.query.filter_by(candidate_id=match[2]).first()
-            # #     politician_results.append((politician.candidate_name, match[1]))
-
-
-            # correct_politician_name = matches[0][0]
-
-            # if (matches[0][1] < 85) or ((matches[0][1] - matches[1][1]) < 11):
-            #     print("\nMatches:")
-            #     print(f"{name} - {website_url}")
-            #     for i, match in enumerate(matches):
-            #         print(f"{i+1}. {match[0]} - {match[1]}")
-            #     selection = input("\nSelect the correct politician (1, 2, or 3): ")
-            #     if selection == '1':
-            #         correct_politician_name = matches[0][0]
-            #     elif selection == '2':
-            #         correct_politician_name = matches[1][0]
-            #     elif selection == '3':
-            #         correct_politician_name = matches[2][0]
-            #     else: correct_politician_name = Politician.query.filter_by(candidate_id=selection).first().candidate_name
-
-
-            # print(f"{name}, {correct_politician_name}")
-            correct_politicians: list[Politician] = Politician.query.filter_by(candidate_name=matched_name).all()
-            for politician in correct_politicians:
-                politician.website_url = website_url
-                db.session.add(politician)
-            # db.session.commit()
-            # print(correct_politicians)
-            # print(matches[0][1], correct_politicians[0].candidate_name)
-
-
-            # db.session.add(politician)
-            count += 1
-            
-            # Commit every 100 records to avoid memory issues
-            if count % 100 == 0:
-                db.session.commit()
-                print(f"Processed {count} {chamber} records...")
-                    
-            # except Exception as e:
-            #     print(f"Error processing row {count + 1}: {e}")
-            #     print(f"Row data: {row}")
-            #     continue
-    
-    # Commit any remaining records
+    with open(csv_file_path, 'r', encoding='utf-8', newline='') as file:
+        rows = [{
+            'chamber': chamber,
+            'name': safe_string(row['Name']),
+            'state': US_STATE_ABBR.get(safe_string(row.get('State')), safe_string(row.get('State'))),
+            'website': safe_string(row['Website']),
+            'matched_name': safe_string(row.get('Matched Name')),
+        } for row in csv.DictReader(file)]
+
+    known_names = set()
+    if not fuzzy_all:
+        wanted = {r['matched_name'] for r in rows if r['matched_name']}
+        for names in _chunks(sorted(wanted), 500):
+            known_names.update(db.session.execute(
+                select(Politician.candidate_name).where(Politician.cycle == cycle, Politician.candidate_name.in_(names))
+            ).scalars())
+
+    # Later CSV rows win, as they did when rows were applied one at a time.
+    by_name = {r['matched_name']: r['website'] for r in rows if r['matched_name'] in known_names}
+    fuzzy_rows = [r for r in rows if r['matched_name'] not in known_names]
+    by_id, missed = fuzzy_match_websites(fuzzy_rows, chamber, cycle) if fuzzy_rows else ([], [])
+
+    table = Politician.__table__
+    if by_name:
+        db.session.execute(
+            table.update().where(table.c.candidate_name == bindparam('b_name')).values(website_url=bindparam('b_url')),
+            [{'b_name': name, 'b_url': url} for name, url in by_name.items()],
+        )
+    if by_id:
+        db.session.execute(
+            table.update().where(table.c.candidate_id == bindparam('b_id')).values(website_url=bindparam('b_url')),
+            [{'b_id': candidate_id, 'b_url': url} for candidate_id, url in by_id],
+        )
     db.session.commit()
-    print(f"Completed processing {count} {chamber} records")
+
+    if unmatched is not None:
+        unmatched.extend(missed)
+    count = len(rows) - len(missed)
+    print(f"Completed processing {len(rows)} {chamber} records: {len(rows) - len(fuzzy_rows)} exact, "
+          f"{len(by_id)} fuzzy, {len(missed)} unmatched")
     return count
 
+
+def write_unmatched_report(path, unmatched):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=UNMATCHED_COLUMNS)
+        writer.writeheader()
+        writer.writerows(unmatched)
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
 def format_name_for_search(name):
     """Convert 'LAST, FIRST' format to 'FIRST LAST' format."""
     if ',' in name:
@@ -269,5 +601,34 @@ def format_name_for_search(name):
     return name.strip()
 
 if __name__ == '__main__':
-    # main1()
-    main2()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Populate the Politician table from the CSV files.")
+    parser.add_argument('--mode', choices=['websites', 'candidates', 'bulk', 'upsert'], default='websites',
+                        help="websites: backfill website URLs (default); candidates: reload candidates via the ORM; "
+                             "bulk: reload candidates with batched Core inserts in one transaction; "
+                             "upsert: insert/update only changed candidates, keeping descriptions")
+    parser.add_argument('--cycle', type=int, default=DEFAULT_CYCLE,
+                        help="election cycle the candidate files belong to (default: %(default)s)")
+    parser.add_argument('--batch-size', type=int, default=10000, help="rows per executemany batch in bulk/upsert mode")
+    parser.add_argument('--data-dir', default=None,
+                        help="bulk/upsert mode: directory with the candidate CSVs (default: flask_app/new_data/<cycle>, "
+                             "or flask_app/new_data for the default cycle); "
+                             "raw FEC exports such as flask_app/data work too")
+    parser.add_argument('--keep-missing', action='store_true',
+                        help="upsert mode: keep candidates that no longer appear in the CSVs")
+    parser.add_argument('--unmatched-report', default='website_unmatched.csv',
+                        help="websites mode: CSV listing websites that matched no politician")
+    parser.add_argument('--fuzzy-all', action='store_true',
+                        help="websites mode: ignore the curated 'Matched Name' column and fuzzy-match every row")
+    args = parser.parse_args()
+
+    if args.mode != 'websites':
+        init_db(app)  # a new database has no tables yet
+    if args.mode == 'candidates':
+        main1(cycle=args.cycle)
+    elif args.mode == 'bulk':
+        main_bulk(batch_size=args.batch_size, data_dir=args.data_dir, cycle=args.cycle)
+    elif args.mode == 'upsert':
+        main_upsert(batch_size=args.batch_size, remove_missing=not args.keep_missing,
+                    data_dir=args.data_dir, cycle=args.cycle)
+    else:
+        main2(unmatched_report=args.unmatched_report, fuzzy_all=args.fuzzy_all, cycle=args.cycle)
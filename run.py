@@ -1,6 +1,11 @@
+import os
+
+if __name__ == "__main__":
+    # The debug server runs in development mode unless told otherwise
+    os.environ.setdefault("OPENBALLOT_ENV", "development")
+
 from flask_app import app
 
 if __name__ == "__main__":
     # app.run()
     app.run(debug=True, port=5000)
-